@@ -0,0 +1,126 @@
+import os
+import logging
+import multiprocessing
+from multiprocessing import util as mp_util
+
+from drilldown import drill_down_file
+from excel_pool import ExcelPool
+from run_trace import TRACE
+
+# =============================================================================
+# EKSEKUSI PARALEL LINTAS WORKBOOK (PROCESS POOL)
+# =============================================================================
+# Setiap proses worker memiliki satu engine berumur panjang:
+# - "excel"    : satu xw.App tersembunyi per proses (dibuat lazy pada tugas
+#                pertama agar gagal start Excel menjadi galat per file, bukan
+#                initializer yang terus di-respawn oleh Pool; didaur ulang per
+#                N workbook / galat COM lewat ExcelPool);
+#                mesin "fake" (fake_excel.py) memakai jalur yang sama
+# - "headless" : pembaca Pivot Cache (tanpa Excel)
+# Worker hanya melakukan drill-down dan mengembalikan data mentah; filter dan
+# cek duplikat tetap di proses induk (extract_data_manual) sesuai URUTAN INPUT,
+# sehingga aturan first-seen-wins tetap deterministik. Record trace waktu
+# (run_trace.py) dari worker ikut dikirim bersama hasil lalu digabung di induk.
+
+_worker_pool = None
+_worker_lease = None
+
+
+def _init_worker(headless, excel_engine="excel"):
+    """Initializer proses worker: menyiapkan pool engine (Excel dibuka di _run_task)."""
+    global _worker_pool, _worker_lease
+    TRACE.reset()   # Proses hasil fork mewarisi record induk
+    if headless:
+        _worker_pool = _worker_lease = None
+        return
+
+    _worker_pool = ExcelPool(size=1, engine=excel_engine)
+    _worker_lease = None
+    # Tutup Excel saat proses worker berakhir normal (pool.close + join)
+    mp_util.Finalize(None, _quit_worker_app, exitpriority=10)
+
+
+def _quit_worker_app():
+    global _worker_lease
+    if _worker_pool is not None:
+        _worker_pool.release(_worker_lease)
+        _worker_pool.shutdown()
+        _worker_lease = None
+
+
+def _run_task(task):
+    """Tugas per file di worker. Hasil: (path, raw_data, pesan_error, record_trace)."""
+    global _worker_lease
+    path, row_kw, col_kw, from_source = task
+    TRACE.begin_file(path)
+    try:
+        if _worker_pool is not None and _worker_lease is None:
+            _worker_lease = _worker_pool.acquire()   # Tugas pertama / instance sebelumnya didaur ulang
+        with TRACE.stage("file"):
+            raw_data = drill_down_file(_worker_lease.app if _worker_lease else None, path, row_kw, col_kw,
+                                       from_source=from_source)
+        result = path, raw_data, None
+        failure = None
+    except Exception as e:
+        result = path, None, str(e)
+        failure = e
+    if _worker_lease is not None:
+        _worker_lease = _worker_pool.after_book(_worker_lease, failure)
+    return result + (TRACE.drain(),)
+
+
+def iter_parallel(file_paths, row_kw, col_kw, workers, headless=False, cache=None, from_source=False,
+                  excel_engine="excel"):
+    """
+    Menjalankan drill-down paralel dan menghasilkan (index, path, raw_data, error)
+    dalam urutan input (imap menjaga urutan walaupun selesai tidak berurutan).
+    File yang sudah ada di `cache` (result_cache.ResultCache) tidak dikirim ke
+    worker; hasil worker baru disimpan ke cache oleh proses induk.
+    """
+    cached = set()
+    if cache is not None:
+        cached = {i for i, path in enumerate(file_paths) if cache.contains(path, row_kw, col_kw)}
+    pending = [path for i, path in enumerate(file_paths) if i not in cached]
+
+    pool = None
+    results = iter(())
+    if pending:
+        workers = max(1, min(workers, len(pending)))
+        logging.info(f"[>] POOL START: {workers} worker, {len(pending)} file ({len(cached)} dari cache)")
+        tasks = [(path, row_kw, col_kw, from_source) for path in pending]
+        pool = multiprocessing.Pool(processes=workers, initializer=_init_worker,
+                                    initargs=(headless, excel_engine))
+        results = pool.imap(_run_task, tasks, chunksize=1)
+
+    try:
+        for index, path in enumerate(file_paths):
+            if index in cached:
+                TRACE.begin_file(path)
+                with TRACE.stage("cache") as rec:
+                    raw_data = cache.get(path, row_kw, col_kw)
+                    rec["hit"] = raw_data is not None
+                if raw_data is not None:
+                    yield index, path, raw_data, None
+                    continue
+                # Entri terhapus (eviction) di antara pengecekan dan pembacaan
+                yield index, path, None, "Entri cache hilang saat diproses, jalankan ulang file ini."
+                continue
+
+            _, raw_data, error, records = next(results)
+            TRACE.extend(records)
+            if error is None and cache is not None:
+                cache.put(path, row_kw, col_kw, raw_data)
+            yield index, path, raw_data, error
+        if pool is not None:
+            pool.close()
+    except BaseException:
+        if pool is not None:
+            pool.terminate()
+        raise
+    finally:
+        if pool is not None:
+            pool.join()
+
+
+def default_workers():
+    return max(1, (os.cpu_count() or 2) - 1)
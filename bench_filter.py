@@ -0,0 +1,109 @@
+import re
+import sys
+import time
+import random
+import argparse
+
+from datetime import datetime, timedelta
+
+from normalize import normalize_val, normalize_column
+from code_filter import CodeFilter, MATCH_MODES
+from engine import RecapEngine
+
+# =============================================================================
+# BENCHMARK FILTER KODE (BIAYA PER BARIS DETAIL)
+# =============================================================================
+# Mengukur biaya langkah "filter kode" di extract_data_manual pada kolom kode
+# sheet detail sintetis (default 1 juta baris), tanpa Excel:
+#   python bench_filter.py
+#   python bench_filter.py --rows 2000000 --code "8204,8205" --distinct 200
+# Nilai kode dibuat mirip hasil drill-down: float (8204.0), int, dan teks,
+# termasuk kode "jebakan" seperti 18204 / 82040 yang ikut cocok pada regex
+# search. Bagian pertama mengukur pencocokan saja (kode sudah dinormalisasi);
+# --extract juga mengukur normalisasi kolom & extract_data_manual utuh pada
+# sheet detail sintetis 20 kolom.
+
+
+def make_codes(rows, distinct, seed=1):
+    rng = random.Random(seed)
+    pool = [8204, 8205, 8310, 18204, 82040] + [rng.randint(1000, 99999) for _ in range(max(0, distinct - 5))]
+    raw = []
+    for _ in range(rows):
+        code = rng.choice(pool)
+        kind = rng.random()
+        raw.append(float(code) if kind < 0.6 else (code if kind < 0.8 else f" {code} "))
+    return raw
+
+
+def make_sheet(codes, seed=2):
+    """Sheet detail sintetis (header + baris) dengan kolom kode dari `codes`."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, 8, 0)
+    header = [f"Kolom {i}" for i in range(20)]
+    header[18] = "Unit Kerja Pelaksana"
+    header[19] = "Kanca"
+    rows = [header]
+    for i, code in enumerate(codes):
+        row = [f"C{i:08d}", code, None, f"Deskripsi kasus {i}", start + timedelta(days=rng.randint(0, 365))]
+        row += [rng.random() for _ in range(13)]
+        row += [f"UKER {rng.randint(1, 300)}", f"KC {rng.randint(1, 40)}"]
+        rows.append(row)
+    return rows
+
+
+def timed(label, fn, codes, repeat=3):
+    """Waktu terbaik dari `repeat` kali (mesin sibuk membuat pengukuran tunggal bising)."""
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        hits = fn(codes)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    print(f"  {label:<28} {elapsed * 1e9 / len(codes):8.1f} ns/baris  {elapsed:7.3f} s  cocok={hits}")
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark filter kode per baris detail.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Jumlah baris detail sintetis.")
+    parser.add_argument("--distinct", type=int, default=50, help="Jumlah nilai kode berbeda.")
+    parser.add_argument("--code", default="8204", help="Kode filter (format sama dengan GUI/CLI).")
+    parser.add_argument("--extract", action="store_true",
+                        help="Ukur juga normalisasi kolom & extract_data_manual utuh.")
+    args = parser.parse_args(argv)
+
+    raw = make_codes(args.rows, args.distinct)
+    start = time.perf_counter()
+    codes = [normalize_val(val) for val in raw]
+    print(f"[I] {args.rows} baris, {args.distinct} kode berbeda, filter '{args.code}'")
+    print(f"  {'normalize_val (acuan)':<28} {(time.perf_counter() - start) * 1e9 / len(codes):8.1f} ns/baris")
+
+    # Perilaku lama: satu regex search per baris
+    legacy = re.compile(args.code, re.IGNORECASE)
+    timed("regex search (lama)", lambda cs: sum(1 for c in cs if legacy.search(c)), codes)
+
+    for mode in MATCH_MODES:
+        code_filter = CodeFilter.parse(args.code, mode)
+        match = code_filter.match
+        timed(f"CodeFilter {mode}", lambda cs: sum(1 for c in cs if match(c)), codes)
+        # Tanpa memo: biaya set membership / startswith / regex gabungan mentah
+        evaluate = CodeFilter.parse(args.code, mode)._evaluate
+        timed(f"CodeFilter {mode} (tanpa memo)", lambda cs: sum(1 for c in cs if evaluate(c)), codes)
+
+    if args.extract:
+        print("[I] Normalisasi kolom kode & ekstraksi utuh")
+        timed("normalize_column memo", lambda cs: len(normalize_column(cs, memo=True)), raw)
+        timed("normalize_column", lambda cs: len(normalize_column(cs)), raw)
+        sheet = make_sheet(raw)
+        for layout in ("standar", "bertingkat"):
+            engine = RecapEngine(layout=layout, keep_rows=False)
+            code_filter = CodeFilter.parse(args.code)
+
+            def extract(cs):
+                engine.reset()  # Indeks duplikat kosong di setiap ulangan
+                return len(engine.extract_data_manual(sheet, "bench.xlsx", code_filter))
+            timed(f"extract_data_manual {layout}", extract, raw)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+
+from drilldown import drill_down_file
+from excel_pool import ExcelPool
+from dedup_index import DedupIndex, key_digest
+from engine import RecapEngine
+from exporter import export_rows
+from normalize import normalize_val
+from code_filter import CodeFilter
+from run_trace import TRACE
+from synth_workbook import SyntheticSpec, generate
+
+# =============================================================================
+# BENCHMARK PIPELINE REKAP (TANPA GUI)
+# =============================================================================
+# Menjalankan alur BRIProSystem (drill-down -> ekstraksi -> cek duplikat ->
+# ekspor) memakai RecapEngine pada workbook sintetis (synth_workbook.py),
+# lalu mencatat hasilnya ke berkas JSONL agar bisa dibandingkan antar versi:
+#   python bench_pipeline.py --rows 1000,100000            # ukur + catat
+#   python bench_pipeline.py --rows 1000000 --files 2 --repeat 3
+#   python bench_pipeline.py --rows 100000 --compare       # bandingkan run terakhir
+# Tahap yang diukur (detik, total seluruh file; terbaik dari --repeat):
+#   open / scan / show_detail : drill-down (trace run_trace.py); headless, atau
+#                               --excel-engine fake untuk jalur Excel (fake_excel.py)
+#   extract                   : extract_data_manual utuh (filter + normalisasi + dedup)
+#   dedup                     : cek duplikat saja (key_digest + DedupIndex) pada baris kode cocok
+#   export_csv / export_xlsx  : exporter.export_rows dari master_data
+# Data sintetis dibuat sekali per parameter di --data-dir/<tag>.
+
+DEFAULT_DATA_DIR = "bench_data"
+DEFAULT_RESULTS = "bench_results.jsonl"
+REGRESSION_RATIO = 1.10
+MIN_COMPARE_SEC = 0.05     # Tahap lebih singkat dari ini terlalu bising untuk ditandai
+ROW_KEYWORD = r"bandar.*lampung"
+COL_KEYWORD = "Grand Total"
+
+
+def git_revision():
+    """Commit aktif (+ '-dirty' jika ada perubahan), None jika bukan repo git."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=here, capture_output=True,
+                             text=True, timeout=10).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=here,
+                               capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if not rev:
+        return None
+    return rev + ("-dirty" if dirty else "")
+
+
+def matched_keys(raw_data, code_idx, match):
+    """Pasangan (Case Number, Case Type) baris yang lolos filter (input tahap dedup)."""
+    keys = []
+    for row in raw_data[1:]:
+        code = normalize_val(row[code_idx])
+        if match(code):
+            keys.append((normalize_val(row[0]), code))
+    return keys
+
+
+def run_once(paths, code, layout, out_dir, excel_engine=None):
+    """Satu putaran pipeline; mengembalikan ({tahap: detik}, {hitungan})."""
+    engine = RecapEngine(layout=layout, keep_rows=True)
+    pool = ExcelPool(size=0, engine=excel_engine) if excel_engine else None
+    lease = pool.acquire() if pool else None
+    code_filter = CodeFilter.parse(code)
+    stages = {}
+    dedup_sec = 0.0
+    counts = {"detail_rows": 0, "matched": 0, "added": 0, "duplicates": 0}
+    TRACE.reset()
+
+    dedup = DedupIndex()
+    for path in paths:
+        TRACE.begin_file(path)
+        raw_data = drill_down_file(lease.app if lease else None, path, ROW_KEYWORD, COL_KEYWORD)
+        engine.extract_data_manual(raw_data, os.path.basename(path), code_filter, path)
+
+        keys = matched_keys(raw_data, engine.schema.resolve(raw_data[0])[engine.schema.code_field],
+                            code_filter.match)
+        start = time.perf_counter()
+        for a, b in keys:
+            dedup.check_add_digest(key_digest(a, b), "bench")
+        dedup_sec += time.perf_counter() - start
+        del raw_data
+
+    for name, s in TRACE.summary().items():
+        stages[name] = s["total"]
+    stages["dedup"] = dedup_sec
+    for rec in TRACE.records:
+        if rec["stage"] == "extract":
+            counts["detail_rows"] += rec.get("rows", 0)
+            for key in ("matched", "added", "duplicates"):
+                counts[key] += rec.get(key, 0)
+
+    for fmt in ("csv", "xlsx"):
+        target = os.path.join(out_dir, f"rekap.{fmt}")
+        start = time.perf_counter()
+        export_rows(target, engine.cols, engine.master_data)
+        stages[f"export_{fmt}"] = time.perf_counter() - start
+        os.remove(target)
+    dedup.close()
+    if pool is not None:
+        pool.release(lease)
+    return stages, counts
+
+
+def bench(spec, data_dir, code, layout, repeat, excel_engine=None):
+    folder = os.path.join(data_dir, spec.tag())
+    start = time.perf_counter()
+    paths = generate(folder, spec, lambda n, path: print(f"[>] Membuat {path}", file=sys.stderr))
+    generated = time.perf_counter() - start
+
+    best, counts = {}, None
+    with tempfile.TemporaryDirectory() as out_dir:
+        for _ in range(repeat):
+            stages, counts = run_once(paths, code, layout, out_dir, excel_engine)
+            for name, sec in stages.items():
+                best[name] = min(best.get(name, float("inf")), sec)
+    return {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "spec": spec.as_dict(),
+        "code": code,
+        "layout": layout,
+        "engine": excel_engine or "headless",
+        "repeat": repeat,
+        "generate_sec": generated,
+        "counts": counts,
+        "stages": best,
+    }
+
+
+def print_result(result):
+    spec, counts = result["spec"], result["counts"]
+    detail = max(1, counts["detail_rows"])
+    print(f"[I] {spec['rows']} baris x {spec['files']} file | revisi {result['revision']} | "
+          f"cocok={counts['matched']} baru={counts['added']} duplikat={counts['duplicates']}")
+    for name, sec in result["stages"].items():
+        print(f"  {name:<14} {sec:9.3f} s  {sec * 1e9 / detail:9.1f} ns/baris detail")
+
+
+def load_results(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(results, spec, code, layout, engine):
+    """Bandingkan dua run terakhir dengan parameter sama; tandai tahap yang melambat > 10%."""
+    same = [r for r in results if r["spec"] == spec.as_dict() and r["code"] == code and r["layout"] == layout
+            and r.get("engine", "headless") == engine]
+    if len(same) < 2:
+        print(f"[I] Belum ada pembanding untuk {spec.tag()}")
+        return 0
+    old, new = same[-2], same[-1]
+    print(f"[I] {spec.tag()}: {old['revision']} ({old['time']}) -> {new['revision']} ({new['time']})")
+    regressions = 0
+    for name, sec in new["stages"].items():
+        prev = old["stages"].get(name)
+        if not prev:
+            continue
+        ratio = sec / prev
+        mark = "  [!] LEBIH LAMBAT" if ratio > REGRESSION_RATIO and sec >= MIN_COMPARE_SEC else ""
+        regressions += bool(mark)
+        print(f"  {name:<14} {prev:9.3f} s -> {sec:9.3f} s  x{ratio:5.2f}{mark}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline rekap pada workbook pivot sintetis.")
+    parser.add_argument("--rows", default="1000,100000",
+                        help="Daftar jumlah baris detail per workbook, dipisah koma (1000 - 5000000).")
+    parser.add_argument("--files", type=int, default=3, help="Jumlah workbook per ukuran.")
+    parser.add_argument("--code-share", type=float, default=0.3, help="Porsi baris berkode 8204.")
+    parser.add_argument("--dup-share", type=float, default=0.1, help="Porsi baris duplikat lintas file.")
+    parser.add_argument("--code", default="8204", help="Kode filter.")
+    parser.add_argument("--layout", choices=("standar", "bertingkat"), default="bertingkat")
+    parser.add_argument("--excel-engine", choices=("fake",),
+                        help="Ukur jalur Excel dengan mesin tiruan (default: headless).")
+    parser.add_argument("--repeat", type=int, default=1, help="Ulangi dan ambil waktu terbaik per tahap.")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Folder workbook sintetis.")
+    parser.add_argument("--results", default=DEFAULT_RESULTS, help="Berkas JSONL hasil benchmark.")
+    parser.add_argument("--compare", action="store_true",
+                        help="Jangan ukur; bandingkan dua hasil terakhir per ukuran di --results.")
+    args = parser.parse_args(argv)
+
+    sizes = [int(n) for n in args.rows.split(",") if n.strip()]
+    specs = [SyntheticSpec(n, args.files, args.code_share, args.dup_share) for n in sizes]
+
+    if args.compare:
+        results = load_results(args.results)
+        regressions = sum(compare(results, spec, args.code, args.layout, args.excel_engine or "headless")
+                          for spec in specs)
+        return 1 if regressions else 0
+
+    for spec in specs:
+        result = bench(spec, args.data_dir, args.code, args.layout, max(1, args.repeat), args.excel_engine)
+        print_result(result)
+        with open(args.results, "a", encoding="utf-8") as f:
+            f.write(json.dumps(result, ensure_ascii=False) + "\n")
+    print(f"[+] Hasil dicatat ke {args.results}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
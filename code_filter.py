@@ -0,0 +1,173 @@
+import re
+import os
+import logging
+
+# =============================================================================
+# FILTER MULTI-KODE (SATU PASS EKSTRAKSI, BANYAK KELOMPOK OUTPUT)
+# =============================================================================
+# Input "Kode Filter" bisa berupa:
+# - satu pola                     : "8204" atau "82(04|05)"
+# - daftar dipisah koma/titik koma: "8204, 8205, 8310"
+# - berkas pemetaan kode -> label : "@kode.txt" (satu entri per baris,
+#   "kode<TAB>label" / "kode=label" / "kode;label" / "kode,label", '#' komentar)
+# Mode pencocokan untuk entri literal (huruf/angka/-/_):
+# - exact  : kode hasil normalisasi harus SAMA persis (hash set). "8204"
+#            tidak lagi cocok dengan "18204"/"82040" seperti regex search.
+# - prefix : kode diawali entri (str.startswith), mis. "82" -> 8204, 8205.
+# - regex  : semua entri = regex search (perilaku lama, substring).
+# Entri non-literal (mis. "82(04|05)") selalu diperlakukan sebagai regex dan
+# digabung menjadi SATU regex alternasi sebagai gerbang cepat sebelum pola
+# per kelompok diuji. Hasil pencocokan dimemo per nilai kode (nilai kode
+# sangat berulang), sehingga biaya per baris detail praktis satu lookup dict
+# (lihat bench_filter.py).
+
+MATCH_MODES = {
+    "exact": "Persis",
+    "prefix": "Awalan",
+    "regex": "Regex (substring)",
+}
+_LITERAL = re.compile(r"^[0-9A-Za-z_\-]+$")
+# Pemisah daftar, kecuali koma di dalam kuantifier regex (mis. "\d{2,4}")
+_LIST_SEPARATOR = re.compile(r"[,;\n](?![^{]*\})")
+_MEMO_LIMIT = 100000
+_MAP_SEPARATORS = ("\t", "=", ";", ",")
+
+
+class CodeFilter:
+    """
+    Pemeta nilai kode -> tuple label kelompok yang cocok (kosong = ditolak).
+
+    Args:
+        entries : iterable (pola, label). Label yang sama boleh dipakai
+                  beberapa pola (kelompok gabungan).
+        mode    : cara mencocokkan entri literal (lihat MATCH_MODES).
+    """
+
+    def __init__(self, entries, mode="exact"):
+        if mode not in MATCH_MODES:
+            raise ValueError(f"Mode pencocokan kode tidak dikenal: {mode}")
+        self.mode = mode
+        self.entries = [(str(p).strip(), str(label).strip()) for p, label in entries if str(p).strip()]
+        if not self.entries:
+            raise ValueError("Kode filter kosong.")
+        self.labels = list(dict.fromkeys(label for _, label in self.entries))
+
+        self._literals = {}    # kode (lower) -> tuple label (mode exact)
+        self._prefixes = []    # (awalan lower, label) (mode prefix)
+        self._patterns = []    # (regex terkompilasi, label)
+        for pattern, label in self.entries:
+            if mode == "exact" and _LITERAL.match(pattern):
+                key = pattern.lower()
+                self._literals[key] = self._literals.get(key, ()) + (label,)
+            elif mode == "prefix" and _LITERAL.match(pattern):
+                self._prefixes.append((pattern.lower(), label))
+            else:
+                self._patterns.append((re.compile(pattern, re.IGNORECASE), label))
+        # Gerbang: satu regex alternasi untuk seluruh pola non-literal
+        self._combined = None
+        if self._patterns:
+            self._combined = re.compile("|".join(f"(?:{rx.pattern})" for rx, _ in self._patterns), re.IGNORECASE)
+        self._prefix_gate = tuple(prefix for prefix, _ in self._prefixes)
+        self._memo = _Memo(self._evaluate)
+        # match(code) = subscript dict level-C; hanya kode yang belum pernah
+        # terlihat yang turun ke _evaluate() lewat __missing__
+        self.match = self._memo.__getitem__
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __repr__(self):
+        return f"CodeFilter({len(self.entries)} pola, {len(self.labels)} kelompok)"
+
+    @property
+    def multi(self):
+        return len(self.labels) > 1
+
+    # -------------------------------------------------------------------------
+    # Konstruksi
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def parse(cls, text, mode="exact"):
+        """Bangun filter dari teks input GUI/CLI (lihat format di atas)."""
+        text = (text or "").strip()
+        if text.startswith("@"):
+            return cls.from_file(text[1:].strip(), mode)
+        items = [item.strip() for item in _LIST_SEPARATOR.split(text) if item.strip()]
+        return cls(((item, item) for item in items), mode)
+
+    @classmethod
+    def from_file(cls, path, mode="exact"):
+        """Berkas pemetaan kode -> label (UTF-8)."""
+        if not os.path.exists(path):
+            raise ValueError(f"Berkas pemetaan kode tidak ditemukan: {path}")
+        entries = []
+        with open(path, "r", encoding="utf-8-sig") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                pattern, label = line, line
+                for sep in _MAP_SEPARATORS:
+                    if sep in line:
+                        pattern, label = (part.strip() for part in line.rsplit(sep, 1))
+                        break
+                entries.append((pattern, label or pattern))
+        logging.info(f"[I] PEMETAAN KODE DIMUAT: {len(entries)} pola dari {path}")
+        return cls(entries, mode)
+
+    @classmethod
+    def coerce(cls, spec, mode="exact"):
+        """Terima CodeFilter, teks input, atau list pola/(pola, label)."""
+        if isinstance(spec, cls):
+            return spec
+        if isinstance(spec, str):
+            return cls.parse(spec, mode)
+        return cls((item if isinstance(item, (tuple, list)) else (item, item) for item in spec), mode)
+
+    # -------------------------------------------------------------------------
+    # Pencocokan
+    # -------------------------------------------------------------------------
+
+    def _evaluate(self, code):
+        lowered = code.lower()
+        labels = self._literals.get(lowered, ())
+        if self._prefix_gate and lowered.startswith(self._prefix_gate):
+            labels = labels + tuple(label for prefix, label in self._prefixes if lowered.startswith(prefix))
+        if self._combined is not None and self._combined.search(code):
+            labels = labels + tuple(label for rx, label in self._patterns if rx.search(code))
+        # Urutan kelompok mengikuti urutan entri, tanpa label ganda
+        return labels if len(labels) < 2 else tuple(dict.fromkeys(labels))
+
+    def bucket_counts(self, code_counts):
+        """{label: jumlah baris} dari Counter nilai kode (mis. RowStore.value_counts(1))."""
+        counts = dict.fromkeys(self.labels, 0)
+        for code, n in code_counts.items():
+            for label in self.match(code):
+                counts[label] += n
+        return counts
+
+    def bucket_rows(self, rows, label, code_col=1):
+        """Baris `rows` yang masuk kelompok `label` (list, urutan asli)."""
+        return [row for row in rows if label in self.match(row[code_col])]
+
+
+class _Memo(dict):
+    """Memo kode -> tuple label; entri baru berhenti disimpan setelah _MEMO_LIMIT."""
+
+    def __init__(self, evaluate):
+        super().__init__()
+        self.evaluate = evaluate
+
+    def __missing__(self, code):
+        labels = self.evaluate(code)
+        if len(self) < _MEMO_LIMIT:
+            self[code] = labels
+        return labels
+
+
+def bucket_path(path, label):
+    """rekap.xlsx + '8204' -> rekap_8204.xlsx (karakter ilegal nama berkas diganti '_')."""
+    base, ext = os.path.splitext(path)
+    safe = re.sub(r'[\\/:*?"<>|\s]+', "_", label).strip("_") or "kelompok"
+    return f"{base}_{safe}{ext}"
@@ -0,0 +1,166 @@
+import os
+import sqlite3
+import hashlib
+import logging
+
+# =============================================================================
+# INDEKS DUPLIKAT (CASE NUMBER + CASE TYPE)
+# =============================================================================
+# Pengganti seen_cache {(CaseNum, CaseType): "nama_file.xlsx"}:
+# - Kunci   : digest BLAKE2b 64-bit dari (CaseNum, CaseType), disimpan sebagai
+#             int bertanda agar langsung muat di INTEGER SQLite. Peluang
+#             tabrakan ~n^2/2^65 (sekitar 3e-6 untuk 10 juta kasus).
+# - Nilai   : id file (int kecil), nama file disimpan sekali di `files`.
+# - Backing : memori (dict) secara default, atau SQLite (`path`) agar state
+#             duplikat bertahan antar sesi dan tidak dibatasi RAM.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+CREATE TABLE IF NOT EXISTS seen (digest INTEGER PRIMARY KEY, file_id INTEGER NOT NULL) WITHOUT ROWID;
+"""
+
+
+def key_digest(case_number, case_type):
+    """Digest 64-bit bertanda untuk pasangan (CaseNum, CaseType)."""
+    raw = f"{case_number}\x1f{case_type}".encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), "big", signed=True)
+
+
+class DedupIndex:
+    """
+    Indeks first-seen-wins: check_add() mengembalikan nama file pemilik
+    pertama jika kunci sudah ada, atau None (dan mencatat kunci) jika baru.
+    Mode SQLite menampung tulisan di `_pending` lalu menulis per flush()
+    (dipanggil engine setiap selesai satu file).
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.files = []          # id -> nama file
+        self._file_ids = {}      # nama file -> id
+        self._pending = {}       # digest -> file_id (belum ditulis ke SQLite)
+        self.conn = None
+        self._mem = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(SCHEMA)
+            for file_id, name in self.conn.execute("SELECT id, name FROM files ORDER BY id"):
+                self._register(name, file_id)
+            logging.info(f"[I] INDEKS DUPLIKAT DIMUAT: {len(self)} kunci dari {path}")
+        else:
+            self._mem = {}
+
+    # -------------------------------------------------------------------------
+    # Nama File <-> Id
+    # -------------------------------------------------------------------------
+
+    def _register(self, name, file_id):
+        while len(self.files) <= file_id:
+            self.files.append(None)
+        self.files[file_id] = name
+        self._file_ids[name] = file_id
+
+    def file_id(self, name):
+        file_id = self._file_ids.get(name)
+        if file_id is None:
+            file_id = len(self.files)
+            self._register(name, file_id)
+            if self.conn is not None:
+                self.conn.execute("INSERT INTO files (id, name) VALUES (?, ?)", (file_id, name))
+        return file_id
+
+    # -------------------------------------------------------------------------
+    # Operasi Indeks
+    # -------------------------------------------------------------------------
+
+    def _lookup(self, digest):
+        if self._mem is not None:
+            return self._mem.get(digest)
+        file_id = self._pending.get(digest)
+        if file_id is None:
+            row = self.conn.execute("SELECT file_id FROM seen WHERE digest=?", (digest,)).fetchone()
+            file_id = row[0] if row else None
+        return file_id
+
+    def _store(self, digest, file_id):
+        if self._mem is not None:
+            self._mem[digest] = file_id
+        else:
+            self._pending[digest] = file_id
+
+    def get(self, case_number, case_type):
+        file_id = self._lookup(key_digest(case_number, case_type))
+        return None if file_id is None else self.files[file_id]
+
+    def __contains__(self, key):
+        return self.get(*key) is not None
+
+    def check_add(self, case_number, case_type, filename):
+        """Mengembalikan nama file asal jika duplikat; jika baru, catat dan kembalikan None."""
+        return self.check_add_digest(key_digest(case_number, case_type), filename)
+
+    def check_add_digest(self, digest, filename):
+        file_id = self._lookup(digest)
+        if file_id is not None:
+            return self.files[file_id]
+        self._store(digest, self.file_id(filename))
+        return None
+
+    def set_owner(self, digest, filename):
+        """Ganti pemilik kunci (kebijakan latest_*: baris baru menggantikan yang lama)."""
+        self._store(digest, self.file_id(filename))
+
+    def add_digest(self, digest, filename):
+        """Pulihkan entri tersimpan (mis. dari state folder) tanpa menimpa yang sudah ada."""
+        if self._lookup(digest) is None:
+            self._store(digest, self.file_id(filename))
+
+    def update(self, entries):
+        for digest, filename in entries:
+            self.add_digest(digest, filename)
+        self.flush()
+
+    def items(self):
+        """Iterasi (digest, nama_file) untuk disimpan ulang."""
+        if self._mem is not None:
+            pairs = self._mem.items()
+        else:
+            self.flush()
+            pairs = self.conn.execute("SELECT digest, file_id FROM seen")
+        files = self.files
+        for digest, file_id in pairs:
+            yield digest, files[file_id]
+
+    def __len__(self):
+        if self._mem is not None:
+            return len(self._mem)
+        self.flush()
+        return self.conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def flush(self):
+        if self.conn is None:
+            return
+        if self._pending:
+            self.conn.executemany("INSERT OR REPLACE INTO seen (digest, file_id) VALUES (?, ?)",
+                                  self._pending.items())
+            self._pending = {}
+        self.conn.commit()
+
+    def clear(self):
+        self.files = []
+        self._file_ids = {}
+        self._pending = {}
+        if self._mem is not None:
+            self._mem = {}
+        else:
+            self.conn.execute("DELETE FROM seen")
+            self.conn.execute("DELETE FROM files")
+            self.conn.commit()
+
+    def close(self):
+        if self.conn is not None:
+            self.flush()
+            self.conn.close()
+            self.conn = None
@@ -0,0 +1,92 @@
+import os
+from datetime import datetime
+
+# =============================================================================
+# KEBIJAKAN DUPLIKAT & LAPORAN DUPLIKAT
+# =============================================================================
+# Kebijakan saat (CaseNum, CaseType) yang sama muncul lebih dari sekali:
+# - first        : baris pertama yang ditemukan menang (perilaku lama).
+# - latest_date  : baris dengan Opened Date terbaru menang.
+# - latest_mtime : baris dari file dengan waktu modifikasi terbaru menang.
+# - keep_all     : semua baris disimpan, kemunculan ke-2 dst. diberi tanda
+#                  di kolom "Status Duplikat".
+# Seri (rank sama) selalu dimenangkan baris yang sudah ada, sehingga hasil
+# tetap deterministik. Kebijakan latest_* dapat MENGGANTI baris lama di
+# master_data, sehingga membutuhkan engine dengan keep_rows=True.
+
+POLICIES = {
+    "first": "Pertama Ditemukan",
+    "latest_date": "Opened Date Terbaru",
+    "latest_mtime": "File Terbaru (Waktu Ubah)",
+    "keep_all": "Simpan Semua + Tandai",
+}
+REPLACING_POLICIES = ("latest_date", "latest_mtime")
+FLAG_COLUMN = "Status Duplikat"
+
+_DATE_FORMATS = ("%d/%m/%Y", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%d/%m/%Y %H:%M:%S", "%m/%d/%Y")
+_EPOCH = datetime(1899, 12, 30)
+_NO_RANK = float("-inf")
+
+
+def date_rank(val):
+    """
+    Nilai pembanding Opened Date: detik sejak epoch Excel. Menerima datetime,
+    serial Excel (angka) atau teks tanggal umum; tidak terbaca = paling lama.
+    """
+    if isinstance(val, datetime):
+        return (val - _EPOCH).total_seconds()
+    if isinstance(val, (int, float)):
+        return float(val) * 86400.0
+    text = str(val or "").strip()
+    for fmt in _DATE_FORMATS:
+        try:
+            return (datetime.strptime(text, fmt) - _EPOCH).total_seconds()
+        except ValueError:
+            continue
+    return _NO_RANK
+
+
+def mtime_rank(path):
+    try:
+        return os.path.getmtime(path)
+    except (OSError, TypeError):
+        return _NO_RANK
+
+
+def duplicate_flag(prev_file):
+    return f"DUPLIKAT (asal: {prev_file})"
+
+
+class DuplicateReport:
+    """
+    Tabel duplikat terstruktur yang diisi pada pass ekstraksi yang sama:
+    (CaseNum, CaseType) -> [sumber_pemenang, [sumber_kalah, ...]].
+    Hanya kunci yang benar-benar duplikat yang disimpan.
+    """
+
+    COLUMNS = ["Sumber Terpilih", "Sumber Lain", "Jumlah Kemunculan"]
+
+    def __init__(self):
+        self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries = {}
+
+    def record(self, key, winner, loser):
+        """Catat satu kejadian duplikat; `winner` adalah pemilik kunci setelah kejadian ini."""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.entries[key] = [winner, [loser]]
+        else:
+            entry[0] = winner
+            entry[1].append(loser)
+
+    def columns(self, key_cols):
+        return list(key_cols[:2]) + self.COLUMNS
+
+    def rows(self):
+        for (case_number, case_type), (winner, losers) in self.entries.items():
+            yield [case_number, case_type, winner, "; ".join(losers), str(len(losers) + 1)]
@@ -0,0 +1,257 @@
+import os
+import logging
+
+from pivot_reader import PivotWorkbook
+from pivot_source import pivot_source_detail, SourceDetailUnavailable
+from scanner import get_scanner, DEFAULT_TOP_ROWS, DEFAULT_LEFT_COLS
+from run_trace import TRACE, cell_count, file_size
+
+# =============================================================================
+# LOGIKA DRILL-DOWN BERSAMA (TANPA GUI)
+# =============================================================================
+# Dipakai oleh GUI (main.py / minmain.py) maupun proses worker paralel
+# (batch_pool.py). Fungsi di modul ini sengaja berada di level modul agar
+# dapat dipanggil dari proses lain (picklable). Setiap tahap (open, scan,
+# show_detail, read_detail, close) dicatat ke trace waktu (run_trace.py).
+
+SHEET_BLACKLIST = ["TABEL", "TABLE", "SHEET1"]
+
+# Pita awal scanning bertahap (baris atas, kolom kiri); None = baca seluruh used_range
+DEFAULT_SCAN_BANDS = (DEFAULT_TOP_ROWS, DEFAULT_LEFT_COLS)
+
+
+def is_blacklisted(sheet_name):
+    return sheet_name.strip().upper() in SHEET_BLACKLIST
+
+
+def find_target_coords(data_val, start_row, start_col, row_regex, col_keyword):
+    """
+    Mencari titik temu (baris, kolom) absolut pada grid nilai sheet.
+    - Baris : Priority Left-First (kolom demi kolom) dengan regex.
+    - Kolom : Priority Top-First (baris demi baris) dengan substring.
+    Mengembalikan -1 untuk koordinat yang tidak ditemukan.
+    Pemindaian single pass dengan pola terkompilasi (lihat scanner.py).
+    """
+    return get_scanner(row_regex, col_keyword).scan(data_val, start_row, start_col)
+
+
+def _raise_not_found(row_regex, col_keyword, sheet_errors):
+    if not sheet_errors:
+        raise Exception(f"Keyword Baris '{row_regex}' atau Kolom '{col_keyword}' tidak ditemukan.")
+    raise Exception("; ".join(sheet_errors))
+
+
+def open_excel_app():
+    """Membuka instance Excel tersembunyi (xlwings di-import lazy agar mode headless tidak butuh Excel)."""
+    import xlwings as xw
+    app = xw.App(visible=False)
+    app.display_alerts = False
+    app.screen_updating = False
+    return app
+
+
+# Profil buka workbook (baca saja): tanpa update link, kalkulasi manual,
+# event mati, makro otomatis workbook (Auto_Open / Workbook_Open) mati.
+# Add-in tidak dimuat karena Excel dijalankan lewat automation (xw.App).
+XL_CALCULATION_MANUAL = -4135
+MSO_AUTOMATION_FORCE_DISABLE = 3
+
+OPEN_PROFILE = (
+    ("EnableEvents", False),
+    ("AskToUpdateLinks", False),
+    ("AutomationSecurity", MSO_AUTOMATION_FORCE_DISABLE),
+    ("Calculation", XL_CALCULATION_MANUAL),
+)
+
+
+class OpenProfile:
+    """
+    Context manager: terapkan OPEN_PROFILE pada instance Excel, lalu pulihkan
+    nilai semula saat keluar (instance hangat dipakai ulang oleh batch lain).
+    Properti yang gagal di-set dilewati tanpa menggagalkan drill-down,
+    dengan peringatan di log karena run berjalan tanpa profil lengkap.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._saved = []
+
+    def __enter__(self):
+        api = self.app.api
+        for name, value in OPEN_PROFILE:
+            try:
+                previous = getattr(api, name)
+                if previous != value:
+                    setattr(api, name, value)
+                    self._saved.append((name, previous))
+            except Exception as e:
+                logging.warning(f"[-] Profil buka: {name} tidak bisa di-set, dilewati ({str(e)})")
+        return self
+
+    def __exit__(self, *exc):
+        api = self.app.api
+        for name, previous in reversed(self._saved):
+            try:
+                setattr(api, name, previous)
+            except Exception as e:
+                logging.warning(f"[-] Profil buka: {name} tidak bisa dipulihkan ({str(e)})")
+        self._saved = []
+        return False
+
+
+def open_workbook(app, path):
+    """Buka workbook read-only tanpa update link; waktu buka dicatat per file."""
+    with TRACE.stage("open", bytes=file_size(path)) as rec:
+        wb = app.books.open(path, update_links=False, read_only=True,
+                            ignore_read_only_recommended=True, add_to_mru=False)
+    logging.info(f"[I] WAKTU BUKA {os.path.basename(path)}: {rec['sec']:.2f} dtk")
+    return wb
+
+
+def _scan_bands(sheet, used_range, row_regex, col_keyword, scan_bands):
+    """
+    Scanning bertahap via COM: hanya pita atas/kiri dari used_range yang
+    ditransfer (lihat KeywordScanner.scan_progressive).
+    """
+    start_row, start_col = used_range.row, used_range.column
+    num_rows, num_cols = used_range.shape
+
+    def fetch(r0, c0, n_rows, n_cols):
+        top_left = (start_row + r0, start_col + c0)
+        bottom_right = (start_row + r0 + n_rows - 1, start_col + c0 + n_cols - 1)
+        return sheet.range(top_left, bottom_right).options(ndim=2).value
+
+    top_rows, left_cols = scan_bands
+    target_r, target_c, cells_read = get_scanner(row_regex, col_keyword).scan_progressive(
+        fetch, num_rows, num_cols, start_row, start_col, top_rows, left_cols)
+    logging.debug(f"[I] Scan bertahap {sheet.name}: {cells_read} dari {num_rows * num_cols} sel dibaca")
+    return target_r, target_c, cells_read
+
+
+def drill_down_excel(app, path, row_regex, col_keyword, scan_bands=DEFAULT_SCAN_BANDS, from_source=False):
+    """
+    Drill-down satu file melalui Excel (xlwings).
+    1. Loop semua sheet (kecuali blacklist).
+    2. Scanning koordinat kata kunci: bertahap pada pita atas/kiri
+       (`scan_bands` = (baris_atas, kolom_kiri)) atau seluruh used_range (None).
+    3. from_source=True: detail dibaca dari data sumber PivotCache tanpa
+       membuat sheet (pivot_source.py); jika tidak bisa, kembali ke langkah 4.
+    4. ShowDetail pada titik temu, lalu used_range.value dari sheet detail baru.
+    Workbook dibuka dengan profil baca saja (OpenProfile / open_workbook).
+    """
+    with OpenProfile(app):
+        return _drill_down_book(app, path, row_regex, col_keyword, scan_bands, from_source)
+
+
+def _drill_down_book(app, path, row_regex, col_keyword, scan_bands, from_source):
+    wb = open_workbook(app, path)
+    sheet_errors = []
+
+    try:
+        for sheet in wb.sheets:
+            if is_blacklisted(sheet.name):
+                logging.info(f"[-] ABAIKAN SHEET: {sheet.name} (Blacklist)")
+                continue
+
+            try:
+                with TRACE.stage("scan", sheet.name) as rec:
+                    used_range = sheet.used_range
+                    if scan_bands:
+                        target_r, target_c, rec["cells"] = _scan_bands(
+                            sheet, used_range, row_regex, col_keyword, scan_bands)
+                    else:
+                        data_val = used_range.value
+                        rec["cells"] = cell_count(data_val)
+                        if not data_val: continue
+                        target_r, target_c = find_target_coords(
+                            data_val, used_range.row, used_range.column, row_regex, col_keyword)
+
+                if target_r == -1 or target_c == -1:
+                    continue
+
+                target_cell = sheet.cells(target_r, target_c)
+                if target_cell.value is None:
+                    logging.warning(f"[-] Sel target kosong pada lembar {sheet.name}")
+                    continue
+
+                if from_source:
+                    try:
+                        with TRACE.stage("source_detail", sheet.name) as rec:
+                            data = pivot_source_detail(app, wb, target_cell)
+                            rec["cells"] = cell_count(data)
+                        return data
+                    except SourceDetailUnavailable as e:
+                        logging.info(f"[I] Sumber pivot {sheet.name} tidak dipakai ({str(e)}), memakai ShowDetail")
+
+                init_sheet_count = len(wb.sheets)
+                with TRACE.stage("show_detail", sheet.name):
+                    target_cell.api.ShowDetail = True
+
+                if len(wb.sheets) <= init_sheet_count:
+                    logging.warning(f"[-] Drill down tidak menghasilkan lembar baru pada {sheet.name}")
+                    continue
+
+                with TRACE.stage("read_detail", sheet.name) as rec:
+                    data = wb.sheets.active.used_range.value
+                    rec["cells"] = cell_count(data)
+                return data
+
+            except Exception as inner_e:
+                sheet_errors.append(f"{sheet.name}: {str(inner_e)}")
+                continue
+
+        _raise_not_found(row_regex, col_keyword, sheet_errors)
+
+    finally:
+        with TRACE.stage("close"):
+            wb.close()
+
+
+def drill_down_headless(path, row_regex, col_keyword):
+    """
+    Drill-down satu file .xlsx tanpa Excel (lihat pivot_reader.py).
+    Alur identik dengan drill_down_excel.
+    """
+    sheet_errors = []
+
+    with TRACE.stage("open", bytes=file_size(path)):
+        wb = PivotWorkbook(path)
+    with wb:
+        for sheet_name in wb.sheet_names:
+            if is_blacklisted(sheet_name):
+                logging.info(f"[-] ABAIKAN SHEET: {sheet_name} (Blacklist)")
+                continue
+
+            try:
+                with TRACE.stage("scan", sheet_name) as rec:
+                    data_val, start_row, start_col = wb.read_sheet(sheet_name)
+                    rec["cells"] = cell_count(data_val)
+                    if not data_val: continue
+
+                    target_r, target_c = find_target_coords(
+                        data_val, start_row, start_col, row_regex, col_keyword)
+
+                if target_r == -1 or target_c == -1:
+                    continue
+
+                if data_val[target_r - start_row][target_c - start_col] is None:
+                    logging.warning(f"[-] Sel target kosong pada lembar {sheet_name}")
+                    continue
+
+                with TRACE.stage("show_detail", sheet_name) as rec:
+                    data = wb.show_detail(sheet_name, target_r, target_c)
+                    rec["cells"] = cell_count(data)
+                return data
+
+            except Exception as inner_e:
+                sheet_errors.append(f"{sheet_name}: {str(inner_e)}")
+                continue
+
+    _raise_not_found(row_regex, col_keyword, sheet_errors)
+
+
+def drill_down_file(app, path, row_regex, col_keyword, scan_bands=DEFAULT_SCAN_BANDS, from_source=False):
+    """Dispatcher: `app` None berarti mode headless (selalu membaca Pivot Cache, tanpa ShowDetail)."""
+    if app is None:
+        return drill_down_headless(path, row_regex, col_keyword)
+    return drill_down_excel(app, path, row_regex, col_keyword, scan_bands, from_source)
@@ -0,0 +1,437 @@
+import os
+import re
+import logging
+from itertools import compress
+
+from drilldown import drill_down_file, DEFAULT_SCAN_BANDS
+from excel_pool import ExcelPool
+from batch_pool import iter_parallel
+from result_cache import cached_drill_down
+from normalize import normalize_val, normalize_column, take_column, DATE_FORMAT
+from pipeline import close_all
+from run_trace import TRACE
+from row_store import RowStore
+from dedup_index import DedupIndex, key_digest
+from code_filter import CodeFilter
+from schema import SCHEMAS
+from dedup_policy import (POLICIES, REPLACING_POLICIES, FLAG_COLUMN, DuplicateReport,
+                          date_rank, mtime_rank, duplicate_flag)
+
+# =============================================================================
+# ENGINE REKAP (TANPA GUI)
+# =============================================================================
+# Pipeline worker_process -> process_single_file -> extract_data_manual yang
+# sebelumnya tertanam di kelas GUI. Modul ini TIDAK meng-import tkinter
+# maupun xlwings (xlwings baru di-import saat Excel benar-benar dibutuhkan),
+# sehingga bisa dipakai dari CLI (rekap_cli.py) di server Linux tanpa display.
+#
+# Layout kolom hasil (skema deklaratif di schema.py):
+# - "standar"    : layout main.py (kolom tetap, Unit Kerja di indeks 18)
+# - "bertingkat" : layout minmain.py (kolom Unit Kerja & Kanca dicari dinamis)
+# Kolom terakhir selalu nama berkas sumber.
+
+SOURCE_COLUMNS = {
+    "standar": "Sumber",
+    "bertingkat": "Sumber Berkas",
+}
+
+LAYOUTS = {layout: schema.names + [SOURCE_COLUMNS[layout]] for layout, schema in SCHEMAS.items()}
+
+# Kolom berulang yang di-dictionary-encode di RowStore (Field berulang + Sumber).
+# Kolom "Status Duplikat" (kebijakan keep_all) disisipkan sebelum kolom Sumber
+# sehingga Sumber tetap kolom terakhir.
+DICT_COLUMNS = {layout: schema.repeated() + (len(schema.fields),) for layout, schema in SCHEMAS.items()}
+
+
+def layout_columns(layout, policy="first"):
+    cols = list(LAYOUTS[layout])
+    if policy == "keep_all":
+        cols.insert(len(cols) - 1, FLAG_COLUMN)
+    return cols
+
+
+def _no_progress(value, text):
+    pass
+
+
+def clean_error_msg(error_obj):
+    """
+    Membersihkan pesan error dari Exception Object agar human-readable.
+    Menangani error spesifik COM Interop Excel dan Exception buatan sendiri.
+    """
+    raw_msg = str(error_obj)
+    if "ShowDetail" in raw_msg:
+        return "Gagal Drill-Down: Sel target terkunci atau bukan bagian Pivot Table."
+    if "tidak ketemu" in raw_msg:
+        return raw_msg
+    if "Exception occurred" in raw_msg or "-2147" in raw_msg:
+        match = re.search(r"Microsoft Excel', '(.*?)',", raw_msg)
+        if match:
+            err_desc = match.group(1)
+            if "ShowDetail" in err_desc:
+                return "Gagal Drill-Down: Sel bukan bagian Pivot Table."
+            return f"Galat Excel: {err_desc}"
+        return "Galat Komunikasi Excel (COM Error)."
+    return raw_msg
+
+
+class RecapEngine:
+    """
+    Engine rekapitulasi: drill-down, filter kode, dan cek duplikat global.
+
+    Teknis:
+    - master_data : RowStore hasil akhir (urut sesuai file diproses)
+    - dedup       : DedupIndex (CaseNum, CaseType) -> SumberFile untuk cek duplikat
+    - duplicates  : DuplicateReport (kunci, sumber terpilih, sumber lain)
+    - failed_files: [{'file', 'msg'}] file yang gagal diproses
+    Data TIDAK di-reset antar run agar bisa akumulasi (panggil reset()).
+    keep_rows=False: baris hanya dialirkan ke konsumen (pipeline.py), tidak
+    ditumpuk di master_data; cek duplikat tetap berlaku lintas file.
+    dedup_path: berkas SQLite indeks duplikat agar bertahan antar sesi.
+    policy    : kebijakan duplikat (lihat dedup_policy.py).
+    detail_source: mode Excel membaca detail dari data sumber PivotCache
+               tanpa ShowDetail (pivot_source.py), fallback ke ShowDetail.
+    excel_engine: mesin Excel mode non-headless tanpa `excel_pool`
+               ("excel" / "fake", lihat excel_pool.EXCEL_ENGINES).
+    log_sample: event per baris (ADD / DUPLIKASI) hanya dihitung per file;
+               N > 0 = tulis setiap event ke-N sebagai contoh (level DEBUG).
+    """
+
+    def __init__(self, layout="bertingkat", keep_rows=True, dedup_path=None, policy="first"):
+        if layout not in LAYOUTS:
+            raise ValueError(f"Layout tidak dikenal: {layout}")
+        self.layout = layout
+        self.schema = SCHEMAS[layout]
+        self.date_format = DATE_FORMAT if layout == "bertingkat" else None
+        self.keep_rows = keep_rows
+        self.detail_source = False
+        self.excel_engine = "excel"
+        self.log_sample = 0
+        self.failed_files = []
+        self.aborted = False    # Batch terakhir berhenti karena kegagalan sistem (lihat run)
+        self.dedup = DedupIndex(dedup_path)
+        self.duplicates = DuplicateReport()
+        self._winners = {}      # digest -> (indeks baris, rank) untuk kebijakan latest_*
+        self.set_policy(policy)
+
+    def set_policy(self, policy):
+        """
+        Ganti kebijakan duplikat; baris aktif & status kebijakan dikosongkan
+        karena kolom/aturan berubah. Indeks duplikat tidak disentuh (bisa
+        persisten, --dedup-db); pengosongan total lewat reset().
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Kebijakan duplikat tidak dikenal: {policy}")
+        if policy in REPLACING_POLICIES and not self.keep_rows:
+            raise ValueError(f"Kebijakan '{policy}' mengganti baris lama sehingga membutuhkan keep_rows=True")
+        self.policy = policy
+        self.cols = layout_columns(self.layout, policy)
+        self.master_data = self.new_store()
+        self.duplicates.clear()
+        self._winners = {}
+
+    def new_store(self, rows=None):
+        dict_cols = set(DICT_COLUMNS[self.layout])
+        if self.policy == "keep_all":
+            # Kolom sisipan menggeser Sumber satu posisi ke kanan
+            source_idx = len(LAYOUTS[self.layout]) - 1
+            dict_cols = {i + 1 if i >= source_idx else i for i in dict_cols} | {source_idx}
+        return RowStore(self.cols, dict_cols, rows)
+
+    def reset(self):
+        self.master_data = self.new_store()
+        self.failed_files = []
+        self.dedup.clear()
+        self.duplicates.clear()
+        self._winners = {}
+
+    def restore(self, rows, seen_entries):
+        """
+        Muat hasil rekap tersimpan (mis. state mode folder) sebagai data aktif.
+        `seen_entries` = iterable (digest, nama_file) dari DedupIndex.items().
+        """
+        self.master_data = self.new_store(rows)
+        self.dedup.clear()
+        self.dedup.update(seen_entries)
+        self.duplicates.clear()
+        self._winners = {}
+        if self.policy in REPLACING_POLICIES:
+            # Rank file asal baris lama tidak diketahui (hanya nama file): tanggal
+            # dipakai untuk latest_date, latest_mtime menganggapnya paling lama.
+            for i, row in enumerate(self.master_data):
+                rank = date_rank(row[self.schema.date_field]) if self.policy == "latest_date" else float("-inf")
+                self._winners[key_digest(row[0], row[1])] = (i, rank)
+
+    def normalize_val(self, val):
+        return normalize_val(val, self.date_format)
+
+    # =========================================================================
+    # [ EKSEKUSI BATCH ]
+    # =========================================================================
+
+    def run(self, file_paths, row_kw, col_kw, filter_code, headless=False, workers=1, cache=None,
+            progress=None, consumers=(), excel_pool=None):
+        """
+        Menjalankan satu batch sampai selesai (pengganti worker_process GUI).
+        `progress(value, text)` dipanggil per tahap file; baris baru setiap
+        file langsung dikirim ke `consumers` (lihat pipeline.py) yang ditutup
+        di akhir batch. Kegagalan sistem (mis. Excel tidak bisa dibuka atau
+        konsumen gagal menulis) dicatat ke failed_files dan menandai
+        `aborted`. `excel_pool` (excel_pool.ExcelPool) menjaga instance Excel
+        tetap hangat antar batch.
+        """
+        self.aborted = False
+        try:
+            for index, path, added, error in self.iter_files(
+                    file_paths, row_kw, col_kw, filter_code, headless, workers, cache, progress, excel_pool):
+                for consumer in consumers:
+                    consumer.on_file(index, path, added, error)
+        except Exception as e:
+            logging.critical(f"[!] KEGAGALAN SISTEM: {str(e)}", exc_info=True)
+            self.failed_files.append({'file': "KESALAHAN SISTEM", 'msg': str(e)})
+            self.aborted = True
+        finally:
+            close_all(consumers)
+            TRACE.log_summary()
+        return self.master_data
+
+    def iter_files(self, file_paths, row_kw, col_kw, filter_code, headless=False, workers=1, cache=None,
+                   progress=None, excel_pool=None):
+        """
+        Generator per file: (index, path, baris_baru, pesan_error).
+        Baris baru sudah masuk master_data (jika keep_rows) ketika di-yield,
+        sehingga pemanggil bisa menampilkan/menulis hasil tanpa menunggu
+        batch selesai. Trace waktu per tahap (run_trace.TRACE) dimulai ulang
+        per batch.
+        """
+        progress = progress or _no_progress
+        TRACE.reset()
+        # Parse sekali per batch (berkas pemetaan dibaca sekali, memo kode dipakai lintas file)
+        filter_code = CodeFilter.coerce(filter_code)
+        if workers > 1 and len(file_paths) > 1:
+            yield from self._iter_parallel(file_paths, row_kw, col_kw, filter_code, headless, workers, cache, progress)
+        else:
+            yield from self._iter_sequential(file_paths, row_kw, col_kw, filter_code, headless, cache, progress,
+                                             excel_pool)
+
+    def _iter_sequential(self, file_paths, row_kw, col_kw, filter_code, headless, cache, progress, excel_pool=None):
+        """
+        Satu Excel (atau headless) untuk seluruh file; Excel baru diambil saat
+        ada cache miss. Tanpa `excel_pool`, instance dibuat untuk batch ini
+        saja lalu ditutup (perilaku lama).
+        """
+        pool = excel_pool if excel_pool is not None else ExcelPool(size=0, engine=self.excel_engine)
+        lease = None
+        try:
+            total_files = len(file_paths)
+
+            for index, path in enumerate(file_paths):
+                filename = os.path.basename(path)
+                progress(index, f"Memproses ({index+1}/{total_files}): {filename}")
+                logging.info(f"[>] MEMULAI BERKAS: {filename}")
+
+                needs_excel = not headless and not (cache and cache.contains(path, row_kw, col_kw))
+                if lease is None and needs_excel:
+                    progress(index, "Menyiapkan Mesin Excel...")
+                    lease = pool.acquire()
+
+                error = None
+                failure = None
+                added = []
+                TRACE.begin_file(path)
+                try:
+                    with TRACE.stage("file"):
+                        added = self.process_single_file(lease.app if lease else None, path, row_kw, col_kw,
+                                                         filter_code, cache)
+                    logging.info(f"[+] SELESAI BERKAS: {filename}")
+                except Exception as e:
+                    logging.error(f"[!] GALAT FATAL {filename}: {str(e)}")
+                    failure = e
+                    error = clean_error_msg(e)
+                    self.failed_files.append({'file': filename, 'msg': error})
+
+                if lease is not None and needs_excel:
+                    # Daur ulang setelah N workbook / galat COM (lease None = ambil baru nanti)
+                    lease = pool.after_book(lease, failure)
+
+                progress(index + 1, f"Selesai: {filename}")
+                yield index, path, added, error
+        finally:
+            pool.release(lease)
+            if excel_pool is None:
+                pool.shutdown()
+
+    def _iter_parallel(self, file_paths, row_kw, col_kw, filter_code, headless, workers, cache, progress):
+        """
+        Mode paralel: N proses worker masing-masing memegang engine sendiri.
+        Hasil drill-down diterima sesuai urutan input lalu digabung di sini
+        sehingga aturan first-seen-wins tetap deterministik.
+        """
+        progress(0, f"Menyiapkan {workers} Proses Pekerja...")
+        total_files = len(file_paths)
+
+        for index, path, raw_data, error in iter_parallel(file_paths, row_kw, col_kw, workers, headless, cache,
+                                                          self.detail_source, self.excel_engine):
+            filename = os.path.basename(path)
+            added = []
+            if error is None:
+                TRACE.begin_file(path)
+                added = self.extract_data_manual(raw_data, filename, filter_code, path)
+                logging.info(f"[+] SELESAI BERKAS: {filename}")
+            else:
+                logging.error(f"[!] GALAT FATAL {filename}: {error}")
+                error = clean_error_msg(error)
+                self.failed_files.append({'file': filename, 'msg': error})
+
+            progress(index + 1, f"Selesai ({index+1}/{total_files}): {filename}")
+            yield index, path, added, error
+
+    # =========================================================================
+    # [ PEMROSESAN BERKAS ]
+    # =========================================================================
+
+    def process_single_file(self, app, path, row_regex, col_keyword, filter_code, cache=None,
+                            scan_bands=DEFAULT_SCAN_BANDS):
+        """
+        Memproses satu file Excel.
+        Navigasi sheet, scanning koordinat dan drill-down ada di drilldown.py
+        (app None = headless); data mentah drill-down dapat diambil dari /
+        disimpan ke `cache` (result_cache.py). Mengembalikan baris baru.
+        """
+        raw_extracted_data = cached_drill_down(
+            cache, lambda: drill_down_file(app, path, row_regex, col_keyword, scan_bands, self.detail_source),
+            path, row_regex, col_keyword)
+        return self.extract_data_manual(raw_extracted_data, os.path.basename(path), filter_code, path)
+
+    # =========================================================================
+    # [ EKSTRAKSI DATA & CEK DUPLIKAT ]
+    # =========================================================================
+
+    def extract_data_manual(self, raw_data, filename, filter_code, path=None):
+        """
+        Mengekstrak data dari list mentah hasil drill-down (baris 0 = header).
+        Kolom dipetakan lewat skema layout (schema.py), lalu filter kode,
+        normalisasi data, dan PENGECEKAN DUPLIKAT
+        sesuai kebijakan (self.policy); kejadian duplikat dicatat ke
+        self.duplicates pada pass yang sama. Mengembalikan list baris baru
+        (ditambahkan ke master_data jika keep_rows). Baris lama yang diganti
+        kebijakan latest_* diperbarui langsung di master_data.
+        Waktu & hitungan baris dicatat ke trace (tahap "extract").
+        """
+        with TRACE.stage("extract", rows=len(raw_data) - 1 if raw_data else 0) as rec:
+            return self._extract_rows(raw_data, filename, filter_code, path, rec)
+
+    def _extract_rows(self, raw_data, filename, filter_code, path, rec):
+        rec["matched"] = rec["added"] = rec["duplicates"] = 0
+        if not raw_data or len(raw_data) < 2:
+            logging.warning("[-] Data hasil ekstraksi kosong atau hanya header.")
+            return []
+
+        header_row = raw_data[0]
+        data_rows = raw_data[1:]
+
+        # Indeks kolom sheet detail per Field skema (dimemo per header identik)
+        schema = self.schema
+        col_idx = schema.resolve(header_row)
+        code_idx = col_idx[schema.code_field]
+        date_idx = col_idx[schema.date_field]
+
+        match_code = CodeFilter.coerce(filter_code).match
+        date_format = self.date_format
+        policy = self.policy
+        file_rank = mtime_rank(path) if policy == "latest_mtime" else None
+        base = len(self.master_data)
+        added = []
+        # Event per baris dihitung, bukan di-log (lihat log_setup.py)
+        sample = self.log_sample if self.log_sample > 0 and logging.getLogger().isEnabledFor(logging.DEBUG) else 0
+        kept = replaced = skipped = 0
+
+        # 1. Filter Kode: hanya kolom kode yang dinormalisasi untuk seluruh
+        #    sheet; kolom lain menunggu hasil filter. Filter dievaluasi sekali
+        #    per nilai kode unik, lalu disebar ke baris.
+        codes = normalize_column(take_column(data_rows, code_idx), date_format, memo=True)
+        accepted = {code for code in set(codes) if match_code(code)}
+        if not accepted:
+            logging.info(f"[I] Ekstraksi 0 baris valid dari {filename}")
+            return added
+        flags = list(map(accepted.__contains__, codes))
+        rows = list(compress(data_rows, flags))
+        rec["matched"] = len(rows)
+
+        # 2. Extract Fields (per kolom, hanya baris yang lolos filter)
+        columns = [
+            list(compress(codes, flags)) if i == schema.code_field else
+            normalize_column(take_column(rows, idx), date_format, memo=field.repeated)
+            for i, (field, idx) in enumerate(zip(schema.fields, col_idx))
+        ]
+        values = list(zip(*columns))
+
+        for pos, row in enumerate(rows):
+            # Baris hasil: [field skema..., (Status Duplikat), Sumber]
+            new_row = list(values[pos])
+            val_a = new_row[0]                    # Case Number
+            val_b = new_row[schema.code_field]    # Case Type
+            if policy == "keep_all":
+                new_row.append("")
+            new_row.append(filename)
+
+            # 3. DUPLICATE CHECKING (Global Index)
+            # Kunci unik: Kombinasi Case Number + Case Type (dicatat jika baru)
+            digest = key_digest(val_a, val_b)
+            prev_file = self.dedup.check_add_digest(digest, filename)
+
+            if prev_file is None:
+                # 4. Save Valid Data
+                if policy in REPLACING_POLICIES:
+                    rank = file_rank if file_rank is not None else date_rank(row[date_idx] if len(row) > date_idx else None)
+                    self._winners[digest] = (base + len(added), rank)
+                added.append(new_row)
+                if sample and len(added) % sample == 0:
+                    logging.debug(f"[+] ADD (sampel 1/{sample}): {val_a} | {val_b}")
+                continue
+
+            key = (val_a, val_b)
+            rec["duplicates"] += 1
+            if policy == "keep_all":
+                new_row[-2] = duplicate_flag(prev_file)
+                self.duplicates.record(key, prev_file, filename)
+                added.append(new_row)
+                kept += 1
+                action = "Disimpan + ditandai"
+            elif policy in REPLACING_POLICIES and self._replace_if_newer(digest, new_row, row, date_idx, file_rank,
+                                                                         base, added):
+                self.dedup.set_owner(digest, filename)
+                self.duplicates.record(key, filename, prev_file)
+                replaced += 1
+                action = "Menggantikan baris lama"
+            else:
+                self.duplicates.record(key, prev_file, filename)
+                skipped += 1
+                action = "Mengabaikan"
+            if sample and rec["duplicates"] % sample == 0:
+                logging.debug(f"[D] DUPLIKASI (sampel 1/{sample}): {val_a} (Tipe {val_b}). "
+                              f"Sumber Asal: {prev_file}. {action}.")
+
+        self.dedup.flush()
+        if self.keep_rows:
+            self.master_data.extend(added)
+        rec["added"] = len(added)
+        if rec["duplicates"]:
+            logging.info(f"[D] DUPLIKASI {filename}: {rec['duplicates']} baris "
+                         f"({kept} ditandai, {replaced} menggantikan, {skipped} diabaikan)")
+        logging.info(f"[I] Ekstraksi {len(added)} baris valid dari {filename}")
+        return added
+
+    def _replace_if_newer(self, digest, new_row, raw_row, date_idx, file_rank, base, added):
+        """Kebijakan latest_*: ganti baris pemenang lama jika rank baru LEBIH besar (seri = lama menang)."""
+        winner = self._winners.get(digest)
+        rank = file_rank if file_rank is not None else date_rank(raw_row[date_idx] if len(raw_row) > date_idx else None)
+        if winner is None or not rank > winner[1]:
+            return False
+        idx = winner[0]
+        if idx >= base:
+            added[idx - base] = new_row          # Pemenang lama berasal dari file yang sama
+        else:
+            self.master_data.replace(idx, new_row)
+        self._winners[digest] = (idx, rank)
+        return True
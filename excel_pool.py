@@ -0,0 +1,176 @@
+import logging
+import threading
+
+from drilldown import open_excel_app
+from fake_excel import open_fake_app, attach_fake_app
+
+# =============================================================================
+# POOL INSTANCE EXCEL HANGAT (LINTAS BATCH)
+# =============================================================================
+# Cold start xw.App(visible=False) memakan 3-10 detik. ExcelPool menyimpan
+# instance Excel tersembunyi yang sudah hidup di antara batch (klik START
+# berikutnya langsung memakai instance yang sama):
+# - acquire()    : ambil instance sehat dari pool (health check), atau buat baru.
+# - after_book() : dipanggil per workbook; instance didaur ulang (quit + buat
+#                  baru saat dibutuhkan) setelah `max_books` workbook atau
+#                  setelah galat COM, untuk membatasi kebocoran memori Excel.
+# - release()    : kembalikan ke pool (workbook sisa ditutup) atau quit jika
+#                  pool penuh.
+# - shutdown()   : quit semua instance (saat aplikasi ditutup).
+# Objek COM terikat ke utas pembuatnya, sedangkan GUI memakai utas worker
+# baru di setiap batch. Karena itu pool menyimpan PID proses Excel, lalu
+# setiap utas menempel ulang lewat xw.apps[pid] (proxy baru milik utas itu).
+#
+# Mesin Excel dipilih lewat nama (picklable, ikut dikirim ke proses worker):
+# - "excel" : xlwings + desktop Excel
+# - "fake"  : Excel tiruan in-process (fake_excel.py) untuk uji beban /
+#             profiling di Linux tanpa Excel
+
+DEFAULT_MAX_BOOKS = 200
+
+
+def attach_excel_app(pid):
+    import xlwings as xw
+    return xw.apps[pid]
+
+
+# nama -> (buat instance baru, tempel ulang instance per PID)
+EXCEL_ENGINES = {
+    "excel": (open_excel_app, attach_excel_app),
+    "fake": (open_fake_app, attach_fake_app),
+}
+
+
+def is_com_error(error):
+    """Galat COM/RPC Excel (instance kemungkinan rusak atau macet)."""
+    text = str(error)
+    return type(error).__name__ == "com_error" or "-2147" in text or "RPC" in text
+
+
+class ExcelLease:
+    """Satu instance Excel yang sedang dipinjam oleh satu utas."""
+
+    def __init__(self, app, pid, books=0, keep_books=()):
+        self.app = app
+        self.pid = pid
+        self.books = books                  # Jumlah workbook yang sudah diproses
+        self.keep_books = set(keep_books)   # Workbook bawaan instance (jangan ditutup)
+        self.owner = threading.get_ident()
+
+
+class ExcelPool:
+    """
+    Pool instance Excel hangat untuk satu proses.
+
+    Args:
+        size      : jumlah instance menganggur maksimum yang dibiarkan hidup.
+        max_books : daur ulang instance setelah sekian workbook.
+        engine    : nama mesin Excel di EXCEL_ENGINES ("excel" / "fake").
+    """
+
+    def __init__(self, size=1, max_books=DEFAULT_MAX_BOOKS, engine="excel"):
+        self.size = size
+        self.max_books = max_books
+        self.engine = engine
+        self.factory, self.attach = EXCEL_ENGINES[engine]
+        self._idle = []          # ExcelLease menganggur (app milik utas lain: ditempel ulang)
+        self._lock = threading.Lock()
+        self.started = 0         # Statistik: instance dibuat / didaur ulang
+        self.recycled = 0
+
+    # -------------------------------------------------------------------------
+    # Siklus Hidup Instance
+    # -------------------------------------------------------------------------
+
+    def _spawn(self):
+        app = self.factory()
+        self.started += 1
+        keep = [book.name for book in app.books]
+        logging.info(f"[+] EXCEL BARU: PID {app.pid} (total dibuat: {self.started})")
+        return ExcelLease(app, app.pid, keep_books=keep)
+
+    def _attach(self, lease):
+        """Proxy COM milik utas pemanggil untuk instance di `lease`; None jika instance mati."""
+        try:
+            if lease.owner != threading.get_ident():
+                lease.app = self.attach(lease.pid)
+                lease.owner = threading.get_ident()
+            len(lease.app.books)  # Health check: instance masih menjawab COM
+            return lease
+        except Exception as e:
+            logging.warning(f"[-] EXCEL PID {lease.pid} TIDAK SEHAT: {str(e)}")
+            self._quit(lease)
+            return None
+
+    def _quit(self, lease):
+        try:
+            lease.app.quit()
+        except Exception:
+            try:
+                lease.app.kill()
+            except Exception:
+                pass
+
+    def _close_stray_books(self, lease):
+        for book in list(lease.app.books):
+            if book.name not in lease.keep_books:
+                book.close()
+
+    # -------------------------------------------------------------------------
+    # API
+    # -------------------------------------------------------------------------
+
+    def acquire(self):
+        """Instance sehat siap pakai (hangat jika ada di pool)."""
+        while True:
+            with self._lock:
+                lease = self._idle.pop() if self._idle else None
+            if lease is None:
+                return self._spawn()
+            lease = self._attach(lease)
+            if lease is not None:
+                logging.info(f"[I] EXCEL HANGAT DIPAKAI: PID {lease.pid} ({lease.books} workbook sebelumnya)")
+                return lease
+
+    def after_book(self, lease, error=None):
+        """
+        Catat satu workbook selesai. Mengembalikan lease yang sama, atau None
+        jika instance didaur ulang (pemanggil acquire() lagi saat perlu).
+        """
+        lease.books += 1
+        reason = None
+        if error is not None and is_com_error(error):
+            reason = f"galat COM: {str(error)[:80]}"
+        elif self.max_books and lease.books >= self.max_books:
+            reason = f"{lease.books} workbook"
+        if reason is None:
+            return lease
+        logging.info(f"[I] DAUR ULANG EXCEL PID {lease.pid} ({reason})")
+        self.recycled += 1
+        self._quit(lease)
+        return None
+
+    def release(self, lease):
+        """Kembalikan instance ke pool; quit jika pool sudah penuh atau instance rusak."""
+        if lease is None:
+            return
+        try:
+            self._close_stray_books(lease)
+        except Exception as e:
+            logging.warning(f"[-] EXCEL PID {lease.pid} GAGAL DIBERSIHKAN: {str(e)}")
+            self._quit(lease)
+            return
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(lease)
+                return
+        self._quit(lease)
+
+    def shutdown(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for lease in idle:
+            if self._attach(lease) is not None:
+                self._quit(lease)
+        if idle:
+            logging.info(f"[I] POOL EXCEL DITUTUP: {len(idle)} instance")
@@ -0,0 +1,256 @@
+import os
+import re
+import csv
+import zipfile
+import logging
+from xml.sax.saxutils import escape
+
+# =============================================================================
+# EKSPOR MASSAL TANPA EXCEL COM
+# =============================================================================
+# Menulis hasil rekap langsung dari row store secara bertahap (chunk):
+# - .xlsx    : writer streaming (zip + XML, inline string) - memori konstan,
+#              tanpa membuka Excel dan tanpa menyalin data ke DataFrame.
+# - .csv     : UTF-8 dengan BOM agar langsung terbaca benar oleh Excel.
+# - .parquet : via pyarrow (opsional), ditulis per row group.
+# `progress(done, total)` dipanggil setiap chunk agar GUI bisa menampilkan
+# kemajuan; fungsi ini aman dijalankan di utas latar belakang.
+
+DEFAULT_CHUNK = 5000
+EXPORT_FORMATS = ("xlsx", "csv", "parquet")
+SHEET_NAME = "Rekap"
+
+# Karakter kontrol yang tidak sah di XML 1.0 (selain tab/LF/CR)
+_ILLEGAL_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+# Jalur cepat: sebagian besar nilai tidak perlu di-escape sama sekali
+_NEEDS_ESCAPE = re.compile(r"[<>&\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+class ExportError(Exception):
+    pass
+
+
+def _no_progress(done, total):
+    pass
+
+
+def detect_format(path):
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    if ext not in EXPORT_FORMATS:
+        raise ExportError(f"Format ekspor tidak didukung: .{ext}")
+    return ext
+
+
+def iter_chunks(rows, chunk_size=DEFAULT_CHUNK):
+    """Potong store menjadi chunk tanpa menyalin seluruh isi sekaligus."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def export_rows(path, cols, rows, fmt=None, progress=None, chunk_size=DEFAULT_CHUNK):
+    """
+    Ekspor `rows` (sequence baris, mis. engine.master_data) ke `path`.
+    Format ditentukan dari ekstensi jika `fmt` None. Mengembalikan jumlah baris.
+    Berkas ditulis ke .tmp dulu lalu di-replace, sehingga gagal di tengah
+    tidak meninggalkan berkas rusak.
+    """
+    fmt = fmt or detect_format(path)
+    writer = {"xlsx": write_xlsx, "csv": write_csv, "parquet": write_parquet}.get(fmt)
+    if writer is None:
+        raise ExportError(f"Format ekspor tidak didukung: {fmt}")
+
+    tmp_path = path + ".tmp"
+    try:
+        count = writer(tmp_path, cols, rows, progress or _no_progress, chunk_size)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    logging.info(f"[+] EKSPOR {fmt.upper()}: {count} baris -> {path}")
+    return count
+
+
+# -----------------------------------------------------------------------------
+# CSV
+# -----------------------------------------------------------------------------
+
+def write_csv(path, cols, rows, progress, chunk_size=DEFAULT_CHUNK):
+    total = len(rows)
+    done = 0
+    with open(path, "w", encoding="utf-8-sig", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(cols)
+        for chunk in iter_chunks(rows, chunk_size):
+            writer.writerows(chunk)
+            done += len(chunk)
+            progress(done, total)
+    return done
+
+
+# -----------------------------------------------------------------------------
+# XLSX (STREAMING)
+# -----------------------------------------------------------------------------
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="' + SHEET_NAME + '" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+# Style 0 = normal, style 1 = header tebal
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '</styleSheet>'
+)
+
+
+def column_letter(index):
+    """0 -> A, 25 -> Z, 26 -> AA."""
+    letters = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _xml_text(val):
+    text = "" if val is None else str(val)
+    if _NEEDS_ESCAPE.search(text):
+        text = escape(_ILLEGAL_XML.sub("", text))
+    return text
+
+
+def _row_xml(row_num, values, prefixes, style=""):
+    """`prefixes` = ['<c r="A', '<c r="B', ...] disiapkan sekali per ekspor."""
+    cells = []
+    for prefix, val in zip(prefixes, values):
+        if val is None or val == "":
+            continue
+        text = _xml_text(val)
+        if text[:1].isspace() or text[-1:].isspace():
+            cells.append(f'{prefix}{row_num}" t="inlineStr"{style}><is><t xml:space="preserve">{text}</t></is></c>')
+        else:
+            cells.append(f'{prefix}{row_num}" t="inlineStr"{style}><is><t>{text}</t></is></c>')
+    return f'<row r="{row_num}">{"".join(cells)}</row>'
+
+
+def write_xlsx(path, cols, rows, progress, chunk_size=DEFAULT_CHUNK):
+    """
+    Writer .xlsx streaming: sheet1.xml ditulis langsung ke entri zip per chunk
+    (inline string, tanpa sharedStrings) sehingga memori tidak bergantung
+    jumlah baris. Semua nilai ditulis sebagai teks, sama seperti hasil rekap.
+    """
+    total = len(rows)
+    letters = [column_letter(i) for i in range(len(cols))]
+    prefixes = [f'<c r="{letter}' for letter in letters]
+    done = 0
+
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        zf.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _ROOT_RELS)
+        zf.writestr("xl/workbook.xml", _WORKBOOK)
+        zf.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        zf.writestr("xl/styles.xml", _STYLES)
+
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as fh:
+            last_ref = f"A1:{letters[-1]}{total + 1}" if letters else "A1"
+            fh.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                f'<dimension ref="{last_ref}"/>'
+                '<sheetViews><sheetView workbookViewId="0">'
+                '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+                '</sheetView></sheetViews>'
+                '<sheetData>'
+            ).encode("utf-8"))
+            fh.write(_row_xml(1, cols, prefixes, ' s="1"').encode("utf-8"))
+
+            row_num = 2
+            for chunk in iter_chunks(rows, chunk_size):
+                parts = []
+                for row in chunk:
+                    parts.append(_row_xml(row_num, row, prefixes))
+                    row_num += 1
+                fh.write("".join(parts).encode("utf-8"))
+                done += len(chunk)
+                progress(done, total)
+
+            fh.write('</sheetData></worksheet>'.encode("utf-8"))
+    return done
+
+
+# -----------------------------------------------------------------------------
+# PARQUET (OPSIONAL: PYARROW)
+# -----------------------------------------------------------------------------
+
+def write_parquet(path, cols, rows, progress, chunk_size=DEFAULT_CHUNK):
+    """Satu row group per chunk; kolom string dengan dictionary encoding."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportError("Ekspor Parquet membutuhkan paket 'pyarrow' (pip install pyarrow).")
+
+    total = len(rows)
+    done = 0
+    schema = pa.schema([(c, pa.string()) for c in cols])
+    with pq.ParquetWriter(path, schema, use_dictionary=True, compression="snappy") as writer:
+        for chunk in iter_chunks(rows, chunk_size):
+            columns = [pa.array([row[i] for row in chunk], type=pa.string()) for i in range(len(cols))]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            done += len(chunk)
+            progress(done, total)
+    return done
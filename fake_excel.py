@@ -0,0 +1,265 @@
+import os
+import time
+import logging
+import itertools
+import threading
+
+from pivot_reader import PivotWorkbook, PivotReaderError
+
+# =============================================================================
+# MESIN EXCEL TIRUAN (IN-PROCESS, TANPA DESKTOP EXCEL)
+# =============================================================================
+# Antarmuka mesin Excel = subset xlwings yang dipakai drilldown.py,
+# excel_pool.py dan OpenProfile (lihat EXCEL_ENGINES di excel_pool.py):
+#   app.pid, app.books (iterasi, len, open(path, **opsi)), app.api (properti
+#   Application), app.quit(), app.kill()
+#   book.name, book.sheets (iterasi, len, [nama], .active), book.close()
+#   sheet.name, sheet.used_range, sheet.range((r1, c1), (r2, c2)), sheet.cells(r, c)
+#   range.row, range.column, range.shape, range.value, range.options(ndim=2),
+#   range.api.ShowDetail = True
+# Implementasi tiruan ini membaca grid nilai sheet dari paket .xlsx lewat
+# PivotWorkbook (pivot_reader.py) secara lazy, dan mensimulasikan ShowDetail
+# seperti Excel: sheet detail baru disisipkan sebelum sheet aktif lalu
+# menjadi sheet aktif. Bentuk nilai mengikuti xlwings (satu sel = skalar,
+# satu baris/kolom = list 1D kecuali options(ndim=2)).
+# `latency` (detik) ditambahkan pada setiap panggilan "COM" (buka workbook,
+# baca nilai, ShowDetail) untuk simulasi beban; default 0.
+
+_pids = itertools.count(90001)
+_apps = {}
+_apps_lock = threading.Lock()
+
+
+class FakeExcelError(Exception):
+    pass
+
+
+def _squeeze(grid):
+    """Bentuk nilai xlwings tanpa ndim: skalar / list 1D / list 2D."""
+    if not grid:
+        return None
+    if len(grid) == 1 and len(grid[0]) == 1:
+        return grid[0][0]
+    if len(grid) == 1:
+        return list(grid[0])
+    if all(len(row) == 1 for row in grid):
+        return [row[0] for row in grid]
+    return grid
+
+
+class _Api:
+    """Properti Application / Range.api yang dibaca-tulis kode drill-down."""
+
+    def __init__(self, **props):
+        self.__dict__.update(props)
+
+
+class FakeRange:
+    def __init__(self, sheet, row, column, n_rows, n_cols, ndim=None):
+        self.sheet = sheet
+        self.row = row
+        self.column = column
+        self.shape = (n_rows, n_cols)
+        self._ndim = ndim
+        self.api = _RangeApi(self)
+
+    def options(self, ndim=None, **kwargs):
+        return FakeRange(self.sheet, self.row, self.column, self.shape[0], self.shape[1], ndim)
+
+    @property
+    def value(self):
+        self.sheet.book.app.com_call()
+        grid = self.sheet.grid_slice(self.row, self.column, *self.shape)
+        return grid if self._ndim == 2 else _squeeze(grid)
+
+
+class _RangeApi:
+    def __init__(self, rng):
+        self._rng = rng
+
+    def __setattr__(self, name, value):
+        if name == "ShowDetail" and value:
+            rng = self._rng
+            rng.sheet.book.show_detail(rng.sheet, rng.row, rng.column)
+            return
+        object.__setattr__(self, name, value)
+
+
+class FakeSheet:
+    def __init__(self, book, name, grid=None, start=(1, 1)):
+        self.book = book
+        self.name = name
+        self._grid = grid          # None = belum dibaca dari paket (lazy)
+        self._start = start
+
+    def _load(self):
+        if self._grid is None:
+            self.book.app.com_call()
+            self._grid, start_r, start_c = self.book.reader.read_sheet(self.name)
+            self._start = (start_r, start_c)
+        return self._grid
+
+    @property
+    def used_range(self):
+        grid = self._load()
+        n_rows = len(grid)
+        n_cols = max((len(row) for row in grid), default=0)
+        if not n_rows or not n_cols:
+            return FakeRange(self, 1, 1, 1, 1)   # Sheet kosong: Excel tetap mengembalikan A1
+        return FakeRange(self, self._start[0], self._start[1], n_rows, n_cols)
+
+    def range(self, top_left, bottom_right=None):
+        r1, c1 = top_left
+        r2, c2 = bottom_right or top_left
+        return FakeRange(self, r1, c1, r2 - r1 + 1, c2 - c1 + 1)
+
+    def cells(self, row, column):
+        return FakeRange(self, row, column, 1, 1)
+
+    def grid_slice(self, row, column, n_rows, n_cols):
+        grid = self._load()
+        r0, c0 = row - self._start[0], column - self._start[1]
+        out = []
+        for r in range(r0, r0 + n_rows):
+            src = grid[r] if 0 <= r < len(grid) else ()
+            out.append([src[c] if 0 <= c < len(src) else None for c in range(c0, c0 + n_cols)])
+        return out
+
+
+class _Sheets:
+    def __init__(self, book):
+        self.book = book
+        self.items = []
+        self.active = None
+
+    def __iter__(self):
+        return iter(list(self.items))
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return self.items[key]
+        for sheet in self.items:
+            if sheet.name.lower() == str(key).lower():
+                return sheet
+        raise KeyError(key)
+
+
+class FakeBook:
+    def __init__(self, app, name, reader=None):
+        self.app = app
+        self.name = name
+        self.reader = reader
+        self.sheets = _Sheets(self)
+        self.options = {}
+        if reader is not None:
+            self.sheets.items = [FakeSheet(self, sheet_name) for sheet_name in reader.sheet_names]
+        else:
+            self.sheets.items = [FakeSheet(self, "Sheet1", grid=[])]
+        self.sheets.active = self.sheets.items[0] if self.sheets.items else None
+
+    def show_detail(self, sheet, row, column):
+        """Simulasi ShowDetail: sheet detail baru sebelum sheet aktif, lalu aktif."""
+        self.app.com_call()
+        if self.reader is None:
+            raise FakeExcelError("Cannot change this part of a PivotTable report.")
+        try:
+            detail = self.reader.show_detail(sheet.name, row, column)
+        except PivotReaderError as e:
+            raise FakeExcelError(f"ShowDetail gagal: {str(e)}")
+        names = {s.name for s in self.sheets.items}
+        n = len(self.sheets.items) + 1
+        while f"Sheet{n}" in names:
+            n += 1
+        new_sheet = FakeSheet(self, f"Sheet{n}", grid=detail)
+        pos = self.sheets.items.index(self.sheets.active) if self.sheets.active in self.sheets.items else 0
+        self.sheets.items.insert(pos, new_sheet)
+        self.sheets.active = new_sheet
+
+    def close(self):
+        if self.reader is not None:
+            self.reader.close()
+        self.app.remove_book(self)
+
+
+class _Books:
+    def __init__(self, app):
+        self.app = app
+        self.items = []
+
+    def __iter__(self):
+        self.app.check_alive()
+        return iter(list(self.items))
+
+    def __len__(self):
+        self.app.check_alive()
+        return len(self.items)
+
+    def open(self, fullname, **options):
+        self.app.check_alive()
+        self.app.com_call()
+        name = os.path.basename(fullname)
+        for book in self.items:
+            if book.name == name:
+                return book
+        book = FakeBook(self.app, name, PivotWorkbook(fullname))
+        book.options = options
+        self.items.append(book)
+        return book
+
+
+class FakeApp:
+    """Pengganti xw.App(visible=False) (lihat antarmuka di header modul)."""
+
+    def __init__(self, latency=0.0):
+        self.pid = next(_pids)
+        self.latency = latency
+        self.alive = True
+        self.display_alerts = True
+        self.screen_updating = True
+        self.api = _Api(EnableEvents=True, AskToUpdateLinks=True, AutomationSecurity=1, Calculation=-4105)
+        self.books = _Books(self)
+        self.books.items.append(FakeBook(self, "Book1"))
+        with _apps_lock:
+            _apps[self.pid] = self
+
+    def com_call(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def check_alive(self):
+        if not self.alive:
+            raise FakeExcelError(f"RPC server tidak tersedia (PID {self.pid})")
+
+    def remove_book(self, book):
+        if book in self.books.items:
+            self.books.items.remove(book)
+
+    def quit(self):
+        for book in list(self.books.items):
+            book.close()
+        self.alive = False
+        with _apps_lock:
+            _apps.pop(self.pid, None)
+
+    def kill(self):
+        self.quit()
+
+
+def open_fake_app(latency=0.0):
+    app = FakeApp(latency)
+    app.display_alerts = False
+    app.screen_updating = False
+    logging.debug(f"[D] Excel tiruan dibuat: PID {app.pid}")
+    return app
+
+
+def attach_fake_app(pid):
+    """Pengganti xw.apps[pid]: objek tiruan tidak terikat utas, cukup dicari per PID."""
+    with _apps_lock:
+        app = _apps.get(pid)
+    if app is None:
+        raise FakeExcelError(f"Instance PID {pid} tidak ditemukan")
+    return app
@@ -0,0 +1,169 @@
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime
+
+from result_cache import file_sha256
+from dedup_index import key_digest
+
+# =============================================================================
+# MODE FOLDER INKREMENTAL (MANIFEST FILE TERPROSES)
+# =============================================================================
+# State disimpan di dalam folder yang dipantau, satu berkas per kombinasi
+# parameter (baris, kolom, kode, kebijakan duplikat, mode kode) karena hasil rekap
+# bergantung pada semuanya:
+#   .rekap_state_<hash-parameter>.json
+# Isi state:
+#   files       : {nama_file: {mtime, size, sha256, rows, processed_at}}
+#   master_data : baris hasil rekap yang sudah digabung
+#   seen        : [[digest, SumberFile], ...] (lihat dedup_index.py)
+# Run harian hanya men-drill-down file baru lalu menggabungkan barisnya ke
+# master_data/indeks duplikat yang tersimpan. Jika ada file berubah/dihapus,
+# folder dibangun ulang agar aturan duplikat (lihat dedup_policy.py) tetap
+# konsisten.
+
+STATE_PREFIX = ".rekap_state_"
+EXCEL_EXTENSIONS = (".xlsx", ".xlsm", ".xls", ".xlsb")
+
+
+class FolderState:
+    """Manifest file terproses + hasil rekap persisten untuk satu folder."""
+
+    def __init__(self, folder, row_kw, col_kw, filter_code, policy="first", match_mode="exact"):
+        self.folder = os.path.abspath(folder)
+        self.params = {"row": row_kw, "col": col_kw, "code": filter_code}
+        # Nilai default tidak ikut hash agar state lama tetap terpakai
+        if policy != "first":
+            self.params["policy"] = policy
+        if match_mode != "exact":
+            self.params["match"] = match_mode
+        key = hashlib.sha1(json.dumps(self.params, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        self.state_path = os.path.join(self.folder, f"{STATE_PREFIX}{key}.json")
+
+        self.files = {}
+        self.master_data = []
+        self.seen = []
+        self.pending = []      # Path file baru/berubah pada run ini
+        self.load()
+
+    # -------------------------------------------------------------------------
+    # Persistensi
+    # -------------------------------------------------------------------------
+
+    def load(self):
+        if not os.path.exists(self.state_path):
+            return
+        with open(self.state_path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        self.files = data.get("files", {})
+        self.master_data = data.get("master_data", [])
+        if "seen" in data:
+            self.seen = data["seen"]
+        else:
+            # Format lama: [[CaseNum, CaseType, SumberFile], ...]
+            self.seen = [[key_digest(a, b), src] for a, b, src in data.get("seen_cache", [])]
+        logging.info(f"[I] STATE DIMUAT: {len(self.files)} file, {len(self.master_data)} baris")
+
+    def save(self, master_data, dedup):
+        """Simpan state secara atomik (tulis berkas sementara lalu replace)."""
+        data = {
+            "params": self.params,
+            "saved_at": datetime.now().isoformat(timespec="seconds"),
+            "files": self.files,
+            "master_data": list(master_data),
+            "seen": [[digest, src] for digest, src in dedup.items()],
+        }
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+        logging.info(f"[I] STATE DISIMPAN: {len(self.files)} file, {len(data['master_data'])} baris")
+
+    # -------------------------------------------------------------------------
+    # Perencanaan Delta
+    # -------------------------------------------------------------------------
+
+    def scan_folder(self):
+        """Daftar workbook di folder (non-rekursif), urut nama; file kunci '~$' diabaikan."""
+        names = sorted(
+            name for name in os.listdir(self.folder)
+            if name.lower().endswith(EXCEL_EXTENSIONS) and not name.startswith("~$")
+        )
+        return [os.path.join(self.folder, name) for name in names]
+
+    def _is_unchanged(self, path, entry):
+        st = os.stat(path)
+        if entry.get("size") == st.st_size and entry.get("mtime") == st.st_mtime:
+            return True
+        # Ukuran/mtime berbeda: pastikan lewat hash isi (mis. file hanya di-touch)
+        if entry.get("size") == st.st_size and entry.get("sha256") == file_sha256(path):
+            entry["mtime"] = st.st_mtime
+            return True
+        return False
+
+    def plan(self):
+        """
+        Menentukan file yang perlu diproses.
+
+        - Hanya ada file baru  : delta, hasil lama dipertahankan.
+        - Ada file berubah/hilang: rebuild seluruh folder. Baris milik file
+          lama mungkin pernah "mengalahkan" duplikat dari file lain, sehingga
+          membuang barisnya saja tidak memulihkan duplikat tersebut. Dengan
+          cache drill-down aktif, file yang tidak berubah tetap tidak dibuka ulang.
+
+        Returns:
+            list path file yang harus diproses (urut nama).
+        """
+        paths = self.scan_folder()
+        present = {os.path.basename(p) for p in paths}
+
+        new_paths = []
+        changed = []
+        for path in paths:
+            name = os.path.basename(path)
+            entry = self.files.get(name)
+            if entry is None:
+                logging.info(f"[>] FILE BARU: {name}")
+                new_paths.append(path)
+            elif not self._is_unchanged(path, entry):
+                logging.info(f"[>] FILE BERUBAH: {name}")
+                changed.append(name)
+
+        removed = sorted(set(self.files) - present)
+        for name in removed:
+            logging.info(f"[-] FILE DIHAPUS DARI FOLDER: {name}")
+
+        if changed or removed:
+            logging.info("[I] Ada file berubah/dihapus: rebuild seluruh folder")
+            self.files = {}
+            self.master_data = []
+            self.seen = []
+            self.pending = paths
+        else:
+            self.pending = new_paths
+        return list(self.pending)
+
+    def commit(self, master_data, dedup, done_names=()):
+        """
+        Catat file pending yang benar-benar selesai diproses (`done_names`,
+        dikumpulkan dari callback per file) ke manifest lalu simpan state.
+        File pending lain (gagal / tidak sempat diproses) tetap dianggap
+        baru pada plan() berikutnya.
+        """
+        counts = master_data.value_counts(-1)
+        now = datetime.now().isoformat(timespec="seconds")
+        for path in self.pending:
+            name = os.path.basename(path)
+            if name not in done_names:
+                continue
+            st = os.stat(path)
+            self.files[name] = {
+                "mtime": st.st_mtime,
+                "size": st.st_size,
+                "sha256": file_sha256(path),
+                "rows": counts.get(name, 0),
+                "processed_at": now,
+            }
+        self.pending = []
+        self.save(master_data, dedup)
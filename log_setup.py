@@ -0,0 +1,76 @@
+import os
+import sys
+import queue
+import atexit
+import logging
+import logging.handlers
+
+# =============================================================================
+# LOGGING ASINKRON (QUEUEHANDLER + QUEUELISTENER)
+# =============================================================================
+# Utas pemroses hanya memasukkan record ke antrean (tanpa I/O berkas);
+# penulisan ke debug_log.txt / stderr dilakukan satu utas latar belakang
+# (QueueListener) yang di-flush saat program keluar (atexit).
+#
+# Verbositas: argumen `level`, atau variabel lingkungan REKAP_LOG_LEVEL
+# (DEBUG / INFO / WARNING / ...) yang menimpa default GUI.
+# Event per baris (ADD / DUPLIKASI) tidak di-log satu per satu; engine
+# menghitungnya per file. Mode sampel (RecapEngine.log_sample = N) menulis
+# setiap event ke-N sebagai contoh, hanya jika level DEBUG aktif.
+
+LOG_FORMAT = "%(asctime)s %(message)s"
+LOG_DATEFMT = "%H:%M:%S"
+ENV_LEVEL = "REKAP_LOG_LEVEL"
+
+_listener = None
+
+
+def resolve_level(level):
+    """Level dari REKAP_LOG_LEVEL (jika diisi) atau `level` (nama / angka)."""
+    value = os.environ.get(ENV_LEVEL) or level
+    if isinstance(value, str):
+        value = logging.getLevelName(value.strip().upper())
+    return value if isinstance(value, int) else logging.INFO
+
+
+def setup_logging(filename=None, stream=None, level=logging.INFO, filemode="w"):
+    """
+    Pasang logging asinkron pada root logger (pengganti logging.basicConfig).
+    Tujuan: `filename` (berkas) dan/atau `stream` (mis. sys.stderr).
+    Aman dipanggil ulang: listener lama dihentikan & di-flush dulu.
+    """
+    global _listener
+    stop_logging()
+
+    formatter = logging.Formatter(LOG_FORMAT, LOG_DATEFMT)
+    handlers = []
+    if filename:
+        handlers.append(logging.FileHandler(filename, mode=filemode, encoding="utf-8"))
+    if stream is not None or not handlers:
+        handlers.append(logging.StreamHandler(stream or sys.stderr))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(resolve_level(level))
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Hentikan utas penulis setelah semua record di antrean ditulis."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(stop_logging)
@@ -1,12 +1,24 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import pandas as pd
-import xlwings as xw
-import os
 import threading
+import multiprocessing
+import os
 import re
 import logging
 from datetime import datetime
+from engine import RecapEngine
+from pipeline import CallbackConsumer
+from virtual_table import VirtualTable
+from result_cache import ResultCache
+from excel_pool import ExcelPool
+from folder_state import FolderState
+from batch_pool import default_workers
+from exporter import export_rows
+from dedup_policy import POLICIES
+from code_filter import CodeFilter, MATCH_MODES, bucket_path
+from run_trace import TRACE
+from log_setup import setup_logging
+from ui_events import UIEventQueue, TICK_MS
 
 # ==========================================
 # KONFIGURASI LOGGING (FORMAT SIMBOLIS)
@@ -19,13 +31,15 @@ from datetime import datetime
 # [D] DUPLICATE : Data ganda ditemukan
 # [>] PROCESS : Memulai proses/tahapan baru
 
-logging.basicConfig(
-    filename='debug_log.txt',
-    filemode='w', # Overwrite setiap kali run
-    level=logging.DEBUG,
-    format='%(asctime)s %(message)s', # Pesan langsung dengan simbol
-    datefmt='%H:%M:%S'
-)
+# Penulisan log di utas latar belakang (lihat log_setup.py); level bisa
+# ditimpa lewat variabel lingkungan REKAP_LOG_LEVEL.
+# Dipasang di blok __main__, bukan saat import: dengan start method 'spawn'
+# (Windows) setiap worker batch_pool meng-import ulang skrip ini sebagai
+# __mp_main__ dan akan menimpa (filemode 'w') log milik proses induk.
+LOG_FILE = 'debug_log.txt'  # Overwrite setiap kali run
+
+# Trace waktu per tahap batch terakhir (JSON: record per file/sheet + p50/p95)
+TRACE_FILE = 'run_trace.json'
 
 class BRIProSystem:
     
@@ -61,14 +75,21 @@ class BRIProSystem:
         self.c_danger = "#C0392B"
         self.c_text = "#2C3E50"
 
-        # Data Structures
-        self.master_data = []      # List untuk menampung hasil akhir
-        self.failed_files = []     # List untuk tracking file error
-        self.seen_cache = {}       # Dictionary {(CaseNum, CaseType): SourceFile} untuk cek duplikat
+        # Data Structures (master_data, dedup, failed_files ada di engine)
+        self.engine = RecapEngine(layout="standar")
         self.is_processing = False
+        self.result_cache = None   # ResultCache (dibuat saat pertama dipakai)
+        self.folder_state = None   # FolderState aktif saat incremental folder mode
+        self.done_files = set()    # Nama file yang selesai tanpa galat pada batch berjalan
+        self.code_filter = None    # CodeFilter batch terakhir (multi-kode, lihat code_filter.py)
+        self.excel_pool = None     # ExcelPool: instance Excel tetap hangat antar batch
+        self.ui_events = UIEventQueue()  # Kanal event utas pekerja -> UI (lihat ui_events.py)
+        TRACE.listener = self.ui_events.post_stage
 
         self.setup_styles()
         self.create_ui()
+        self.root.after(TICK_MS, self.drain_ui_events)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     # =========================================================================
     
@@ -133,11 +154,43 @@ class BRIProSystem:
         self.entry_col.grid(row=1, column=1, padx=10, pady=5)
 
         # Input 3: Filter Code
-        tk.Label(input_frame, text="Kode Filter (Regex):", bg="white", font=("Segoe UI", 9, "bold"), fg=self.c_accent).grid(row=2, column=0, padx=10, pady=5, sticky="w")
+        tk.Label(input_frame, text="Kode Filter (a, b, c / @berkas):", bg="white", font=("Segoe UI", 9, "bold"), fg=self.c_accent).grid(row=2, column=0, padx=10, pady=5, sticky="w")
         self.entry_code = tk.Entry(input_frame, width=30, font=("Segoe UI", 10))
         self.entry_code.insert(0, "8204") 
         self.entry_code.grid(row=2, column=1, padx=10, pady=5)
 
+        # Input 4: Headless Mode (baca Pivot Cache langsung dari .xlsx, tanpa Excel)
+        self.var_headless = tk.BooleanVar(value=False)
+        tk.Checkbutton(input_frame, text="Headless Mode (.xlsx tanpa Excel)", variable=self.var_headless,
+                       bg="white", font=("Segoe UI", 9)).grid(row=3, column=0, columnspan=2, padx=10, pady=(0, 5), sticky="w")
+
+        # Input 5: Parallel Workers (1 = sekuensial)
+        tk.Label(input_frame, text="Worker Paralel:", bg="white", font=("Segoe UI", 9, "bold")).grid(row=4, column=0, padx=10, pady=5, sticky="w")
+        self.spin_workers = tk.Spinbox(input_frame, from_=1, to=max(default_workers(), 1), width=5, font=("Segoe UI", 10))
+        self.spin_workers.grid(row=4, column=1, padx=10, pady=5, sticky="w")
+
+        # Input 6: Result Cache (re-run dengan kode filter lain tanpa drill-down ulang)
+        self.var_cache = tk.BooleanVar(value=True)
+        tk.Checkbutton(input_frame, text="Gunakan Cache Drill-Down", variable=self.var_cache,
+                       bg="white", font=("Segoe UI", 9)).grid(row=5, column=0, columnspan=2, padx=10, pady=(0, 5), sticky="w")
+
+        # Input 7: Kebijakan Duplikat (lihat dedup_policy.py)
+        tk.Label(input_frame, text="Kebijakan Duplikat:", bg="white", font=("Segoe UI", 9, "bold")).grid(row=6, column=0, padx=10, pady=5, sticky="w")
+        self.combo_policy = ttk.Combobox(input_frame, values=list(POLICIES.values()), state="readonly", width=28)
+        self.combo_policy.set(POLICIES[self.engine.policy])
+        self.combo_policy.grid(row=6, column=1, padx=10, pady=5, sticky="w")
+
+        # Input 8: Mode Pencocokan Kode (exact: "8204" tidak cocok dengan "18204")
+        tk.Label(input_frame, text="Mode Kode Filter:", bg="white", font=("Segoe UI", 9, "bold")).grid(row=7, column=0, padx=10, pady=5, sticky="w")
+        self.combo_match = ttk.Combobox(input_frame, values=list(MATCH_MODES.values()), state="readonly", width=28)
+        self.combo_match.set(MATCH_MODES["exact"])
+        self.combo_match.grid(row=7, column=1, padx=10, pady=5, sticky="w")
+
+        # Input 9: Detail dari data sumber pivot (mode Excel, tanpa sheet ShowDetail)
+        self.var_source = tk.BooleanVar(value=False)
+        tk.Checkbutton(input_frame, text="Baca Sumber Pivot (tanpa ShowDetail)", variable=self.var_source,
+                       bg="white", font=("Segoe UI", 9)).grid(row=8, column=0, columnspan=2, padx=10, pady=(0, 5), sticky="w")
+
         # Action Buttons
         self.btn_run = tk.Button(controls, text="▶ START PROCESS", 
                                  bg=self.c_accent, fg="white",
@@ -146,6 +199,13 @@ class BRIProSystem:
                                  command=self.start_thread_process)
         self.btn_run.pack(side="left", fill="y", padx=(0, 10))
 
+        self.btn_folder = tk.Button(controls, text="📁 FOLDER DELTA", 
+                                    bg=self.c_primary, fg="white",
+                                    font=("Segoe UI", 10, "bold"), relief="flat", 
+                                    padx=20, pady=25, cursor="hand2", 
+                                    command=self.start_folder_process)
+        self.btn_folder.pack(side="left", fill="y", padx=(0, 10))
+
         self.btn_reset = tk.Button(controls, text="⟳ RESET", 
                                    bg=self.c_danger, fg="white",
                                    font=("Segoe UI", 10, "bold"), relief="flat", 
@@ -159,7 +219,15 @@ class BRIProSystem:
                                     padx=20, pady=25, cursor="hand2", 
                                     state="disabled", 
                                     command=self.export_to_excel)
-        self.btn_export.pack(side="left", fill="y")
+        self.btn_export.pack(side="left", fill="y", padx=(0, 10))
+
+        self.btn_dup = tk.Button(controls, text="📑 DUPLICATES", 
+                                 bg=self.c_primary, fg="white",
+                                 font=("Segoe UI", 10, "bold"), relief="flat", 
+                                 padx=20, pady=25, cursor="hand2", 
+                                 state="disabled", 
+                                 command=self.show_duplicate_window)
+        self.btn_dup.pack(side="left", fill="y")
 
         # Progress Status
         progress_frame = tk.Frame(self.root, bg="#F4F5F7")
@@ -172,72 +240,34 @@ class BRIProSystem:
         self.progress_bar.pack(fill="x", pady=5)
 
         # Result Table
+        search_frame = tk.Frame(self.root, bg="#F4F5F7")
+        search_frame.pack(fill="x", padx=20, pady=(0, 5))
+        tk.Label(search_frame, text="🔍 Filter Tabel:", bg="#F4F5F7", fg=self.c_text, font=("Segoe UI", 10)).pack(side="left")
+        self.entry_search = ttk.Entry(search_frame, width=40)
+        self.entry_search.pack(side="left", padx=5)
+        self.entry_search.bind("<KeyRelease>", self.schedule_filter)
+        self._filter_job = None
+
         table_frame = tk.Frame(self.root, bg="white")
         table_frame.pack(fill="both", expand=True, padx=20, pady=(0, 20))
 
-        sy = ttk.Scrollbar(table_frame, orient="vertical")
-        sx = ttk.Scrollbar(table_frame, orient="horizontal")
-        
-        self.cols = ["Case Number", "Case Type Number", "Deskripsi Case", "Opened Date", "Unit Kerja", "Sumber"]
-        self.tree = ttk.Treeview(table_frame, columns=self.cols, show="headings", 
-                                 yscrollcommand=sy.set, xscrollcommand=sx.set)
-        
-        sy.config(command=self.tree.yview)
-        sx.config(command=self.tree.xview)
-        sy.pack(side="right", fill="y")
-        sx.pack(side="bottom", fill="x")
-        self.tree.pack(fill="both", expand=True)
+        self.cols = self.engine.cols
+        # Tabel virtual: hanya baris yang terlihat yang dibuat sebagai item Treeview
+        self.table = VirtualTable(table_frame, self.cols, self.engine.master_data)
+        self.tree = self.table.tree
+
+        self.configure_columns()
+
+        self.tree.bind("<Control-c>", self.copy_tree)
 
+    def configure_columns(self):
+        """Lebar kolom tabel hasil (dipanggil ulang jika susunan kolom berubah)."""
         for c in self.cols:
-            self.tree.heading(c, text=c, anchor="w")
             if c == "Sumber":
                 self.tree.column(c, width=250)
             else:
                 self.tree.column(c, width=180)
 
-        self.tree.bind("<Control-c>", self.copy_tree)
-
-    # =========================================================================
-    # [ HELPER FUNCTIONS ]
-    # =========================================================================
-
-    def clean_error_msg(self, error_obj):
-        """
-        Membersihkan pesan error dari Exception Object agar human-readable.
-        Menangani error spesifik COM Interop Excel dan Exception buatan sendiri.
-        """
-        raw_msg = str(error_obj)
-        if "ShowDetail" in raw_msg:
-            return "Gagal Drill-Down: Cell bukan Pivot Table atau sheet terkunci."
-        if "tidak ketemu" in raw_msg:
-            return raw_msg 
-        if "Exception occurred" in raw_msg or "-2147" in raw_msg:
-            match = re.search(r"Microsoft Excel', '(.*?)',", raw_msg)
-            if match:
-                err_desc = match.group(1)
-                if "ShowDetail" in err_desc:
-                    return "Gagal Drill-Down: Cell bukan bagian Pivot Table."
-                return f"Excel Error: {err_desc}"
-            return "Gagal interaksi Excel (COM Error)."
-        return raw_msg
-
-    def normalize_val(self, val):
-        """
-        Normalisasi data mentah dari Excel menjadi String bersih.
-        Menangani kasus:
-        - Float dengan desimal .0 (8204.0 -> '8204')
-        - NoneType -> ''
-        - Whitespace cleaning
-        """
-        if val is None:
-            return ""
-        if isinstance(val, (float, int)):
-            if float(val).is_integer():
-                return str(int(val)) # Convert 8204.0 -> "8204"
-            else:
-                return str(val)
-        return str(val).strip()
-
     # =========================================================================
     # [ CORE LOGIC: THREADING & WORKER ]
     # =========================================================================
@@ -255,241 +285,229 @@ class BRIProSystem:
              messagebox.showwarning("Warning", "Kode Filter tidak boleh kosong.")
              return
 
+        code_filter = self.parse_code_filter(code_kw)
+        if code_filter is None: return
+
+        if not self.apply_policy(): return
+
         logging.info(f"[>] START BATCH. Params: Row='{row_kw}', Col='{col_kw}', Code='{code_kw}'")
         
         file_paths = filedialog.askopenfilenames(filetypes=[("Excel Files", "*.xlsx;*.xls;*.xlsb")])
         if not file_paths: return
 
+        self.launch_worker(file_paths, row_kw, col_kw, code_filter)
+
+    def parse_code_filter(self, code_kw):
+        """Kode Filter: satu pola, daftar 'a, b, c', atau @berkas pemetaan kode->label (lihat code_filter.py)."""
+        try:
+            labels = {label: key for key, label in MATCH_MODES.items()}
+            self.code_filter = CodeFilter.parse(code_kw, labels.get(self.combo_match.get(), "exact"))
+        except (ValueError, re.error) as e:
+            messagebox.showwarning("Warning", f"Kode Filter tidak valid: {e}")
+            return None
+        return self.code_filter
+
+    def apply_policy(self, discard_data=False):
+        """
+        Terapkan kebijakan duplikat pilihan ke engine. Kebijakan tidak bisa
+        diganti di tengah akumulasi data (aturan menang/kalah akan tercampur),
+        kecuali data memang akan diganti (mode folder).
+        """
+        labels = {label: key for key, label in POLICIES.items()}
+        policy = labels.get(self.combo_policy.get(), "first")
+        if policy == self.engine.policy:
+            return True
+        if len(self.engine.master_data) and not discard_data:
+            messagebox.showwarning("Warning", "Kebijakan duplikat berubah. Reset data dulu sebelum proses dengan kebijakan baru.")
+            self.combo_policy.set(POLICIES[self.engine.policy])
+            return False
+        self.engine.set_policy(policy)
+        self.cols = self.engine.cols
+        self.table.set_columns(self.cols, self.engine.master_data)
+        self.configure_columns()
+        logging.info(f"[I] KEBIJAKAN DUPLIKAT: {policy}")
+        return True
+
+    def start_folder_process(self):
+        """
+        Incremental folder mode: pilih folder, lalu hanya file baru/berubah yang
+        di-drill-down. master_data/indeks duplikat dimuat dari state folder
+        (lihat folder_state.py) dan hasil delta digabung ke sana.
+        """
+        row_kw = self.entry_row.get()
+        col_kw = self.entry_col.get()
+        code_kw = self.entry_code.get().strip()
+
+        if not code_kw:
+             messagebox.showwarning("Warning", "Kode Filter tidak boleh kosong.")
+             return
+
+        code_filter = self.parse_code_filter(code_kw)
+        if code_filter is None: return
+
+        folder = filedialog.askdirectory()
+        if not folder: return
+
+        logging.info(f"[>] START FOLDER DELTA: {folder}. Params: Row='{row_kw}', Col='{col_kw}', Code='{code_kw}'")
+        self.apply_policy(discard_data=True)
+        state = FolderState(folder, row_kw, col_kw, code_kw, self.engine.policy, code_filter.mode)
+        file_paths = state.plan()
+
+        # Hasil folder menggantikan data di memori (sesi rekap milik folder ini)
+        self.engine.restore(state.master_data, state.seen)
+        state.master_data, state.seen = [], []  # Sudah disalin ke RowStore & DedupIndex engine
+        self.refresh_table()
+
+        if not file_paths:
+            state.commit(self.engine.master_data, self.engine.dedup)
+            if self.engine.master_data:
+                self.btn_export.config(state="normal")
+            self.lbl_status.config(text=f"Tidak ada file baru/berubah. Data: {len(self.engine.master_data)}")
+            return
+
+        self.folder_state = state
+        self.launch_worker(file_paths, row_kw, col_kw, code_filter)
+
+    def launch_worker(self, file_paths, row_kw, col_kw, code_kw):
+        """Mengunci tombol lalu menjalankan worker_process di background thread."""
         self.is_processing = True
         self.btn_run.config(state="disabled", bg="#95A5A6")
+        self.btn_folder.config(state="disabled")
         self.btn_reset.config(state="disabled")
         self.btn_export.config(state="disabled")
+        self.btn_dup.config(state="disabled")
         
         # Reset tracking
-        self.progress_bar["maximum"] = len(file_paths)
-        self.progress_bar["value"] = 0
-        self.failed_files = [] 
-        # Note: self.master_data dan self.seen_cache TIDAK di-reset agar bisa akumulasi (atau reset manual via tombol)
+        self.ui_events.start_batch(len(file_paths))
+        self.engine.failed_files = [] 
+        self.done_files = set()
+        # Note: self.engine.master_data dan self.engine.dedup TIDAK di-reset agar bisa akumulasi (atau reset manual via tombol)
 
         # Spawn Thread
-        t = threading.Thread(target=self.worker_process, args=(file_paths, row_kw, col_kw, code_kw))
+        headless = self.var_headless.get()
+        self.engine.detail_source = self.var_source.get()
+        try:
+            workers = max(1, int(self.spin_workers.get()))
+        except ValueError:
+            workers = 1
+        cache = self.get_result_cache() if self.var_cache.get() else None
+        t = threading.Thread(target=self.worker_process, args=(file_paths, row_kw, col_kw, code_kw, headless, workers, cache))
         t.daemon = True
         t.start()
 
     # =========================================================================
 
-    def worker_process(self, file_paths, row_kw, col_kw, filter_code):
+    def get_excel_pool(self):
+        """Pool Excel hangat dibuka sekali per sesi aplikasi (lihat excel_pool.py)."""
+        if self.excel_pool is None:
+            self.excel_pool = ExcelPool()
+        return self.excel_pool
+
+    def on_close(self):
+        """Tutup instance Excel hangat sebelum jendela ditutup."""
+        if self.excel_pool is not None:
+            self.excel_pool.shutdown()
+        self.root.destroy()
+
+    def get_result_cache(self):
+        """Membuka cache drill-down di disk sekali per sesi aplikasi."""
+        if self.result_cache is None:
+            self.result_cache = ResultCache()
+        return self.result_cache
+
+    def worker_process(self, file_paths, row_kw, col_kw, filter_code, headless=False, workers=1, cache=None):
         """
         Fungsi utama yang berjalan di background thread.
-        Mengelola lifecycle aplikasi Excel (xlwings) dan iterasi file.
+        Seluruh pipeline (Excel lifecycle, drill-down, ekstraksi, cek duplikat)
+        ada di RecapEngine (engine.py) agar bisa dipakai juga tanpa GUI.
         """
-        app = None
         try:
-            self.update_ui_progress(0, "Membuka Excel Engine...")
-            app = xw.App(visible=False)
-            app.display_alerts = False
-            app.screen_updating = False
-            
-            total_files = len(file_paths)
-            
-            for index, path in enumerate(file_paths):
-                filename = os.path.basename(path)
-                self.update_ui_progress(index, f"Processing ({index+1}/{total_files}): {filename}")
-                logging.info(f"[>] FILE START: {filename}")
-                
-                try:
-                    self.process_single_file(app, path, row_kw, col_kw, filter_code)
-                    logging.info(f"[+] FILE DONE: {filename}")
-                except Exception as e:
-                    logging.error(f"[!] FATAL ERROR {filename}: {str(e)}")
-                    self.failed_files.append({'file': filename, 'msg': self.clean_error_msg(e)})
-                
-                self.update_ui_progress(index + 1, f"Selesai: {filename}")
+            self.engine.run(file_paths, row_kw, col_kw, filter_code, headless, workers, cache,
+                            progress=self.update_ui_progress,
+                            consumers=[CallbackConsumer(self.on_file_done)],
+                            excel_pool=None if headless else self.get_excel_pool())
+        finally:
+            self.write_trace()
+            self.ui_events.post_call(self.finish_processing)
 
+    def write_trace(self):
+        """Trace waktu per tahap batch terakhir (lihat run_trace.py), ditimpa setiap batch."""
+        try:
+            TRACE.write(TRACE_FILE)
         except Exception as e:
-            logging.critical(f"[!] SYSTEM CRASH: {str(e)}", exc_info=True)
-            self.failed_files.append({'file': "SYSTEM ERROR", 'msg': str(e)})
-        finally:
-            if app:
-                try:
-                    app.quit()
-                except:
-                    pass
-            self.root.after(0, self.finish_processing)
+            logging.warning(f"[-] Trace tidak bisa ditulis: {str(e)}")
 
     # =========================================================================
-    # [ CORE LOGIC: FILE & SHEET PROCESSING ]
+    # [ UI UPDATES & EXPORT ]
     # =========================================================================
 
-    def process_single_file(self, app, path, row_regex, col_keyword, filter_code):
-        """
-        Memproses satu file Excel.
-        1. Loop semua sheet.
-        2. Skip sheet blacklist (TABLE/TABEL).
-        3. Scanning heuristik (Baris-per-Baris dan Kolom-per-Kolom).
-        4. Drill Down (Klik 2x) pada titik temu.
-        5. Ekstraksi data mentah dari sheet baru.
-        """
-        wb = app.books.open(path)
-        data_found = False
-        sheet_errors = []
+    def update_ui_progress(self, value, text):
+        # Dipanggil dari utas pekerja: cukup masuk antrean, diterapkan pada tick UI berikutnya
+        self.ui_events.post_progress(value, text)
 
+    def drain_ui_events(self):
+        """Tick UI tetap (TICK_MS): terapkan status progres terakhir, sinkron tabel & panggilan tertunda."""
         try:
-            for sheet in wb.sheets:
-                # 1. Sheet Filtering
-                if sheet.name.strip().upper() in ["TABEL", "TABLE", "SHEET1"]:
-                    logging.info(f"[-] IGNORE SHEET: {sheet.name} (Blacklist)")
-                    continue
-
-                try:
-                    # 2. Raw Data Fetching (Memory Efficient)
-                    used_range = sheet.used_range
-                    data_val = used_range.value 
-                    
-                    if not data_val: continue 
-
-                    start_row = used_range.row
-                    start_col = used_range.column
-                    
-                    num_rows = len(data_val)
-                    num_cols = len(data_val[0]) if num_rows > 0 else 0
-
-                    target_r = -1
-                    target_c = -1
-                    
-                    # 3. Scanning: Priority Left-First (Untuk Baris)
-                    for c in range(num_cols):
-                        for r in range(num_rows):
-                            val = data_val[r][c]
-                            str_val = str(val).strip() if val is not None else ""
-                            if re.search(row_regex, str_val, re.IGNORECASE):
-                                target_r = start_row + r
-                                break
-                        if target_r != -1: break
-                    
-                    # 4. Scanning: Priority Top-First (Untuk Kolom)
-                    for r in range(num_rows):
-                        for c in range(num_cols):
-                            val = data_val[r][c]
-                            str_val = str(val).strip() if val is not None else ""
-                            if col_keyword.lower() in str_val.lower():
-                                target_c = start_col + c
-                                break 
-                        if target_c != -1: break 
-
-                    if target_r == -1 or target_c == -1:
-                        continue 
-
-                    # 5. Interaction
-                    target_cell = sheet.cells(target_r, target_c)
-                    if target_cell.value is None:
-                        logging.warning(f"[-] Empty Target Cell in {sheet.name}")
-                        continue 
-
-                    init_sheet_count = len(wb.sheets)
-                    target_cell.api.ShowDetail = True 
-                    
-                    if len(wb.sheets) <= init_sheet_count:
-                        logging.warning(f"[-] Drill down failed in {sheet.name} (No new sheet)")
-                        continue
-
-                    # 6. Extraction Strategy
-                    new_sheet = wb.sheets.active 
-                    raw_extracted_data = new_sheet.used_range.value
-                    
-                    self.extract_data_manual(raw_extracted_data, os.path.basename(path), filter_code)
-                    data_found = True
-                    break 
-
-                except Exception as inner_e:
-                    sheet_errors.append(f"{sheet.name}: {str(inner_e)}")
-                    continue 
-
-            if not data_found:
-                if not sheet_errors:
-                    raise Exception(f"Keyword Row '{row_regex}' atau Col '{col_keyword}' tidak ditemukan.")
-                else:
-                    raise Exception("; ".join(sheet_errors))
-
+            snapshot, has_rows, calls = self.ui_events.drain()
+            if snapshot is not None:
+                value, maximum, text = snapshot
+                self.progress_bar["maximum"] = maximum
+                self.progress_bar["value"] = value
+                self.lbl_status.config(text=text)
+            if has_rows:
+                # Baris sudah ada di engine.master_data; tabel cukup menyinkronkan ekornya
+                self.table.sync()
+            for fn in calls:
+                fn()
         finally:
-            wb.close()
-
-    # =========================================================================
-    # [ CORE LOGIC: DATA EXTRACTION & DUPLICATE HANDLING ]
-    # =========================================================================
+            self.root.after(TICK_MS, self.drain_ui_events)
 
-    def extract_data_manual(self, raw_data, filename, filter_code):
-        """
-        Mengekstrak data dari list mentah (raw_data).
-        Melakukan validasi regex, normalisasi data, dan PENGECEKAN DUPLIKAT.
-        """
-        if not raw_data or len(raw_data) < 2:
-            logging.warning("[-] Extracted data is empty")
-            return
+    def on_file_done(self, index, path, rows, error):
+        """Dipanggil dari utas pekerja setiap file selesai: tabel disinkronkan pada tick berikutnya."""
+        if error is None:
+            self.done_files.add(os.path.basename(path))
+        if rows:
+            self.ui_events.post_rows()
 
-        data_rows = raw_data[1:] # Skip Header
-        regex_pattern = re.compile(filter_code, re.IGNORECASE)
-        count_found = 0
-
-        for row in data_rows:
-            # Padding row jika kolom kurang dari standard
-            if len(row) < 19:
-                row = row + [None] * (19 - len(row))
-
-            # Ambil Kode (Index 1 / Kolom B)
-            raw_code = row[1]
-            clean_code = self.normalize_val(raw_code)
-            
-            # 1. Regex Matching
-            if regex_pattern.search(clean_code):
-                
-                # 2. Extract Fields
-                val_a = self.normalize_val(row[0])  # Case Number
-                val_b = clean_code                  # Case Type
-                val_d = self.normalize_val(row[3])  # Desc
-                val_e = self.normalize_val(row[4])  # Date
-                val_s = self.normalize_val(row[18]) # Unit Kerja
-                
-                # 3. DUPLICATE CHECKING (Global Cache)
-                # Kunci unik: Kombinasi Case Number + Case Type
-                unique_key = (val_a, val_b)
-                
-                if unique_key in self.seen_cache:
-                    prev_file = self.seen_cache[unique_key]
-                    logging.info(f"[D] DUPLICATE: {val_a} (Type {val_b}). Existing in: {prev_file}. Ignoring.")
-                    continue # Skip data ini
-                
-                # 4. Save Valid Data
-                self.seen_cache[unique_key] = filename # Simpan ke cache
-                self.master_data.append([val_a, val_b, val_d, val_e, val_s, filename])
-                count_found += 1
-                logging.debug(f"[+] ADD: {val_a} | {val_b}")
-
-        logging.info(f"[I] Extracted {count_found} valid rows from {filename}")
+    def schedule_filter(self, event=None):
+        """Debounce input filter agar tidak menyaring ulang di setiap ketukan."""
+        if self._filter_job is not None:
+            self.root.after_cancel(self._filter_job)
+        self._filter_job = self.root.after(250, self.apply_filter)
 
-    # =========================================================================
-    # [ UI UPDATES & EXPORT ]
-    # =========================================================================
-
-    def update_ui_progress(self, value, text):
-        self.root.after(0, lambda: self._do_update(value, text))
-
-    def _do_update(self, value, text):
-        self.progress_bar["value"] = value
-        self.lbl_status.config(text=text)
+    def apply_filter(self):
+        self._filter_job = None
+        self.table.set_filter(self.entry_search.get())
 
     def finish_processing(self):
+        self.ui_events.end_batch()
         self.is_processing = False
         self.btn_run.config(state="normal", bg=self.c_accent)
+        self.btn_folder.config(state="normal")
         self.btn_reset.config(state="normal")
-        self.refresh_table()
+
+        # Incremental folder mode: catat file sukses ke manifest + simpan hasil
+        # Batch yang berhenti karena kegagalan sistem tidak di-commit sama sekali
+        if self.folder_state is not None:
+            if self.engine.aborted:
+                logging.warning("[-] Batch terhenti: manifest folder tidak diperbarui")
+            else:
+                self.folder_state.commit(self.engine.master_data, self.engine.dedup, self.done_files)
+            self.folder_state = None
         
-        if self.master_data:
+        if self.engine.master_data:
             self.btn_export.config(state="normal")
 
-        success_cnt = len(self.master_data)
-        error_cnt = len(self.failed_files)
-        self.lbl_status.config(text=f"Selesai! Data: {success_cnt}. Errors: {error_cnt}")
+        success_cnt = len(self.engine.master_data)
+        error_cnt = len(self.engine.failed_files)
+        dup_cnt = len(self.engine.duplicates)
+        if dup_cnt:
+            self.btn_dup.config(state="normal")
+        self.lbl_status.config(text=f"Selesai! Data: {success_cnt}. Duplikat: {dup_cnt}. Errors: {error_cnt}")
+        if self.code_filter is not None and self.code_filter.multi:
+            counts = self.code_filter.bucket_counts(self.engine.master_data.value_counts(1))
+            summary = ", ".join(f"{label}: {n}" for label, n in counts.items())
+            self.lbl_status.config(text=self.lbl_status.cget("text") + f" | Kelompok: {summary}")
 
         if error_cnt > 0:
             self.show_error_window_gui()
@@ -502,16 +520,14 @@ class BRIProSystem:
             messagebox.showwarning("Warning", "Tunggu proses selesai dulu.")
             return
         
-        # Clear UI
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
         # Clear Data Memory
-        self.master_data = []
-        self.failed_files = []
-        self.seen_cache = {} # Reset memori duplikat
+        self.engine.reset() # Reset data, error & memori duplikat
+
+        # Clear UI
+        self.refresh_table()
         
         self.btn_export.config(state="disabled")
+        self.btn_dup.config(state="disabled")
         self.lbl_status.config(text="Status: Ready (Reset Done)")
         self.progress_bar["value"] = 0
         messagebox.showinfo("Reset", "Data dan Cache Duplikat telah dibersihkan.")
@@ -544,40 +560,109 @@ class BRIProSystem:
         tree_err.pack(fill="both", expand=True)
 
         tree_err.tag_configure('err_row', foreground=self.c_danger)
-        for item in self.failed_files:
+        for item in self.engine.failed_files:
             tree_err.insert("", "end", values=(item['file'], item['msg']), tags=('err_row',))
 
+    def show_duplicate_window(self):
+        """Tabel duplikat (kunci, sumber terpilih, sumber lain) dari pass ekstraksi terakhir."""
+        report = self.engine.duplicates
+        cols = report.columns(self.cols)
+        rows = list(report.rows())
+
+        top = tk.Toplevel(self.root)
+        top.title("Laporan Duplikat")
+        top.geometry("1000x550")
+        top.configure(bg="#F4F5F7")
+
+        tk.Label(top, text=f"📑 Laporan Duplikat ({len(rows)} kunci)", bg="#F4F5F7", font=("Segoe UI", 14, "bold"), fg=self.c_primary).pack(pady=(15,5))
+
+        def save_report():
+            file_path = filedialog.asksaveasfilename(parent=top, defaultextension=".xlsx", filetypes=[("Excel Files", "*.xlsx"), ("CSV Files", "*.csv"), ("Parquet Files", "*.parquet")], initialfile=f"Duplikat_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx")
+            if not file_path: return
+            try:
+                export_rows(file_path, cols, rows)
+                messagebox.showinfo("Sukses", f"Laporan duplikat disimpan di:\n{file_path}")
+            except Exception as e:
+                messagebox.showerror("Gagal Save", str(e))
+
+        tk.Button(top, text="💾 Simpan Laporan", bg=self.c_success, fg="white", font=("Segoe UI", 9, "bold"),
+                  relief="flat", padx=10, command=save_report).pack(anchor="e", padx=20, pady=(0, 5))
+
+        frame_table = tk.Frame(top)
+        frame_table.pack(fill="both", expand=True, padx=20, pady=(0, 20))
+        table = VirtualTable(frame_table, cols, rows)
+        for c in cols:
+            table.tree.column(c, width=300 if c in report.COLUMNS[:2] else 150)
+
     def refresh_table(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Karena kita sudah filter duplikat di 'extract_data_manual', 
-        # disini tinggal tampilkan saja.
-        for row in self.master_data:
-            self.tree.insert("", "end", values=row)
+        self.table.set_source(self.engine.master_data)
 
     def export_to_excel(self):
-        if not self.master_data: return
-        file_path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel Files", "*.xlsx")], initialfile=f"Rekap_Data_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx")
+        """
+        Ekspor langsung dari engine.master_data lewat exporter.py (tanpa Excel
+        COM / DataFrame). Format mengikuti ekstensi: .xlsx, .csv, .parquet.
+        Penulisan berjalan di utas terpisah agar UI tetap responsif.
+        """
+        if not self.engine.master_data: return
+        file_path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel Files", "*.xlsx"), ("CSV Files", "*.csv"), ("Parquet Files", "*.parquet")], initialfile=f"Rekap_Data_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx")
         if not file_path: return
+
+        self.is_processing = True
+        for btn in (self.btn_run, self.btn_folder, self.btn_reset, self.btn_export, self.btn_dup):
+            btn.config(state="disabled")
+        self.ui_events.start_batch(len(self.engine.master_data), "baris")
+
+        t = threading.Thread(target=self.export_worker, args=(file_path,))
+        t.daemon = True
+        t.start()
+
+    def export_worker(self, file_path):
+        count, error = 0, None
+        progress = lambda done, total: self.update_ui_progress(done, f"Export: {done}/{total} baris")
         try:
-            df = pd.DataFrame(self.master_data, columns=self.cols)
-            df.to_excel(file_path, index=False)
-            messagebox.showinfo("Sukses", f"File berhasil disimpan di:\n{file_path}")
+            count = export_rows(file_path, self.cols, self.engine.master_data, progress=progress)
+            # Laporan duplikat ikut diekspor di samping hasil utama: <nama>_duplikat.<ext>
+            if len(self.engine.duplicates):
+                base, ext = os.path.splitext(file_path)
+                report = self.engine.duplicates
+                export_rows(f"{base}_duplikat{ext}", report.columns(self.cols), list(report.rows()))
+            # Multi-kode: satu berkas tambahan per kelompok, <nama>_<label>.<ext>
+            if self.code_filter is not None and self.code_filter.multi:
+                for label in self.code_filter.labels:
+                    export_rows(bucket_path(file_path, label), self.cols,
+                                self.code_filter.bucket_rows(self.engine.master_data, label))
         except Exception as e:
-            messagebox.showerror("Gagal Save", str(e))
+            logging.error(f"[!] GALAT EKSPOR: {str(e)}")
+            error = str(e)
+        self.ui_events.post_call(lambda: self.finish_export(file_path, count, error))
+
+    def finish_export(self, file_path, count, error):
+        self.ui_events.end_batch()
+        self.is_processing = False
+        self.btn_run.config(state="normal", bg=self.c_accent)
+        for btn in (self.btn_folder, self.btn_reset, self.btn_export):
+            btn.config(state="normal")
+        if len(self.engine.duplicates):
+            self.btn_dup.config(state="normal")
+        if error:
+            self.lbl_status.config(text="Ekspor gagal.")
+            messagebox.showerror("Gagal Save", error)
+        else:
+            self.lbl_status.config(text=f"Ekspor selesai: {count} baris.")
+            messagebox.showinfo("Sukses", f"File berhasil disimpan di:\n{file_path}\nTotal: {count} baris")
 
     def copy_tree(self, event):
-        sel = self.tree.selection()
-        if not sel: return
+        rows = self.table.selected_rows()
+        if not rows: return
         res = ""
-        for i in sel:
-            vals = self.tree.item(i, 'values')
+        for vals in rows:
             res += "\t".join(vals) + "\n"
         self.root.clipboard_clear()
         self.root.clipboard_append(res)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    setup_logging(LOG_FILE, level=logging.DEBUG)
     root = tk.Tk()
     app = BRIProSystem(root)
     root.mainloop()
\ No newline at end of file
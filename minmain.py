@@ -1,11 +1,24 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import xlwings as xw
-import os
 import threading
+import multiprocessing
+import os
 import re
 import logging
 from datetime import datetime
+from engine import RecapEngine
+from pipeline import CallbackConsumer
+from virtual_table import VirtualTable
+from result_cache import ResultCache
+from excel_pool import ExcelPool
+from folder_state import FolderState
+from batch_pool import default_workers
+from exporter import export_rows
+from dedup_policy import POLICIES
+from code_filter import CodeFilter, MATCH_MODES, bucket_path
+from run_trace import TRACE
+from log_setup import setup_logging
+from ui_events import UIEventQueue, TICK_MS
 
 # =============================================================================
 # KONFIGURASI PENCATATAN LOG (SISTEM JURNAL)
@@ -18,13 +31,14 @@ from datetime import datetime
 # [D] DUPLIKASI : Redundansi data terdeteksi.
 # [>] PROSES    : Memulai sub-rutin baru.
 
-logging.basicConfig(
-    filename='debug_log.txt',
-    filemode='w',
-    level=logging.DEBUG,
-    format='%(asctime)s %(message)s',
-    datefmt='%H:%M:%S'
-)
+# Log ditulis utas latar belakang (log_setup.py); level: REKAP_LOG_LEVEL.
+# Dipasang di blok __main__, bukan saat import: dengan start method 'spawn'
+# (Windows) setiap worker batch_pool meng-import ulang skrip ini sebagai
+# __mp_main__ dan akan menimpa (filemode 'w') log milik proses induk.
+LOG_FILE = 'debug_log.txt'  # Overwrite setiap kali run
+
+# Trace waktu per tahap batch terakhir (JSON: record + ringkasan p50/p95).
+TRACE_FILE = 'run_trace.json'
 
 class BRIProSystem:
     
@@ -58,14 +72,21 @@ class BRIProSystem:
         self.c_danger  = "#C0392B"
         self.c_text    = "#2C3E50"
 
-        # Struktur Data Internal
-        self.master_data = []      # Penampung utama hasil ekstraksi
-        self.failed_files = []     # Log berkas yang gagal diproses
-        self.seen_cache = {}       # Tabel Hash untuk deteksi duplikasi {(ID, Tipe): Berkas}
+        # Struktur Data Internal (hasil, cache duplikasi & galat dikelola engine)
+        self.engine = RecapEngine(layout="bertingkat")
         self.is_processing = False # Bendera status proses
+        self.result_cache = None   # Cache drill-down di disk (dibuat saat dibutuhkan)
+        self.folder_state = None   # Manifest folder aktif (mode folder inkremental)
+        self.done_files = set()    # Nama file yang selesai tanpa galat pada batch berjalan
+        self.code_filter = None    # CodeFilter batch terakhir (multi-kode, lihat code_filter.py)
+        self.excel_pool = None     # ExcelPool: instance Excel tetap hangat antar batch
+        self.ui_events = UIEventQueue()  # Kanal event utas pekerja -> UI (lihat ui_events.py)
+        TRACE.listener = self.ui_events.post_stage
 
         self.setup_styles()
         self.create_ui()
+        self.root.after(TICK_MS, self.drain_ui_events)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def setup_styles(self):
         """
@@ -129,11 +150,43 @@ class BRIProSystem:
         self.entry_col.grid(row=1, column=1, padx=10, pady=5)
 
         # Parameter 3: Kode Filter
-        tk.Label(input_frame, text="Kode Filter (Regex):", bg="white", font=("Segoe UI", 9, "bold"), fg=self.c_accent).grid(row=2, column=0, padx=10, pady=5, sticky="w")
+        tk.Label(input_frame, text="Kode Filter (a, b, c / @berkas):", bg="white", font=("Segoe UI", 9, "bold"), fg=self.c_accent).grid(row=2, column=0, padx=10, pady=5, sticky="w")
         self.entry_code = tk.Entry(input_frame, width=30, font=("Segoe UI", 10))
         self.entry_code.insert(0, "8204") 
         self.entry_code.grid(row=2, column=1, padx=10, pady=5)
 
+        # Parameter 4: Mode Tanpa Excel (Pivot Cache dibaca langsung dari .xlsx)
+        self.var_headless = tk.BooleanVar(value=False)
+        tk.Checkbutton(input_frame, text="Mode Tanpa Excel (khusus .xlsx)", variable=self.var_headless,
+                       bg="white", font=("Segoe UI", 9)).grid(row=3, column=0, columnspan=2, padx=10, pady=(0, 5), sticky="w")
+
+        # Parameter 5: Proses Pekerja Paralel (1 = sekuensial)
+        tk.Label(input_frame, text="Jumlah Proses Pekerja:", bg="white", font=("Segoe UI", 9, "bold")).grid(row=4, column=0, padx=10, pady=5, sticky="w")
+        self.spin_workers = tk.Spinbox(input_frame, from_=1, to=max(default_workers(), 1), width=5, font=("Segoe UI", 10))
+        self.spin_workers.grid(row=4, column=1, padx=10, pady=5, sticky="w")
+
+        # Parameter 6: Cache Hasil Drill-Down (run ulang dengan filter lain tanpa Excel)
+        self.var_cache = tk.BooleanVar(value=True)
+        tk.Checkbutton(input_frame, text="Gunakan Cache Drill-Down", variable=self.var_cache,
+                       bg="white", font=("Segoe UI", 9)).grid(row=5, column=0, columnspan=2, padx=10, pady=(0, 5), sticky="w")
+
+        # Input 7: Kebijakan Duplikat (lihat dedup_policy.py)
+        tk.Label(input_frame, text="Kebijakan Duplikasi:", bg="white", font=("Segoe UI", 9, "bold")).grid(row=6, column=0, padx=10, pady=5, sticky="w")
+        self.combo_policy = ttk.Combobox(input_frame, values=list(POLICIES.values()), state="readonly", width=28)
+        self.combo_policy.set(POLICIES[self.engine.policy])
+        self.combo_policy.grid(row=6, column=1, padx=10, pady=5, sticky="w")
+
+        # Input 8: Mode Pencocokan Kode (exact: "8204" tidak cocok dengan "18204")
+        tk.Label(input_frame, text="Mode Pencocokan Kode:", bg="white", font=("Segoe UI", 9, "bold")).grid(row=7, column=0, padx=10, pady=5, sticky="w")
+        self.combo_match = ttk.Combobox(input_frame, values=list(MATCH_MODES.values()), state="readonly", width=28)
+        self.combo_match.set(MATCH_MODES["exact"])
+        self.combo_match.grid(row=7, column=1, padx=10, pady=5, sticky="w")
+
+        # Input 9: Detail dari data sumber pivot (mode Excel, tanpa sheet ShowDetail)
+        self.var_source = tk.BooleanVar(value=False)
+        tk.Checkbutton(input_frame, text="Baca Sumber Pivot (tanpa ShowDetail)", variable=self.var_source,
+                       bg="white", font=("Segoe UI", 9)).grid(row=8, column=0, columnspan=2, padx=10, pady=(0, 5), sticky="w")
+
         # Tombol Operasional
         self.btn_run = tk.Button(controls, text="▶ MULAI PROSES", 
                                  bg=self.c_accent, fg="white",
@@ -142,6 +195,13 @@ class BRIProSystem:
                                  command=self.start_thread_process)
         self.btn_run.pack(side="left", fill="y", padx=(0, 10))
 
+        self.btn_folder = tk.Button(controls, text="📁 PROSES FOLDER", 
+                                    bg=self.c_primary, fg="white",
+                                    font=("Segoe UI", 10, "bold"), relief="flat", 
+                                    padx=20, pady=25, cursor="hand2", 
+                                    command=self.start_folder_process)
+        self.btn_folder.pack(side="left", fill="y", padx=(0, 10))
+
         self.btn_reset = tk.Button(controls, text="⟳ ATUR ULANG", 
                                    bg=self.c_danger, fg="white",
                                    font=("Segoe UI", 10, "bold"), relief="flat", 
@@ -155,7 +215,15 @@ class BRIProSystem:
                                     padx=20, pady=25, cursor="hand2", 
                                     state="disabled", 
                                     command=self.export_to_excel)
-        self.btn_export.pack(side="left", fill="y")
+        self.btn_export.pack(side="left", fill="y", padx=(0, 10))
+
+        self.btn_dup = tk.Button(controls, text="📑 LAPORAN DUPLIKAT", 
+                                 bg=self.c_primary, fg="white",
+                                 font=("Segoe UI", 10, "bold"), relief="flat", 
+                                 padx=20, pady=25, cursor="hand2", 
+                                 state="disabled", 
+                                 command=self.show_duplicate_window)
+        self.btn_dup.pack(side="left", fill="y")
 
         # --- Bagian Status ---
         progress_frame = tk.Frame(self.root, bg="#F4F5F7")
@@ -168,25 +236,30 @@ class BRIProSystem:
         self.progress_bar.pack(fill="x", pady=5)
 
         # --- Bagian Tabel Data ---
+        search_frame = tk.Frame(self.root, bg="#F4F5F7")
+        search_frame.pack(fill="x", padx=20, pady=(0, 5))
+        tk.Label(search_frame, text="🔍 Saring Tabel:", bg="#F4F5F7", fg=self.c_text, font=("Segoe UI", 10)).pack(side="left")
+        self.entry_search = ttk.Entry(search_frame, width=40)
+        self.entry_search.pack(side="left", padx=5)
+        self.entry_search.bind("<KeyRelease>", self.schedule_filter)
+        self._filter_job = None
+
         table_frame = tk.Frame(self.root, bg="white")
         table_frame.pack(fill="both", expand=True, padx=20, pady=(0, 20))
 
-        sy = ttk.Scrollbar(table_frame, orient="vertical")
-        sx = ttk.Scrollbar(table_frame, orient="horizontal")
-        
         # DEFINISI KOLOM
-        self.cols = ["Nomor Kasus", "Tipe Kasus", "Deskripsi", "Tanggal", "Unit Kerja Pelaksana", "Kanca", "Sumber Berkas"]
-        self.tree = ttk.Treeview(table_frame, columns=self.cols, show="headings", 
-                                 yscrollcommand=sy.set, xscrollcommand=sx.set)
-        
-        sy.config(command=self.tree.yview)
-        sx.config(command=self.tree.xview)
-        sy.pack(side="right", fill="y")
-        sx.pack(side="bottom", fill="x")
-        self.tree.pack(fill="both", expand=True)
+        self.cols = self.engine.cols
+        # Tabel virtual: hanya baris yang terlihat yang dibuat sebagai item Treeview
+        self.table = VirtualTable(table_frame, self.cols, self.engine.master_data)
+        self.tree = self.table.tree
+
+        self.configure_columns()
+
+        self.tree.bind("<Control-c>", self.copy_tree)
 
+    def configure_columns(self):
+        """Lebar kolom tabel hasil (dipanggil ulang jika susunan kolom berubah)."""
         for c in self.cols:
-            self.tree.heading(c, text=c, anchor="w")
             if c == "Sumber Berkas":
                 self.tree.column(c, width=200)
             elif c == "Unit Kerja Pelaksana" or c == "Kanca":
@@ -194,61 +267,6 @@ class BRIProSystem:
             else:
                 self.tree.column(c, width=150)
 
-        self.tree.bind("<Control-c>", self.copy_tree)
-
-    # =========================================================================
-    # [ UTILITAS & NORMALISASI DATA ]
-    # =========================================================================
-
-    def normalize_val(self, val):
-        """
-        Normalisasi Nilai Sel (Data Normalization Logic).
-        Mengonversi tipe data Excel menjadi String bersih untuk konsistensi.
-        """
-        if val is None:
-            return ""
-        
-        # Penanganan Khusus Format Tanggal
-        if isinstance(val, datetime):
-            return val.strftime("%d/%m/%Y")
-        
-        # Penanganan Angka (Menghilangkan .0 pada float)
-        if isinstance(val, (float, int)):
-            if float(val).is_integer():
-                return str(int(val)) 
-            else:
-                return str(val)
-        
-        return str(val).strip()
-
-    def get_column_index(self, header_row, keyword):
-        """
-        Pencarian Indeks Kolom Berdasarkan Nama Header (Case-Insensitive).
-        Mengembalikan indeks kolom (0-based) jika ditemukan, atau -1 jika tidak.
-        """
-        keyword_lower = keyword.lower()
-        for idx, cell_val in enumerate(header_row):
-            if cell_val and keyword_lower in str(cell_val).lower():
-                return idx
-        return -1
-
-    def clean_error_msg(self, error_obj):
-        """
-        Sanitasi Pesan Galat.
-        Mengubah pesan teknis menjadi informasi yang mudah dipahami.
-        """
-        raw_msg = str(error_obj)
-        if "ShowDetail" in raw_msg:
-            return "Kegagalan Drill-Down: Sel target terkunci atau bukan Pivot Table."
-        if "tidak ketemu" in raw_msg:
-            return raw_msg 
-        if "Exception occurred" in raw_msg or "-2147" in raw_msg:
-            match = re.search(r"Microsoft Excel', '(.*?)',", raw_msg)
-            if match:
-                return f"Galat Excel: {match.group(1)}"
-            return "Galat Komunikasi Excel (COM Error)."
-        return raw_msg
-
     # =========================================================================
     # [ LOGIKA PROSES: UTAS & PEKERJA ]
     # =========================================================================
@@ -265,257 +283,223 @@ class BRIProSystem:
              messagebox.showwarning("Peringatan", "Parameter Kode Filter wajib diisi.")
              return
 
+        code_filter = self.parse_code_filter(code_kw)
+        if code_filter is None: return
+
+        if not self.apply_policy(): return
+
         logging.info(f"[>] MEMULAI BATCH. Params: Baris='{row_kw}', Kolom='{col_kw}', Filter='{code_kw}'")
         
         file_paths = filedialog.askopenfilenames(filetypes=[("Berkas Excel", "*.xlsx;*.xls;*.xlsb")])
         if not file_paths: return
 
+        self.launch_worker(file_paths, row_kw, col_kw, code_filter)
+
+    def parse_code_filter(self, code_kw):
+        """Kode Filter: satu pola, daftar 'a, b, c', atau @berkas pemetaan kode->label (lihat code_filter.py)."""
+        try:
+            labels = {label: key for key, label in MATCH_MODES.items()}
+            self.code_filter = CodeFilter.parse(code_kw, labels.get(self.combo_match.get(), "exact"))
+        except (ValueError, re.error) as e:
+            messagebox.showwarning("Peringatan", f"Parameter Kode Filter tidak valid: {e}")
+            return None
+        return self.code_filter
+
+    def apply_policy(self, discard_data=False):
+        """
+        Terapkan kebijakan duplikat pilihan ke engine. Kebijakan tidak bisa
+        diganti di tengah akumulasi data (aturan menang/kalah akan tercampur),
+        kecuali data memang akan diganti (mode folder).
+        """
+        labels = {label: key for key, label in POLICIES.items()}
+        policy = labels.get(self.combo_policy.get(), "first")
+        if policy == self.engine.policy:
+            return True
+        if len(self.engine.master_data) and not discard_data:
+            messagebox.showwarning("Peringatan", "Kebijakan duplikasi berubah. Atur ulang data terlebih dahulu sebelum memproses dengan kebijakan baru.")
+            self.combo_policy.set(POLICIES[self.engine.policy])
+            return False
+        self.engine.set_policy(policy)
+        self.cols = self.engine.cols
+        self.table.set_columns(self.cols, self.engine.master_data)
+        self.configure_columns()
+        logging.info(f"[I] KEBIJAKAN DUPLIKAT: {policy}")
+        return True
+
+    def start_folder_process(self):
+        """
+        Inisiasi Mode Folder Inkremental.
+        Hanya berkas baru/berubah yang diproses; data rekap & cache duplikasi
+        dimuat dari state folder lalu digabung dengan hasil delta.
+        """
+        row_kw = self.entry_row.get()
+        col_kw = self.entry_col.get()
+        code_kw = self.entry_code.get().strip()
+
+        if not code_kw:
+             messagebox.showwarning("Peringatan", "Parameter Kode Filter wajib diisi.")
+             return
+
+        code_filter = self.parse_code_filter(code_kw)
+        if code_filter is None: return
+
+        folder = filedialog.askdirectory()
+        if not folder: return
+
+        logging.info(f"[>] MEMULAI MODE FOLDER: {folder}. Params: Baris='{row_kw}', Kolom='{col_kw}', Filter='{code_kw}'")
+        self.apply_policy(discard_data=True)
+        state = FolderState(folder, row_kw, col_kw, code_kw, self.engine.policy, code_filter.mode)
+        file_paths = state.plan()
+
+        self.engine.restore(state.master_data, state.seen)
+        state.master_data, state.seen = [], []  # Sudah disalin ke RowStore & DedupIndex engine
+        self.refresh_table()
+
+        if not file_paths:
+            state.commit(self.engine.master_data, self.engine.dedup)
+            if self.engine.master_data:
+                self.btn_export.config(state="normal")
+            self.lbl_status.config(text=f"Tidak ada berkas baru/berubah. Data: {len(self.engine.master_data)}")
+            return
+
+        self.folder_state = state
+        self.launch_worker(file_paths, row_kw, col_kw, code_filter)
+
+    def launch_worker(self, file_paths, row_kw, col_kw, code_kw):
+        """Penguncian Tombol & Peluncuran Utas Pekerja."""
         self.is_processing = True
         self.btn_run.config(state="disabled", bg="#95A5A6")
+        self.btn_folder.config(state="disabled")
         self.btn_reset.config(state="disabled")
         self.btn_export.config(state="disabled")
+        self.btn_dup.config(state="disabled")
         
-        self.progress_bar["maximum"] = len(file_paths)
-        self.progress_bar["value"] = 0
-        self.failed_files = [] 
+        self.ui_events.start_batch(len(file_paths))
+        self.engine.failed_files = [] 
+        self.done_files = set()
 
-        t = threading.Thread(target=self.worker_process, args=(file_paths, row_kw, col_kw, code_kw))
+        headless = self.var_headless.get()
+        self.engine.detail_source = self.var_source.get()
+        try:
+            workers = max(1, int(self.spin_workers.get()))
+        except ValueError:
+            workers = 1
+        cache = self.get_result_cache() if self.var_cache.get() else None
+        t = threading.Thread(target=self.worker_process, args=(file_paths, row_kw, col_kw, code_kw, headless, workers, cache))
         t.daemon = True
         t.start()
 
-    def worker_process(self, file_paths, row_kw, col_kw, filter_code):
+    def get_excel_pool(self):
+        """Pool Excel hangat dibuat sekali per sesi aplikasi (lihat excel_pool.py)."""
+        if self.excel_pool is None:
+            self.excel_pool = ExcelPool()
+        return self.excel_pool
+
+    def on_close(self):
+        """Tutup instance Excel hangat sebelum jendela ditutup."""
+        if self.excel_pool is not None:
+            self.excel_pool.shutdown()
+        self.root.destroy()
+
+    def get_result_cache(self):
+        """Membuka cache drill-down di disk sekali per sesi aplikasi."""
+        if self.result_cache is None:
+            self.result_cache = ResultCache()
+        return self.result_cache
+
+    def worker_process(self, file_paths, row_kw, col_kw, filter_code, headless=False, workers=1, cache=None):
         """
         Logika Utama Pekerja (Worker Main Logic).
+        Pipeline lengkap (drill-down, ekstraksi dinamis, cek duplikasi) berada
+        di RecapEngine (engine.py) sehingga dapat dijalankan tanpa GUI.
         """
-        app = None
         try:
-            self.update_ui_progress(0, "Menginisialisasi Mesin Excel...")
-            app = xw.App(visible=False)
-            app.display_alerts = False
-            app.screen_updating = False
-            
-            total_files = len(file_paths)
-            
-            for index, path in enumerate(file_paths):
-                filename = os.path.basename(path)
-                self.update_ui_progress(index, f"Memproses ({index+1}/{total_files}): {filename}")
-                logging.info(f"[>] MEMULAI BERKAS: {filename}")
-                
-                try:
-                    self.process_single_file(app, path, row_kw, col_kw, filter_code)
-                    logging.info(f"[+] SELESAI BERKAS: {filename}")
-                except Exception as e:
-                    logging.error(f"[!] GALAT FATAL {filename}: {str(e)}")
-                    self.failed_files.append({'file': filename, 'msg': self.clean_error_msg(e)})
-                
-                self.update_ui_progress(index + 1, f"Selesai: {filename}")
-
-        except Exception as e:
-            logging.critical(f"[!] KEGAGALAN SISTEM: {str(e)}", exc_info=True)
-            self.failed_files.append({'file': "KESALAHAN SISTEM", 'msg': str(e)})
+            self.engine.run(file_paths, row_kw, col_kw, filter_code, headless, workers, cache,
+                            progress=self.update_ui_progress,
+                            consumers=[CallbackConsumer(self.on_file_done)],
+                            excel_pool=None if headless else self.get_excel_pool())
         finally:
-            if app:
-                try:
-                    app.quit()
-                except:
-                    pass
-            self.root.after(0, self.finish_processing)
-
-    def process_single_file(self, app, path, row_regex, col_keyword, filter_code):
-        """
-        Pemrosesan Berkas Tunggal.
-        Meliputi navigasi sheet, pencarian koordinat, drill-down, dan ekstraksi data dinamis.
-        """
-        wb = app.books.open(path)
-        data_found = False
-        sheet_errors = []
+            self.write_trace()
+            self.ui_events.post_call(self.finish_processing)
 
+    def write_trace(self):
+        """Trace waktu per tahap batch terakhir (lihat run_trace.py), ditimpa setiap batch."""
         try:
-            for sheet in wb.sheets:
-                # Filter Lembar Kerja yang Tidak Relevan
-                if sheet.name.strip().upper() in ["TABEL", "TABLE", "SHEET1"]:
-                    continue
-
-                try:
-                    # Pengambilan Data Mentah
-                    used_range = sheet.used_range
-                    data_val = used_range.value 
-                    
-                    if not data_val: continue 
-
-                    start_row = used_range.row
-                    start_col = used_range.column
-                    
-                    num_rows = len(data_val)
-                    num_cols = len(data_val[0]) if num_rows > 0 else 0
-
-                    target_r = -1
-                    target_c = -1
-                    
-                    # 1. Pindai Baris (Prioritas Kolom)
-                    for c in range(num_cols):
-                        for r in range(num_rows):
-                            val = data_val[r][c]
-                            str_val = str(val).strip() if val is not None else ""
-                            if re.search(row_regex, str_val, re.IGNORECASE):
-                                target_r = start_row + r
-                                break
-                        if target_r != -1: break
-                    
-                    # 2. Pindai Kolom (Prioritas Baris)
-                    for r in range(num_rows):
-                        for c in range(num_cols):
-                            val = data_val[r][c]
-                            str_val = str(val).strip() if val is not None else ""
-                            if col_keyword.lower() in str_val.lower():
-                                target_c = start_col + c
-                                break 
-                        if target_c != -1: break 
-
-                    if target_r == -1 or target_c == -1:
-                        continue 
-
-                    # Validasi Sel Target
-                    target_cell = sheet.cells(target_r, target_c)
-                    if target_cell.value is None:
-                        logging.warning(f"[-] Sel target kosong pada lembar {sheet.name}")
-                        continue 
-
-                    # Eksekusi Drill Down
-                    init_sheet_count = len(wb.sheets)
-                    target_cell.api.ShowDetail = True 
-                    
-                    if len(wb.sheets) <= init_sheet_count:
-                        logging.warning(f"[-] Drill down tidak menghasilkan lembar baru pada {sheet.name}")
-                        continue
-
-                    # Ekstraksi Data dari Lembar Baru
-                    new_sheet = wb.sheets.active 
-                    raw_extracted_data = new_sheet.used_range.value
-                    
-                    self.extract_data_manual(raw_extracted_data, os.path.basename(path), filter_code)
-                    data_found = True
-                    break 
-
-                except Exception as inner_e:
-                    sheet_errors.append(f"{sheet.name}: {str(inner_e)}")
-                    continue 
-
-            if not data_found:
-                if not sheet_errors:
-                    raise Exception(f"Koordinat Kata Kunci tidak ditemukan.")
-                else:
-                    raise Exception("; ".join(sheet_errors))
-
-        finally:
-            wb.close()
+            TRACE.write(TRACE_FILE)
+        except Exception as e:
+            logging.warning(f"[-] Trace tidak bisa ditulis: {str(e)}")
 
     # =========================================================================
-    # [ LOGIKA INTI: EKSTRAKSI & DUPLIKASI ]
+    # [ MANAJEMEN UI & EKSPOR ]
     # =========================================================================
 
-    def extract_data_manual(self, raw_data, filename, filter_code):
-        """
-        Logika Ekstraksi Data Manual dengan Pencarian Kolom Dinamis & Bertingkat (Fallback).
-        Mekanisme: UKP -> UKO -> Kode UKO.
-        """
-        if not raw_data or len(raw_data) < 2:
-            logging.warning("[-] Data hasil ekstraksi kosong atau hanya header.")
-            return
+    def update_ui_progress(self, value, text):
+        # Dipanggil dari utas pekerja: cukup masuk antrean, diterapkan pada tick UI berikutnya
+        self.ui_events.post_progress(value, text)
 
-        header_row = raw_data[0]
-        data_rows = raw_data[1:]
-        
-        # --- PENCARIAN INDEKS KOLOM DINAMIS (LOGIKA BERTINGKAT) ---
-        
-        # 1. Cari Unit Kerja Pelaksana (Prioritas Utama)
-        idx_uker = self.get_column_index(header_row, "Unit Kerja Pelaksana")
-        
-        # 2. Jika tidak ketemu, cari Unit Kerja Operasional
-        if idx_uker == -1:
-            logging.info("[I] Unit Kerja Pelaksana tidak ditemukan. Mencari Unit Kerja Operasional...")
-            idx_uker = self.get_column_index(header_row, "Unit Kerja Operasional")
-            
-        # 3. Jika tidak ketemu, cari Kode UKO
-        if idx_uker == -1:
-            logging.info("[I] Unit Kerja Operasional tidak ditemukan. Mencari Kode UKO...")
-            idx_uker = self.get_column_index(header_row, "Kode UKO")
-
-        # 4. Cari Kolom Kanca (Untuk kolom tambahan)
-        idx_kanca = self.get_column_index(header_row, "Kanca")
-        # Opsional: Jika Kanca tidak ada, bisa cari "Branch" atau "Cabang" jika diperlukan
-        if idx_kanca == -1:
-             idx_kanca = self.get_column_index(header_row, "Cabang")
-
-        logging.info(f"[I] Hasil Pemetaan Kolom: Unit Kerja (Indeks={idx_uker}), Kanca (Indeks={idx_kanca})")
-
-        regex_pattern = re.compile(filter_code, re.IGNORECASE)
-        count_found = 0
-
-        for row in data_rows:
-            # Pastikan baris memiliki cukup kolom
-            # Kita cari indeks maksimum yang dibutuhkan untuk menghindari IndexOutOfRange
-            max_idx = max(1, 4, 18, idx_uker, idx_kanca) 
-            if len(row) <= max_idx:
-                row = row + [None] * (max_idx - len(row) + 1)
-
-            # Ambil Kode (Asumsi Kolom B / Indeks 1 adalah Tipe Kasus/Kode)
-            raw_code = row[1]
-            clean_code = self.normalize_val(raw_code)
-            
-            # Pencocokan Pola (Regex Match)
-            if regex_pattern.search(clean_code):
-                
-                # Normalisasi Bidang Data Dasar
-                val_a = self.normalize_val(row[0])  # No Kasus
-                val_b = clean_code                  # Tipe Kasus
-                val_d = self.normalize_val(row[3])  # Deskripsi
-                val_e = self.normalize_val(row[4])  # Tanggal
-                
-                # Ekstraksi Dinamis untuk Unit Kerja (Sesuai Prioritas yang ditemukan)
-                val_uker = self.normalize_val(row[idx_uker]) if idx_uker != -1 else ""
-                
-                # Ekstraksi Dinamis untuk Kanca
-                val_kanca = self.normalize_val(row[idx_kanca]) if idx_kanca != -1 else ""
-                
-                # Cek Duplikasi Global
-                unique_key = (val_a, val_b)
-                
-                if unique_key in self.seen_cache:
-                    prev_file = self.seen_cache[unique_key]
-                    logging.info(f"[D] DUPLIKASI: {val_a}. Sumber Asal: {prev_file}. Mengabaikan.")
-                    continue 
-                
-                # Simpan Data Valid: [... , Unit Kerja, Kanca, Sumber]
-                self.seen_cache[unique_key] = filename
-                self.master_data.append([val_a, val_b, val_d, val_e, val_uker, val_kanca, filename])
-                count_found += 1
-
-        logging.info(f"[I] Ekstraksi {count_found} baris valid dari {filename}")
+    def drain_ui_events(self):
+        """Tick UI tetap (TICK_MS): terapkan status progres terakhir, sinkron tabel & panggilan tertunda."""
+        try:
+            snapshot, has_rows, calls = self.ui_events.drain()
+            if snapshot is not None:
+                value, maximum, text = snapshot
+                self.progress_bar["maximum"] = maximum
+                self.progress_bar["value"] = value
+                self.lbl_status.config(text=text)
+            if has_rows:
+                # Baris sudah ada di engine.master_data; tabel cukup menyinkronkan ekornya
+                self.table.sync()
+            for fn in calls:
+                fn()
+        finally:
+            self.root.after(TICK_MS, self.drain_ui_events)
 
-    # =========================================================================
-    # [ MANAJEMEN UI & EKSPOR ]
-    # =========================================================================
+    def on_file_done(self, index, path, rows, error):
+        """Dipanggil dari utas pekerja setiap file selesai: tabel disinkronkan pada tick berikutnya."""
+        if error is None:
+            self.done_files.add(os.path.basename(path))
+        if rows:
+            self.ui_events.post_rows()
 
-    def update_ui_progress(self, value, text):
-        self.root.after(0, lambda: self._do_update(value, text))
+    def schedule_filter(self, event=None):
+        """Debounce input filter agar tidak menyaring ulang di setiap ketukan."""
+        if self._filter_job is not None:
+            self.root.after_cancel(self._filter_job)
+        self._filter_job = self.root.after(250, self.apply_filter)
 
-    def _do_update(self, value, text):
-        self.progress_bar["value"] = value
-        self.lbl_status.config(text=text)
+    def apply_filter(self):
+        self._filter_job = None
+        self.table.set_filter(self.entry_search.get())
 
     def finish_processing(self):
+        self.ui_events.end_batch()
         self.is_processing = False
         self.btn_run.config(state="normal", bg=self.c_accent)
+        self.btn_folder.config(state="normal")
         self.btn_reset.config(state="normal")
-        self.refresh_table()
+
+        # Mode folder: catat berkas sukses ke manifest dan simpan hasil rekap
+        # Batch yang berhenti karena kegagalan sistem tidak di-commit sama sekali
+        if self.folder_state is not None:
+            if self.engine.aborted:
+                logging.warning("[-] Batch terhenti: manifest folder tidak diperbarui")
+            else:
+                self.folder_state.commit(self.engine.master_data, self.engine.dedup, self.done_files)
+            self.folder_state = None
         
-        if self.master_data:
+        if self.engine.master_data:
             self.btn_export.config(state="normal")
 
-        success_cnt = len(self.master_data)
-        error_cnt = len(self.failed_files)
-        self.lbl_status.config(text=f"Selesai! Data: {success_cnt}. Galat: {error_cnt}")
+        success_cnt = len(self.engine.master_data)
+        error_cnt = len(self.engine.failed_files)
+        dup_cnt = len(self.engine.duplicates)
+        if dup_cnt:
+            self.btn_dup.config(state="normal")
+        self.lbl_status.config(text=f"Selesai! Data: {success_cnt}. Duplikasi: {dup_cnt}. Galat: {error_cnt}")
+        if self.code_filter is not None and self.code_filter.multi:
+            counts = self.code_filter.bucket_counts(self.engine.master_data.value_counts(1))
+            summary = ", ".join(f"{label}: {n}" for label, n in counts.items())
+            self.lbl_status.config(text=self.lbl_status.cget("text") + f" | Kelompok: {summary}")
 
         if error_cnt > 0:
             self.show_error_window_gui()
@@ -528,14 +512,11 @@ class BRIProSystem:
             messagebox.showwarning("Peringatan", "Harap tunggu proses selesai.")
             return
         
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        self.master_data = []
-        self.failed_files = []
-        self.seen_cache = {}
+        self.engine.reset()
+        self.refresh_table()
         
         self.btn_export.config(state="disabled")
+        self.btn_dup.config(state="disabled")
         self.lbl_status.config(text="Status: Siap (Reset Selesai)")
         self.progress_bar["value"] = 0
         messagebox.showinfo("Atur Ulang", "Memori data dan cache duplikasi telah dikosongkan.")
@@ -568,47 +549,109 @@ class BRIProSystem:
         tree_err.pack(fill="both", expand=True)
 
         tree_err.tag_configure('err_row', foreground=self.c_danger)
-        for item in self.failed_files:
+        for item in self.engine.failed_files:
             tree_err.insert("", "end", values=(item['file'], item['msg']), tags=('err_row',))
 
+    def show_duplicate_window(self):
+        """Tabel duplikat (kunci, sumber terpilih, sumber lain) dari pass ekstraksi terakhir."""
+        report = self.engine.duplicates
+        cols = report.columns(self.cols)
+        rows = list(report.rows())
+
+        top = tk.Toplevel(self.root)
+        top.title("Laporan Duplikasi")
+        top.geometry("1000x550")
+        top.configure(bg="#F4F5F7")
+
+        tk.Label(top, text=f"📑 Laporan Duplikasi ({len(rows)} kunci)", bg="#F4F5F7", font=("Segoe UI", 14, "bold"), fg=self.c_primary).pack(pady=(15,5))
+
+        def save_report():
+            file_path = filedialog.asksaveasfilename(parent=top, defaultextension=".xlsx", filetypes=[("Berkas Excel", "*.xlsx"), ("Berkas CSV", "*.csv"), ("Berkas Parquet", "*.parquet")], initialfile=f"Duplikat_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx")
+            if not file_path: return
+            try:
+                export_rows(file_path, cols, rows)
+                messagebox.showinfo("Sukses", f"Laporan duplikasi disimpan di:\n{file_path}")
+            except Exception as e:
+                messagebox.showerror("Gagal Simpan", str(e))
+
+        tk.Button(top, text="💾 Simpan Laporan", bg=self.c_success, fg="white", font=("Segoe UI", 9, "bold"),
+                  relief="flat", padx=10, command=save_report).pack(anchor="e", padx=20, pady=(0, 5))
+
+        frame_table = tk.Frame(top)
+        frame_table.pack(fill="both", expand=True, padx=20, pady=(0, 20))
+        table = VirtualTable(frame_table, cols, rows)
+        for c in cols:
+            table.tree.column(c, width=300 if c in report.COLUMNS[:2] else 150)
+
     def refresh_table(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        for row in self.master_data:
-            self.tree.insert("", "end", values=row)
+        self.table.set_source(self.engine.master_data)
 
     def export_to_excel(self):
-        if not self.master_data: return
-        file_path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Berkas Excel", "*.xlsx")], initialfile=f"Rekap_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx")
+        """
+        Ekspor langsung dari engine.master_data lewat exporter.py (tanpa Excel
+        COM / DataFrame). Format mengikuti ekstensi: .xlsx, .csv, .parquet.
+        Penulisan berjalan di utas terpisah agar UI tetap responsif.
+        """
+        if not self.engine.master_data: return
+        file_path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Berkas Excel", "*.xlsx"), ("Berkas CSV", "*.csv"), ("Berkas Parquet", "*.parquet")], initialfile=f"Rekap_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx")
         if not file_path: return
-        
+
+        self.is_processing = True
+        for btn in (self.btn_run, self.btn_folder, self.btn_reset, self.btn_export, self.btn_dup):
+            btn.config(state="disabled")
+        self.ui_events.start_batch(len(self.engine.master_data), "baris")
+
+        t = threading.Thread(target=self.export_worker, args=(file_path,))
+        t.daemon = True
+        t.start()
+
+    def export_worker(self, file_path):
+        count, error = 0, None
+        progress = lambda done, total: self.update_ui_progress(done, f"Mengekspor: {done}/{total} baris")
         try:
-            app = xw.App(visible=False)
-            wb = app.books.add()
-            sheet = wb.sheets[0]
-            
-            # Tulis Header & Data
-            sheet.range("A1").value = [self.cols] + self.master_data
-            
-            wb.save(file_path)
-            wb.close()
-            app.quit()
-            messagebox.showinfo("Sukses", f"Berkas berhasil disimpan di:\n{file_path}")
+            count = export_rows(file_path, self.cols, self.engine.master_data, progress=progress)
+            # Laporan duplikat ikut diekspor di samping hasil utama: <nama>_duplikat.<ext>
+            if len(self.engine.duplicates):
+                base, ext = os.path.splitext(file_path)
+                report = self.engine.duplicates
+                export_rows(f"{base}_duplikat{ext}", report.columns(self.cols), list(report.rows()))
+            # Multi-kode: satu berkas tambahan per kelompok, <nama>_<label>.<ext>
+            if self.code_filter is not None and self.code_filter.multi:
+                for label in self.code_filter.labels:
+                    export_rows(bucket_path(file_path, label), self.cols,
+                                self.code_filter.bucket_rows(self.engine.master_data, label))
         except Exception as e:
-            messagebox.showerror("Gagal Simpan", str(e))
+            logging.error(f"[!] GALAT EKSPOR: {str(e)}")
+            error = str(e)
+        self.ui_events.post_call(lambda: self.finish_export(file_path, count, error))
+
+    def finish_export(self, file_path, count, error):
+        self.ui_events.end_batch()
+        self.is_processing = False
+        self.btn_run.config(state="normal", bg=self.c_accent)
+        for btn in (self.btn_folder, self.btn_reset, self.btn_export):
+            btn.config(state="normal")
+        if len(self.engine.duplicates):
+            self.btn_dup.config(state="normal")
+        if error:
+            self.lbl_status.config(text="Ekspor gagal.")
+            messagebox.showerror("Gagal Simpan", error)
+        else:
+            self.lbl_status.config(text=f"Ekspor selesai: {count} baris.")
+            messagebox.showinfo("Sukses", f"Berkas berhasil disimpan di:\n{file_path}\nTotal: {count} baris")
 
     def copy_tree(self, event):
-        sel = self.tree.selection()
-        if not sel: return
+        rows = self.table.selected_rows()
+        if not rows: return
         res = ""
-        for i in sel:
-            vals = self.tree.item(i, 'values')
+        for vals in rows:
             res += "\t".join(vals) + "\n"
         self.root.clipboard_clear()
         self.root.clipboard_append(res)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    setup_logging(LOG_FILE, level=logging.DEBUG)
     root = tk.Tk()
     app = BRIProSystem(root)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,84 @@
+from datetime import datetime
+from operator import itemgetter
+
+# =============================================================================
+# NORMALISASI NILAI SEL
+# =============================================================================
+
+DATE_FORMAT = "%d/%m/%Y"
+
+
+def normalize_val(val, date_format=DATE_FORMAT):
+    """
+    Normalisasi data mentah dari Excel menjadi String bersih.
+    Menangani kasus:
+    - NoneType -> ''
+    - Tanggal (datetime) -> `date_format` (None = str() apa adanya)
+    - Float dengan desimal .0 (8204.0 -> '8204')
+    - Whitespace cleaning
+    """
+    if val is None:
+        return ""
+
+    if date_format and isinstance(val, datetime):
+        return val.strftime(date_format)
+
+    if isinstance(val, (float, int)):
+        if float(val).is_integer():
+            return str(int(val))
+        else:
+            return str(val)
+
+    return str(val).strip()
+
+
+# =============================================================================
+# NORMALISASI PER KOLOM (SATU SHEET DETAIL SEKALIGUS)
+# =============================================================================
+# extract_data_manual menormalisasi kolom kode dulu (untuk filter), lalu kolom
+# lain HANYA untuk baris yang lolos filter. Kolom berulang (kode, tanggal,
+# unit kerja) memakai memo per nilai: setiap nilai unik cukup dinormalisasi
+# sekali, sisanya lookup dict di level C. Kolom unik (nomor kasus, deskripsi)
+# memakai jalur cepat teks tanpa memo agar tidak menggandakan memori.
+
+
+class _ColumnMemo(dict):
+    def __init__(self, date_format):
+        super().__init__()
+        self.date_format = date_format
+
+    def __missing__(self, val):
+        text = self[val] = normalize_val(val, self.date_format)
+        return text
+
+
+def take_column(rows, idx):
+    """Nilai kolom `idx` dari setiap baris; sel di luar panjang baris (atau idx -1) = None."""
+    if idx < 0:
+        return [None] * len(rows)
+    try:
+        return list(map(itemgetter(idx), rows))
+    except IndexError:
+        return [row[idx] if idx < len(row) else None for row in rows]
+
+
+def normalize_column(values, date_format=DATE_FORMAT, memo=False):
+    """
+    Versi kolom dari normalize_val (hasil identik per sel).
+    memo=True untuk kolom dengan banyak nilai berulang.
+    """
+    if memo:
+        try:
+            return list(map(_ColumnMemo(date_format).__getitem__, values))
+        except TypeError:
+            pass  # Nilai tidak hashable: jatuh ke jalur biasa
+    out = []
+    append = out.append
+    for val in values:
+        if val.__class__ is str:
+            append(val.strip())
+        elif val is None:
+            append("")
+        else:
+            append(normalize_val(val, date_format))
+    return out
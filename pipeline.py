@@ -0,0 +1,160 @@
+import csv
+import json
+import time
+import logging
+
+# =============================================================================
+# PIPELINE STREAMING: KONSUMEN HASIL PER FILE
+# =============================================================================
+# RecapEngine.run() mengirim baris baru setiap file ke semua konsumen segera
+# setelah file tersebut selesai, tanpa menunggu batch selesai:
+#   consumer.on_file(index, path, rows, error)
+#   consumer.close()   (dipanggil sekali di akhir batch, juga saat gagal)
+#
+# Dengan RecapEngine(keep_rows=False) baris tidak ditumpuk di master_data,
+# sehingga puncak memori dibatasi oleh satu sheet detail (data mentah satu
+# file) + indeks duplikat. Konsumen tidak boleh mengubah list `rows`.
+
+
+class RowConsumer:
+    """Basis konsumen; turunan cukup meng-override yang dibutuhkan."""
+
+    def on_file(self, index, path, rows, error):
+        pass
+
+    def close(self):
+        pass
+
+
+class CallbackConsumer(RowConsumer):
+    """Meneruskan hasil per file ke fungsi biasa (mis. penjadwal UI Tkinter)."""
+
+    def __init__(self, on_file, on_close=None):
+        self._on_file = on_file
+        self._on_close = on_close
+
+    def on_file(self, index, path, rows, error):
+        self._on_file(index, path, rows, error)
+
+    def close(self):
+        if self._on_close:
+            self._on_close()
+
+
+class CounterConsumer(RowConsumer):
+    """Penghitung ringkas: total baris, file sukses/gagal, baris per file, durasi."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.rows = 0
+        self.files_ok = 0
+        self.files_failed = 0
+        self.per_file = {}
+
+    def on_file(self, index, path, rows, error):
+        if error:
+            self.files_failed += 1
+        else:
+            self.files_ok += 1
+        self.per_file[path] = len(rows)
+        self.rows += len(rows)
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def summary(self):
+        return (f"{self.rows} baris unik dari {self.files_ok + self.files_failed} file "
+                f"({self.files_failed} gagal) dalam {self.elapsed:.2f} detik")
+
+
+class StreamWriter(RowConsumer):
+    """
+    Penulis inkremental csv / json / jsonl. Baris setiap file langsung ditulis
+    dan di-flush, sehingga hasil parsial sudah tersedia selama batch berjalan.
+    """
+
+    FORMATS = ("csv", "json", "jsonl")
+
+    def __init__(self, fh, fmt, cols):
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Format output tidak dikenal: {fmt}")
+        self.fh = fh
+        self.fmt = fmt
+        self.cols = cols
+        self.count = 0
+        if fmt == "csv":
+            self.csv = csv.writer(fh)
+            self.csv.writerow(cols)
+        elif fmt == "json":
+            fh.write("[")
+
+    def on_file(self, index, path, rows, error):
+        if rows:
+            self.write_rows(rows)
+
+    def write_rows(self, rows):
+        if self.fmt == "csv":
+            self.csv.writerows(rows)
+        else:
+            for i, row in enumerate(rows):
+                record = json.dumps(dict(zip(self.cols, row)), ensure_ascii=False)
+                if self.fmt == "json":
+                    self.fh.write(("," if self.count + i else "") + "\n  " + record)
+                else:
+                    self.fh.write(record + "\n")
+        self.count += len(rows)
+        self.fh.flush()
+
+    def close(self):
+        if self.fmt == "json":
+            self.fh.write("\n]\n" if self.count else "]\n")
+        self.fh.flush()
+
+
+class BucketWriter(RowConsumer):
+    """
+    Satu StreamWriter per kelompok kode (lihat code_filter.py). Baris dirutekan
+    ke SETIAP kelompok yang cocok dengan kolom kode-nya; berkas kelompok
+    dibuka di awal (kelompok tanpa baris tetap menghasilkan berkas berheader).
+    """
+
+    def __init__(self, paths, fmt, cols, code_filter, code_col=1):
+        self.code_filter = code_filter
+        self.code_col = code_col
+        self.handles = {}
+        self.writers = {}
+        for label, path in paths.items():
+            fh = open(path, "w", encoding="utf-8", newline="")
+            self.handles[label] = fh
+            self.writers[label] = StreamWriter(fh, fmt, cols)
+
+    def on_file(self, index, path, rows, error):
+        if not rows:
+            return
+        buckets = {}
+        match = self.code_filter.match
+        for row in rows:
+            for label in match(row[self.code_col]):
+                buckets.setdefault(label, []).append(row)
+        for label, bucket_rows in buckets.items():
+            self.writers[label].write_rows(bucket_rows)
+
+    def counts(self):
+        return {label: writer.count for label, writer in self.writers.items()}
+
+    def close(self):
+        try:
+            close_all(self.writers.values())
+        finally:
+            for fh in self.handles.values():
+                fh.close()
+
+
+def close_all(consumers):
+    """Tutup semua konsumen; galat satu konsumen tidak menghalangi yang lain."""
+    for consumer in consumers:
+        try:
+            consumer.close()
+        except Exception as e:
+            logging.error(f"[!] GALAT PENUTUPAN KONSUMEN {type(consumer).__name__}: {str(e)}")
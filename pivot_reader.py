@@ -0,0 +1,552 @@
+import zipfile
+import posixpath
+import re
+import logging
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+
+# =============================================================================
+# PEMBACA PIVOT CACHE TANPA EXCEL (HEADLESS DRILL-DOWN)
+# =============================================================================
+# Membaca paket .xlsx (arsip zip) secara langsung tanpa COM:
+# - xl/workbook.xml + relasi         : daftar sheet
+# - xl/worksheets/sheetN.xml          : nilai sel (untuk pemindaian kata kunci)
+# - xl/pivotTables/pivotTableN.xml    : tata letak pivot (rowItems/colItems)
+# - xl/pivotCache/pivotCacheDefinition: nama field + shared items
+# - xl/pivotCache/pivotCacheRecords   : baris data sumber
+#
+# Hasil `show_detail` setara dengan lembar baru dari `ShowDetail = True`
+# (header + baris detail) sehingga bisa langsung masuk ke `extract_data_manual`.
+
+PIVOT_TABLE_REL = "/pivotTable"
+PIVOT_CACHE_DEF_REL = "/pivotCacheDefinition"
+PIVOT_CACHE_REC_REL = "/pivotCacheRecords"
+
+# ID format angka bawaan Excel yang merupakan tanggal/waktu
+BUILTIN_DATE_FORMATS = set(range(14, 23)) | {45, 46, 47}
+
+_CELL_REF = re.compile(r"([A-Z]+)(\d+)")
+
+
+class PivotReaderError(Exception):
+    """Kesalahan pembacaan struktur pivot dari paket .xlsx."""
+
+
+def _local(tag):
+    """Mengambil nama tag tanpa namespace ('{ns}row' -> 'row')."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _children(elem, name):
+    return [ch for ch in elem if _local(ch.tag) == name]
+
+
+def _child(elem, name):
+    for ch in elem:
+        if _local(ch.tag) == name:
+            return ch
+    return None
+
+
+def parse_cell_ref(ref):
+    """Konversi referensi A1 menjadi (baris, kolom) berbasis 1. Contoh: 'AB12' -> (12, 28)."""
+    match = _CELL_REF.match(ref.replace("$", "").upper())
+    if not match:
+        raise PivotReaderError(f"Referensi sel tidak valid: {ref}")
+    letters, digits = match.groups()
+    col = 0
+    for ch in letters:
+        col = col * 26 + (ord(ch) - 64)
+    return int(digits), col
+
+
+def parse_range_ref(ref):
+    """Konversi 'A3:E20' menjadi ((r1, c1), (r2, c2))."""
+    parts = ref.split(":")
+    first = parse_cell_ref(parts[0])
+    last = parse_cell_ref(parts[-1])
+    return first, last
+
+
+def excel_serial_to_datetime(serial, date1904=False):
+    """Konversi nomor seri tanggal Excel menjadi datetime."""
+    base = datetime(1904, 1, 1) if date1904 else datetime(1899, 12, 30)
+    return base + timedelta(days=float(serial))
+
+
+def _is_date_format(code):
+    """Heuristik format angka kustom: mengandung token d/m/y/h/s di luar tanda kutip/kurung."""
+    cleaned = re.sub(r'"[^"]*"|\[[^\]]*\]|\\.', "", code.lower())
+    return any(tok in cleaned for tok in ("d", "m", "y", "h", "s"))
+
+
+class PivotWorkbook:
+    """
+    Representasi read-only satu workbook .xlsx untuk mode headless.
+
+    Teknis:
+    - Hanya membuka arsip zip dan mem-parsing XML yang dibutuhkan (lazy).
+    - `read_sheet` meniru `sheet.used_range` (nilai + baris/kolom awal).
+    - `show_detail` meniru `ShowDetail = True` pada sel pivot.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            self.zf = zipfile.ZipFile(path)
+        except zipfile.BadZipFile as e:
+            raise PivotReaderError(f"Bukan paket .xlsx yang valid: {e}")
+        self._shared_strings = None
+        self._styles = None
+        self._cache_defs = {}
+        self.date1904 = False
+
+        wb_root = self._parse("xl/workbook.xml")
+        wb_pr = _child(wb_root, "workbookPr")
+        if wb_pr is not None and wb_pr.get("date1904") in ("1", "true"):
+            self.date1904 = True
+
+        rels = self._rels("xl/workbook.xml")
+        self.sheet_paths = {}
+        self.sheet_names = []
+        sheets_el = _child(wb_root, "sheets")
+        for sh in (sheets_el if sheets_el is not None else []):
+            rid = sh.get(f"{{{_rel_ns(sh)}}}id") or sh.get("id")
+            target = rels.get(rid)
+            if target is None:
+                continue
+            self.sheet_names.append(sh.get("name"))
+            self.sheet_paths[sh.get("name")] = target[1]
+
+    # -------------------------------------------------------------------------
+    # Utilitas Paket
+    # -------------------------------------------------------------------------
+
+    def close(self):
+        self.zf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _parse(self, part):
+        try:
+            with self.zf.open(part) as fh:
+                return ET.parse(fh).getroot()
+        except KeyError:
+            raise PivotReaderError(f"Bagian paket tidak ditemukan: {part}")
+
+    def _rels(self, part):
+        """Membaca berkas .rels milik `part`. Hasil: {rId: (Type, path absolut)}."""
+        folder, name = posixpath.split(part)
+        rels_part = posixpath.join(folder, "_rels", name + ".rels")
+        if rels_part not in self.zf.namelist():
+            return {}
+        root = self._parse(rels_part)
+        result = {}
+        for rel in root:
+            target = rel.get("Target", "")
+            if target.startswith("/"):
+                full = target.lstrip("/")
+            else:
+                full = posixpath.normpath(posixpath.join(folder, target))
+            result[rel.get("Id")] = (rel.get("Type", ""), full)
+        return result
+
+    def _load_shared_strings(self):
+        if self._shared_strings is not None:
+            return self._shared_strings
+        self._shared_strings = []
+        if "xl/sharedStrings.xml" not in self.zf.namelist():
+            return self._shared_strings
+        with self.zf.open("xl/sharedStrings.xml") as fh:
+            for _, elem in ET.iterparse(fh):
+                if _local(elem.tag) != "si":
+                    continue
+                # Gabungkan semua <t> (termasuk rich text <r>), abaikan fonetik <rPh>
+                parts = []
+                for ch in elem:
+                    tag = _local(ch.tag)
+                    if tag == "t":
+                        parts.append(ch.text or "")
+                    elif tag == "r":
+                        t_el = _child(ch, "t")
+                        if t_el is not None:
+                            parts.append(t_el.text or "")
+                self._shared_strings.append("".join(parts))
+                elem.clear()
+        return self._shared_strings
+
+    def _load_date_styles(self):
+        """Mengembalikan set indeks cellXfs yang berformat tanggal."""
+        if self._styles is not None:
+            return self._styles
+        self._styles = set()
+        if "xl/styles.xml" not in self.zf.namelist():
+            return self._styles
+        root = self._parse("xl/styles.xml")
+        custom_dates = set()
+        num_fmts = _child(root, "numFmts")
+        for fmt in (num_fmts if num_fmts is not None else []):
+            if _is_date_format(fmt.get("formatCode", "")):
+                custom_dates.add(int(fmt.get("numFmtId")))
+        xfs = _child(root, "cellXfs")
+        for idx, xf in enumerate(xfs if xfs is not None else []):
+            fmt_id = int(xf.get("numFmtId", "0"))
+            if fmt_id in BUILTIN_DATE_FORMATS or fmt_id in custom_dates:
+                self._styles.add(idx)
+        return self._styles
+
+    # -------------------------------------------------------------------------
+    # Pembacaan Sheet (Setara used_range)
+    # -------------------------------------------------------------------------
+
+    def _cell_value(self, c_el):
+        c_type = c_el.get("t", "n")
+        if c_type == "inlineStr":
+            is_el = _child(c_el, "is")
+            if is_el is None:
+                return None
+            return "".join((t.text or "") for t in is_el.iter() if _local(t.tag) == "t")
+        v_el = _child(c_el, "v")
+        if v_el is None or v_el.text is None:
+            return None
+        raw = v_el.text
+        if c_type == "s":
+            return self._load_shared_strings()[int(raw)]
+        if c_type in ("str", "inlineStr"):
+            return raw
+        if c_type == "b":
+            return raw in ("1", "true")
+        if c_type == "e":
+            return None
+        if c_type == "d":
+            return datetime.fromisoformat(raw)
+        num = float(raw)
+        style = c_el.get("s")
+        if style is not None and int(style) in self._load_date_styles():
+            return excel_serial_to_datetime(num, self.date1904)
+        return num
+
+    def read_sheet(self, name, max_rows=None, max_cols=None):
+        """
+        Membaca nilai sheet menjadi grid 2D (list of list) seperti `used_range.value`.
+
+        Returns:
+            (values, start_row, start_col). `values` kosong jika sheet tanpa isi.
+            `max_rows`/`max_cols` membatasi area baca relatif dari A1.
+        """
+        part = self.sheet_paths.get(name)
+        if part is None:
+            raise PivotReaderError(f"Sheet tidak ditemukan: {name}")
+
+        cells = {}
+        min_r = min_c = None
+        max_r = max_c = 0
+        sheet_data = None
+        with self.zf.open(part) as fh:
+            for event, elem in ET.iterparse(fh, events=("start", "end")):
+                tag = _local(elem.tag)
+                if event == "start":
+                    if tag == "sheetData":
+                        sheet_data = elem
+                    continue
+                if tag == "c":
+                    ref = elem.get("r")
+                    val = self._cell_value(elem)
+                    elem.clear()
+                    if val is None or ref is None:
+                        continue
+                    r, c = parse_cell_ref(ref)
+                    if (max_rows and r > max_rows) or (max_cols and c > max_cols):
+                        continue
+                    cells[(r, c)] = val
+                    min_r = r if min_r is None else min(min_r, r)
+                    min_c = c if min_c is None else min(min_c, c)
+                    max_r = max(max_r, r)
+                    max_c = max(max_c, c)
+                elif tag == "row":
+                    row_num = int(elem.get("r", "0") or 0)
+                    if sheet_data is not None:
+                        sheet_data.clear()  # Lepas baris yang sudah dibaca (hemat memori)
+                    if max_rows and row_num >= max_rows:
+                        break
+
+        if not cells:
+            return [], 1, 1
+
+        values = [[None] * (max_c - min_c + 1) for _ in range(max_r - min_r + 1)]
+        for (r, c), val in cells.items():
+            values[r - min_r][c - min_c] = val
+        return values, min_r, min_c
+
+    # -------------------------------------------------------------------------
+    # Struktur Pivot
+    # -------------------------------------------------------------------------
+
+    def _pivot_tables(self, sheet_name):
+        """Daftar (path pivotTable, elemen root) pada satu sheet."""
+        part = self.sheet_paths.get(sheet_name)
+        if part is None:
+            raise PivotReaderError(f"Sheet tidak ditemukan: {sheet_name}")
+        result = []
+        for rel_type, target in self._rels(part).values():
+            if rel_type.endswith(PIVOT_TABLE_REL):
+                result.append((target, self._parse(target)))
+        return result
+
+    def _cache_definition(self, pt_part):
+        """Memuat definisi cache (field + shared items) milik sebuah pivotTable."""
+        cache_part = None
+        for rel_type, target in self._rels(pt_part).values():
+            if rel_type.endswith(PIVOT_CACHE_DEF_REL):
+                cache_part = target
+        if cache_part is None:
+            raise PivotReaderError("ShowDetail: Pivot Cache tidak ditemukan dalam paket.")
+        if cache_part in self._cache_defs:
+            return self._cache_defs[cache_part]
+
+        root = self._parse(cache_part)
+        fields = []
+        fields_el = _child(root, "cacheFields")
+        for cf in (fields_el if fields_el is not None else []):
+            shared = []
+            shared_el = _child(cf, "sharedItems")
+            for item in (shared_el if shared_el is not None else []):
+                shared.append(_cache_value(item))
+            fields.append({
+                "name": cf.get("name", ""),
+                "shared": shared,
+                "is_db": cf.get("formula") is None and cf.get("databaseField", "1") not in ("0", "false"),
+                "grouped": _child(cf, "fieldGroup") is not None,
+            })
+
+        records_part = None
+        for rel_type, target in self._rels(cache_part).values():
+            if rel_type.endswith(PIVOT_CACHE_REC_REL):
+                records_part = target
+
+        source = None
+        src_el = _child(root, "cacheSource")
+        if src_el is not None:
+            ws_el = _child(src_el, "worksheetSource")
+            if ws_el is not None:
+                source = (ws_el.get("sheet"), ws_el.get("ref"))
+
+        cache = {"fields": fields, "records_part": records_part, "source": source}
+        self._cache_defs[cache_part] = cache
+        return cache
+
+    def _iter_records(self, cache):
+        """
+        Iterasi baris cache. Setiap entri record berupa (indeks_shared, nilai):
+        indeks_shared = None untuk nilai inline.
+        """
+        db_fields = [f for f in cache["fields"] if f["is_db"]]
+        if cache["records_part"] and cache["records_part"] in self.zf.namelist():
+            root = None
+            with self.zf.open(cache["records_part"]) as fh:
+                for event, elem in ET.iterparse(fh, events=("start", "end")):
+                    if event == "start":
+                        if root is None:
+                            root = elem
+                        continue
+                    if _local(elem.tag) != "r":
+                        continue
+                    entries = []
+                    for pos, ch in enumerate(elem):
+                        if _local(ch.tag) == "x":
+                            idx = int(ch.get("v", "0"))
+                            entries.append((idx, db_fields[pos]["shared"][idx]))
+                        else:
+                            entries.append((None, _cache_value(ch)))
+                    root.clear()  # Lepas record yang sudah dibaca (hemat memori)
+                    yield entries
+            return
+
+        # Cache tanpa data tersimpan (saveData=0): baca langsung range sumber
+        if not cache["source"] or not cache["source"][0] or not cache["source"][1]:
+            raise PivotReaderError("ShowDetail: Pivot Cache tidak menyimpan data dan sumber tidak terbaca.")
+        sheet_name, ref = cache["source"]
+        (r1, c1), (r2, c2) = parse_range_ref(ref)
+        values, start_r, start_c = self.read_sheet(sheet_name, max_rows=r2, max_cols=c2)
+        for r in range(r1 + 1, r2 + 1):  # Lewati baris header sumber
+            gr = r - start_r
+            if gr < 0 or gr >= len(values):
+                continue
+            row = values[gr]
+            entries = []
+            for c in range(c1, c2 + 1):
+                gc = c - start_c
+                val = row[gc] if 0 <= gc < len(row) else None
+                entries.append((None, val))
+            yield entries
+
+    def _locate(self, sheet_name, row, col):
+        """Mencari pivot table yang area datanya memuat sel (row, col)."""
+        for pt_part, pt_root in self._pivot_tables(sheet_name):
+            loc = _child(pt_root, "location")
+            if loc is None:
+                continue
+            (r1, c1), (r2, c2) = parse_range_ref(loc.get("ref"))
+            data_r0 = r1 + int(loc.get("firstDataRow", "0"))
+            data_c0 = c1 + int(loc.get("firstDataCol", "0"))
+            if data_r0 <= row <= r2 and data_c0 <= col <= c2:
+                return pt_part, pt_root, row - data_r0, col - data_c0
+        raise PivotReaderError("ShowDetail: sel target bukan bagian area data Pivot Table.")
+
+    def show_detail(self, sheet_name, row, col):
+        """
+        Setara `sheet.cells(row, col).api.ShowDetail = True` + `used_range.value`.
+
+        Returns:
+            list of list: baris header (nama field sumber) diikuti baris detail.
+        """
+        pt_part, pt_root, row_idx, col_idx = self._locate(sheet_name, row, col)
+        # Filter label/nilai (<filters>) tidak diterjemahkan ke batasan record;
+        # serahkan ke Excel daripada mengembalikan baris yang dikecualikan pivot
+        filters_el = _child(pt_root, "filters")
+        if filters_el is not None and len(filters_el):
+            raise PivotReaderError("ShowDetail: filter label/nilai pivot belum didukung mode headless.")
+        cache = self._cache_definition(pt_part)
+        fields = cache["fields"]
+
+        pivot_fields = []
+        pf_el = _child(pt_root, "pivotFields")
+        for pf in (pf_el if pf_el is not None else []):
+            items = []
+            items_el = _child(pf, "items")
+            for it in (items_el if items_el is not None else []):
+                x = it.get("x")
+                items.append({
+                    "x": int(x) if x is not None else None,
+                    "hidden": it.get("h") in ("1", "true"),
+                })
+            pivot_fields.append(items)
+
+        # Kumpulkan batasan: {indeks_field_cache: set(indeks_shared)}
+        constraints = {}
+        excluded = {}
+        for fld_idx, items in enumerate(pivot_fields):
+            hidden = {it["x"] for it in items if it["hidden"] and it["x"] is not None}
+            if hidden:
+                excluded[fld_idx] = hidden
+
+        for axis_fields, axis_items, idx in (
+            ("rowFields", "rowItems", row_idx),
+            ("colFields", "colItems", col_idx),
+        ):
+            for fld_idx, item_x in _axis_members(pt_root, axis_fields, axis_items, idx):
+                item = pivot_fields[fld_idx][item_x]
+                if item["x"] is None:
+                    raise PivotReaderError("ShowDetail: item pivot tidak memiliki referensi cache.")
+                constraints[fld_idx] = {item["x"]}
+
+        page_el = _child(pt_root, "pageFields")
+        for pg in (page_el if page_el is not None else []):
+            if pg.get("item") is None:
+                continue
+            fld_idx = int(pg.get("fld"))
+            item = pivot_fields[fld_idx][int(pg.get("item"))]
+            constraints[fld_idx] = {item["x"]}
+
+        for fld_idx in list(constraints) + list(excluded):
+            if fields[fld_idx]["grouped"]:
+                raise PivotReaderError(f"ShowDetail: field grup '{fields[fld_idx]['name']}' belum didukung mode headless.")
+
+        # Posisi entri record mengikuti urutan field database (tanpa field kalkulasi)
+        db_positions = {}
+        header = []
+        for cache_idx, f in enumerate(fields):
+            if f["is_db"]:
+                db_positions[cache_idx] = len(header)
+                header.append(f["name"])
+
+        checks = []
+        for fld_idx, allowed in constraints.items():
+            shared = fields[fld_idx]["shared"]
+            checks.append((db_positions[fld_idx], allowed, {_hashable(shared[i]) for i in allowed}, True))
+        for fld_idx, hidden in excluded.items():
+            if fld_idx in constraints:
+                continue
+            shared = fields[fld_idx]["shared"]
+            checks.append((db_positions[fld_idx], hidden, {_hashable(shared[i]) for i in hidden}, False))
+
+        result = [header]
+        for entries in self._iter_records(cache):
+            keep = True
+            for pos, idx_set, val_set, must_match in checks:
+                shared_idx, val = entries[pos]
+                hit = (shared_idx in idx_set) if shared_idx is not None else (_hashable(val) in val_set)
+                if hit != must_match:
+                    keep = False
+                    break
+            if keep:
+                result.append([val for _, val in entries])
+
+        logging.info(f"[+] HEADLESS DRILL: {len(result) - 1} baris detail dari {sheet_name}")
+        return result
+
+
+def _rel_ns(elem):
+    """Namespace relasi 'r:' mengikuti namespace dokumen (transitional/strict)."""
+    for key in elem.attrib:
+        if key.endswith("}id"):
+            return key[1:].rsplit("}", 1)[0]
+    return "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+
+def _cache_value(item):
+    """Konversi elemen shared item / record (s, n, d, b, m, e) ke nilai Python."""
+    tag = _local(item.tag)
+    v = item.get("v")
+    if tag == "s":
+        return v
+    if tag == "n":
+        return float(v)
+    if tag == "d":
+        return datetime.fromisoformat(v)
+    if tag == "b":
+        return v in ("1", "true")
+    return None  # m (missing) dan e (error)
+
+
+def _hashable(val):
+    """Samakan representasi angka (1 vs 1.0) agar pencocokan inline konsisten."""
+    if isinstance(val, float) and val.is_integer():
+        return int(val)
+    return val
+
+
+def _axis_members(pt_root, fields_tag, items_tag, index):
+    """
+    Menerjemahkan baris/kolom ke-`index` area data menjadi pasangan
+    (indeks_pivot_field, indeks_item). Item 'grand' tidak menghasilkan batasan;
+    subtotal hanya membatasi field luar (prefix).
+    """
+    fields_el = _child(pt_root, fields_tag)
+    items_el = _child(pt_root, items_tag)
+    fields = [int(f.get("x")) for f in (fields_el if fields_el is not None else [])]
+    items = list(items_el) if items_el is not None else []
+    if not fields:
+        return []
+    if index >= len(items):
+        raise PivotReaderError("ShowDetail: sel target di luar item pivot.")
+
+    members = []
+    target = None
+    for pos, it in enumerate(items):
+        repeat = int(it.get("r", "0"))
+        members = members[:repeat] + [int(x.get("v", "0")) for x in _children(it, "x")]
+        if pos == index:
+            target = it
+            break
+
+    item_type = target.get("t", "data")
+    if item_type == "grand":
+        return []
+    if item_type == "blank":
+        raise PivotReaderError("ShowDetail: sel target adalah baris kosong pivot.")
+    return [(fld, member) for fld, member in zip(fields, members) if fld != -2]
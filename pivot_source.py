@@ -0,0 +1,197 @@
+import re
+import logging
+from datetime import datetime
+
+# =============================================================================
+# DETAIL PIVOT DARI DATA SUMBER (TANPA SHOWDETAIL, MODE EXCEL)
+# =============================================================================
+# ShowDetail membuat worksheet baru di workbook sumber; untuk pivot besar
+# pembuatan sheet itu langkah paling lambat. Jalur ini membaca objek
+# PivotTable/PivotCache lewat COM:
+#   1. PivotCell sel target -> item baris/kolom (batasan field = item).
+#   2. Page field (filter laporan) & item tersembunyi pada field aktif.
+#   3. PivotCache().SourceData -> range sumber di workbook yang sama,
+#      dibaca sekali (header + record), lalu difilter di Python.
+# Urutan & isi kolom sama dengan lembar ShowDetail (header sumber + record
+# berurutan). Jika ada yang tidak bisa dipastikan (sumber eksternal/OLAP,
+# field grup/kalkulasi, filter label/nilai, item tidak cocok, atau total
+# Count/Sum tidak sama dengan nilai sel) -> SourceDetailUnavailable dan
+# pemanggil kembali ke ShowDetail. Galat COM (pywintypes.com_error) maupun
+# AttributeError dari properti yang tidak tersedia di versi Excel tertentu
+# juga diubah menjadi SourceDetailUnavailable.
+
+XL_DATABASE = 1
+XL_R1C1 = -4150
+XL_A1 = 1
+XL_COUNT = -4112
+XL_SUM = -4157
+BLANK_ITEM = "(blank)"
+
+try:
+    from pywintypes import com_error
+except ImportError:     # Tanpa pywin32 (mis. mesin tiruan): tidak ada galat COM asli
+    class com_error(Exception):
+        pass
+
+COM_ERRORS = (com_error, AttributeError)
+
+_DATE_FORMATS = ("%m/%d/%Y", "%d/%m/%Y", "%Y-%m-%d", "%m/%d/%Y %H:%M:%S", "%d/%m/%Y %H:%M:%S")
+
+
+class SourceDetailUnavailable(Exception):
+    pass
+
+
+def _com_items(collection):
+    """Iterasi koleksi COM (indeks 1-based)."""
+    for i in range(1, collection.Count + 1):
+        yield collection.Item(i)
+
+
+def _item_key(text):
+    return str(text).strip().lower()
+
+
+def _value_keys(val):
+    """Kemungkinan teks item pivot untuk satu nilai sumber (dicocokkan dengan PivotItem.SourceName)."""
+    if val is None or (isinstance(val, str) and not val.strip()):
+        return {_item_key(BLANK_ITEM)}
+    if isinstance(val, bool):
+        return {"true" if val else "false"}
+    if isinstance(val, (int, float)):
+        keys = {_item_key(val), f"{val:g}".lower()}
+        if float(val).is_integer():
+            keys.add(str(int(val)))
+        return keys
+    if isinstance(val, datetime):
+        keys = {val.strftime(fmt) for fmt in _DATE_FORMATS}
+        # m/d/yyyy tanpa nol di depan (format SourceName Excel en-US)
+        keys.add(f"{val.month}/{val.day}/{val.year}")
+        return {_item_key(k) for k in keys}
+    return {_item_key(val)}
+
+
+class _FieldCheck:
+    """Batasan satu kolom sumber: harus termasuk `include` dan tidak termasuk `exclude`."""
+
+    def __init__(self, name, position):
+        self.name = name
+        self.position = position
+        self.include = None
+        self.exclude = set()
+        self._memo = {}
+
+    def accepts(self, val):
+        try:
+            hit = self._memo[val]
+        except (KeyError, TypeError):
+            keys = _value_keys(val)
+            hit = ((self.include is None or bool(keys & self.include))
+                   and not (keys & self.exclude))
+            try:
+                self._memo[val] = hit
+            except TypeError:
+                pass
+        return hit
+
+
+def _source_range(app, wb, cache):
+    if cache.SourceType != XL_DATABASE or getattr(cache, "OLAP", False):
+        raise SourceDetailUnavailable("sumber pivot bukan range worksheet")
+    source = cache.SourceData
+    address = app.api.ConvertFormula(source, XL_R1C1, XL_A1) if re.search(r"R\d+C\d+", source) else source
+    rng = app.api.Range(address)
+    if rng.Worksheet.Parent.Name != wb.name:
+        raise SourceDetailUnavailable(f"sumber pivot di workbook lain ({rng.Worksheet.Parent.Name})")
+    return wb.sheets[rng.Worksheet.Name].range(rng.Address).options(ndim=2).value
+
+
+def _build_checks(pc, pt, header):
+    positions = {}
+    for pos, name in enumerate(header):
+        positions.setdefault(_item_key(name), pos)
+    checks = {}
+
+    def check_for(field):
+        if field.IsCalculated or field.PivotFilters.Count:
+            raise SourceDetailUnavailable(f"field '{field.Name}' kalkulasi / memakai filter label-nilai")
+        pos = positions.get(_item_key(field.SourceName))
+        if pos is None:
+            raise SourceDetailUnavailable(f"field '{field.Name}' tidak ada di sumber (grup?)")
+        if pos not in checks:
+            checks[pos] = _FieldCheck(field.SourceName, pos)
+        return checks[pos]
+
+    # Item baris/kolom sel target
+    for items in (pc.RowItems, pc.ColumnItems):
+        for item in _com_items(items):
+            check = check_for(item.Parent)
+            check.include = {_item_key(item.SourceName)}
+
+    # Filter laporan (page field)
+    for field in _com_items(pt.PageFields):
+        check = check_for(field)
+        if not field.EnableMultiplePageItems:
+            page = field.CurrentPage.SourceName
+            if _item_key(page) not in ("(all)", "(semua)"):
+                check.include = {_item_key(page)}
+
+    # Item tersembunyi pada field aktif (berlaku juga untuk total)
+    for fields in (pt.RowFields, pt.ColumnFields, pt.PageFields):
+        for field in _com_items(fields):
+            hidden = {_item_key(item.SourceName) for item in _com_items(field.HiddenItems)}
+            if hidden:
+                check_for(field).exclude |= hidden
+    return list(checks.values())
+
+
+def _verify(pt, header, rows, cell_value):
+    """Cocokkan jumlah/total baris dengan nilai sel jika data field tunggal Count/Sum."""
+    if pt.DataFields.Count != 1 or not isinstance(cell_value, (int, float)):
+        return
+    data_field = pt.DataFields.Item(1)
+    if data_field.Function == XL_COUNT:
+        expected = len(rows)
+    elif data_field.Function == XL_SUM:
+        positions = [i for i, name in enumerate(header) if _item_key(name) == _item_key(data_field.SourceName)]
+        if not positions:
+            raise SourceDetailUnavailable("kolom data field tidak ada di sumber")
+        pos = positions[0]
+        expected = sum(row[pos] for row in rows if isinstance(row[pos], (int, float)))
+    else:
+        return
+    if abs(expected - cell_value) > 1e-6 * max(1.0, abs(cell_value)):
+        raise SourceDetailUnavailable(f"total {expected} != nilai sel {cell_value} (cache belum di-refresh?)")
+
+
+def pivot_source_detail(app, wb, target_cell):
+    """
+    Pengganti `target_cell.api.ShowDetail = True` + `used_range.value`:
+    header sumber + record yang lolos batasan pivot untuk sel target.
+    """
+    try:
+        pc = target_cell.api.PivotCell
+        pt = pc.PivotTable
+        cache = pt.PivotCache()
+    except Exception as e:
+        raise SourceDetailUnavailable(f"sel target bukan bagian Pivot Table ({str(e)})")
+
+    try:
+        data = _source_range(app, wb, cache)
+        if not data or len(data) < 2:
+            raise SourceDetailUnavailable("range sumber kosong")
+        header, records = data[0], data[1:]
+        checks = _build_checks(pc, pt, header)
+    except COM_ERRORS as e:
+        raise SourceDetailUnavailable(f"objek pivot tidak bisa dibaca lewat COM ({str(e)})")
+
+    rows = [row for row in records if all(check.accepts(row[check.position]) for check in checks)]
+    if not rows:
+        raise SourceDetailUnavailable("tidak ada record yang cocok dengan item pivot")
+    try:
+        _verify(pt, header, rows, target_cell.value)
+    except COM_ERRORS as e:
+        raise SourceDetailUnavailable(f"total pivot tidak bisa diverifikasi lewat COM ({str(e)})")
+
+    logging.info(f"[+] DETAIL DARI SUMBER PIVOT: {len(rows)} baris dari {len(records)} record")
+    return [list(header)] + rows
@@ -0,0 +1,177 @@
+import os
+import re
+import sys
+import glob
+import logging
+import argparse
+import multiprocessing
+
+from engine import RecapEngine, LAYOUTS
+from dedup_policy import POLICIES, REPLACING_POLICIES
+from exporter import export_rows
+from result_cache import ResultCache, DEFAULT_CACHE_DIR
+from pipeline import CallbackConsumer, CounterConsumer, StreamWriter, BucketWriter
+from code_filter import CodeFilter, MATCH_MODES, bucket_path
+from run_trace import TRACE
+from log_setup import setup_logging
+
+# =============================================================================
+# ENTRY POINT COMMAND-LINE (TANPA GUI)
+# =============================================================================
+# Contoh:
+#   python rekap_cli.py "data/*.xlsx" --code 8204 --workers 4 --format csv -o rekap.csv
+#   python rekap_cli.py "data/**/*.xlsx" --row "bandar.*lampung" --format jsonl
+#   python rekap_cli.py "harian/*.xlsx" --dedup-db rekap_cache/dedup.sqlite -o baru.csv
+#   python rekap_cli.py "data/*.xlsx" --policy latest_date --dup-report duplikat.xlsx -o rekap.csv
+#   python rekap_cli.py "data/*.xlsx" --code "8204,8205,8310" -o rekap.csv
+#       -> rekap_8204.csv, rekap_8205.csv, rekap_8310.csv dari SATU pass drill-down
+#   python rekap_cli.py "data/*.xlsx" --code @kode_label.txt -o rekap.csv
+#   python rekap_cli.py "data/*.xlsx" --excel --trace trace.json -o rekap.csv
+#   python rekap_cli.py "data/*.xlsx" --excel-engine fake --workers 4 -o rekap.csv
+#       -> jalur Excel (scan COM, ShowDetail, used_range) dengan Excel tiruan
+#       -> waktu per tahap (open/scan/show_detail/...) per file + p50/p95
+#
+# Hasil ditulis per file segera setelah file selesai (streaming) ke stdout
+# atau berkas; baris tidak ditumpuk di memori (keep_rows=False), kecuali
+# kebijakan duplikat latest_* yang butuh seluruh hasil sebelum ditulis. Ringkasan
+# & galat dicetak ke stderr. Exit code 1 jika ada file yang gagal. Modul ini
+# tidak meng-import tkinter.
+
+
+def expand_inputs(patterns):
+    """Ekspansi glob (mendukung '**'), urutan input dipertahankan, tanpa duplikat."""
+    paths = []
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) or ([pattern] if os.path.isfile(pattern) else [])
+        for path in matches:
+            name = os.path.basename(path)
+            if name.startswith("~$") or not os.path.isfile(path):
+                continue
+            key = os.path.abspath(path)
+            if key not in seen:
+                seen.add(key)
+                paths.append(path)
+    return paths
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="rekap_cli",
+        description="Rekapitulasi drill-down pivot tanpa GUI (batch server).")
+    parser.add_argument("inputs", nargs="+", help="File atau pola glob workbook (mis. 'data/*.xlsx').")
+    parser.add_argument("--row", default=r"bandar.*lampung", help="Kata kunci baris (regex).")
+    parser.add_argument("--col", default="Grand Total", help="Kata kunci kolom.")
+    parser.add_argument("--code", default="8204",
+                        help="Kode filter: satu regex, daftar 'a,b,c', atau @berkas pemetaan kode->label. "
+                             "Lebih dari satu kelompok + -o menghasilkan satu berkas per kelompok.")
+    parser.add_argument("--match", choices=list(MATCH_MODES), default="exact",
+                        help="Pencocokan kode literal: exact (persis, default), prefix (awalan), "
+                             "regex (substring, perilaku lama).")
+    parser.add_argument("--layout", choices=sorted(LAYOUTS), default="bertingkat",
+                        help="Layout kolom hasil: 'standar' (main.py) atau 'bertingkat' (minmain.py).")
+    parser.add_argument("--workers", type=int, default=1, help="Jumlah proses worker paralel.")
+    parser.add_argument("--excel", action="store_true",
+                        help="Drill-down lewat Excel (xlwings). Default: headless (.xlsx tanpa Excel).")
+    parser.add_argument("--excel-engine", choices=("excel", "fake"), default="excel",
+                        help="Mesin Excel untuk --excel: desktop Excel (xlwings) atau Excel tiruan in-process "
+                             "(fake_excel.py, untuk uji beban di Linux). 'fake' otomatis mengaktifkan --excel.")
+    parser.add_argument("--pivot-source", action="store_true",
+                        help="Dengan --excel: baca detail dari data sumber pivot tanpa ShowDetail "
+                             "(otomatis kembali ke ShowDetail jika tidak bisa dipastikan).")
+    parser.add_argument("--format", choices=StreamWriter.FORMATS, default="csv", help="Format output.")
+    parser.add_argument("-o", "--output", help="Berkas output (default: stdout).")
+    parser.add_argument("--no-cache", action="store_true", help="Jangan pakai cache drill-down di disk.")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Folder cache drill-down.")
+    parser.add_argument("--dedup-db", metavar="PATH",
+                        help="Indeks duplikat SQLite persisten: kasus yang sudah direkap pada run "
+                             "sebelumnya dilewati (hanya kasus baru yang ditulis).")
+    parser.add_argument("--policy", choices=list(POLICIES), default="first",
+                        help="Kebijakan duplikat (CaseNum, CaseType): first, latest_date, latest_mtime, keep_all. "
+                             "latest_* menahan output sampai semua file selesai.")
+    parser.add_argument("--dup-report", metavar="PATH",
+                        help="Tulis laporan duplikat (.xlsx/.csv/.parquet) setelah selesai.")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="Tulis trace waktu per tahap (.json: record + ringkasan p50/p95, .csv: record).")
+    parser.add_argument("-v", "--verbose", action="count", default=0,
+                        help="Log ke stderr (-v info, -vv debug). REKAP_LOG_LEVEL menimpa level ini.")
+    parser.add_argument("--log-sample", type=int, default=0, metavar="N",
+                        help="Dengan -vv: tulis setiap event baris ke-N (ADD / DUPLIKASI) sebagai contoh. "
+                             "Default 0: hanya ringkasan per file.")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    level = {0: logging.WARNING, 1: logging.INFO}.get(args.verbose, logging.DEBUG)
+    setup_logging(stream=sys.stderr, level=level)
+
+    file_paths = expand_inputs(args.inputs)
+    if not file_paths:
+        print("[!] Tidak ada file input yang cocok.", file=sys.stderr)
+        return 2
+    try:
+        code_filter = CodeFilter.parse(args.code, args.match)
+    except (ValueError, re.error) as e:
+        print(f"[!] Kode filter tidak valid: {e}", file=sys.stderr)
+        return 2
+
+    # Kebijakan latest_* bisa mengganti baris yang sudah keluar, jadi baris
+    # ditahan di memori dan ditulis sekali di akhir (tidak streaming).
+    buffered = args.policy in REPLACING_POLICIES
+    engine = RecapEngine(layout=args.layout, keep_rows=buffered, dedup_path=args.dedup_db, policy=args.policy)
+    engine.detail_source = args.pivot_source
+    engine.excel_engine = args.excel_engine
+    engine.log_sample = args.log_sample
+    cache = None if args.no_cache else ResultCache(args.cache_dir)
+    # Lebih dari satu kelompok kode + -o: satu berkas per kelompok (rekap_<label>.csv)
+    bucketed = code_filter.multi and bool(args.output)
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output and not bucketed else sys.stdout
+    total_files = len(file_paths)
+
+    def report(index, path, rows, error):
+        status = f"GAGAL: {error}" if error else f"{len(rows)} baris"
+        print(f"[{index + 1}/{total_files}] {os.path.basename(path)}: {status}", file=sys.stderr)
+
+    counter = CounterConsumer()
+    if bucketed:
+        writer = BucketWriter({label: bucket_path(args.output, label) for label in code_filter.labels},
+                              args.format, engine.cols, code_filter)
+    else:
+        writer = StreamWriter(out, args.format, engine.cols)
+    consumers = [counter, CallbackConsumer(report)]
+    if not buffered:
+        consumers.insert(0, writer)
+    try:
+        engine.run(file_paths, args.row, args.col, code_filter,
+                   headless=not (args.excel or args.excel_engine == "fake"), workers=args.workers, cache=cache, consumers=consumers)
+        if buffered:
+            writer.on_file(0, None, engine.master_data, None)
+            writer.close()
+        if args.dup_report:
+            report_data = engine.duplicates
+            export_rows(args.dup_report, report_data.columns(engine.cols), list(report_data.rows()))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if cache is not None:
+            cache.close()
+        engine.dedup.close()
+
+    print(f"[I] Selesai: {counter.summary()}, {len(engine.duplicates)} kunci duplikat.", file=sys.stderr)
+    if bucketed:
+        for label, count in writer.counts().items():
+            print(f"[I] Kelompok {label}: {count} baris -> {bucket_path(args.output, label)}", file=sys.stderr)
+    if args.trace:
+        TRACE.write(args.trace)
+        for line in TRACE.summary_lines():
+            print(f"[I] {line}", file=sys.stderr)
+    for item in engine.failed_files:
+        print(f"[!] {item['file']}: {item['msg']}", file=sys.stderr)
+    return 1 if engine.failed_files else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
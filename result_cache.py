@@ -0,0 +1,227 @@
+import os
+import sys
+import time
+import zlib
+import pickle
+import sqlite3
+import hashlib
+import logging
+import threading
+
+from run_trace import TRACE
+
+# =============================================================================
+# CACHE HASIL DRILL-DOWN DI DISK (SQLITE)
+# =============================================================================
+# Menyimpan data mentah hasil drill-down (SEBELUM filter extract_data_manual)
+# dengan kunci (hash isi workbook, regex baris, keyword kolom). Run ulang
+# dengan Kode Filter berbeda langsung memakai data ini tanpa membuka Excel.
+#
+# - Hash isi  : SHA-256 isi file (default) atau ukuran+mtime ("stat", lebih cepat).
+# - Eviction  : LRU berdasarkan last_access bila total payload > max_bytes.
+# - Invalidasi: python result_cache.py invalidate [file ...] | stats | clear
+
+DEFAULT_CACHE_DIR = "rekap_cache"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024   # 512 MB payload terkompresi
+HASH_CHUNK = 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    file_hash   TEXT NOT NULL,
+    row_regex   TEXT NOT NULL,
+    col_keyword TEXT NOT NULL,
+    path        TEXT,
+    n_rows      INTEGER,
+    size_bytes  INTEGER,
+    created     REAL,
+    last_access REAL,
+    payload     BLOB,
+    PRIMARY KEY (file_hash, row_regex, col_keyword)
+);
+CREATE INDEX IF NOT EXISTS idx_entries_access ON entries (last_access);
+CREATE INDEX IF NOT EXISTS idx_entries_path ON entries (path);
+"""
+
+
+def file_sha256(path):
+    """SHA-256 isi file, dibaca per blok agar memori tetap kecil."""
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    Cache persisten hasil drill-down per workbook.
+
+    Teknis:
+    - Satu koneksi SQLite (WAL) dipakai bersama antar thread dengan Lock.
+    - Hash file di-memo per (path, size, mtime) agar tidak dihitung ulang.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, hash_mode="sha256"):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db_path = os.path.join(cache_dir, "drilldown_cache.sqlite")
+        self.max_bytes = max_bytes
+        self.hash_mode = hash_mode
+        self._hash_memo = {}
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    # -------------------------------------------------------------------------
+    # Kunci Cache
+    # -------------------------------------------------------------------------
+
+    def fingerprint(self, path):
+        """Sidik jari isi file sesuai hash_mode."""
+        abs_path = os.path.abspath(path)
+        st = os.stat(abs_path)
+        memo_key = (abs_path, st.st_size, st.st_mtime_ns)
+        if memo_key in self._hash_memo:
+            return self._hash_memo[memo_key]
+
+        if self.hash_mode == "stat":
+            digest = f"stat:{st.st_size}:{st.st_mtime_ns}:{abs_path}"
+        else:
+            digest = file_sha256(abs_path)
+
+        self._hash_memo[memo_key] = digest
+        return digest
+
+    # -------------------------------------------------------------------------
+    # Operasi Cache
+    # -------------------------------------------------------------------------
+
+    def contains(self, path, row_regex, col_keyword):
+        key = (self.fingerprint(path), row_regex, col_keyword)
+        with self._lock:
+            cur = self.conn.execute(
+                "SELECT 1 FROM entries WHERE file_hash=? AND row_regex=? AND col_keyword=?", key)
+            return cur.fetchone() is not None
+
+    def get(self, path, row_regex, col_keyword):
+        """Mengembalikan data mentah drill-down, atau None jika belum ada di cache."""
+        key = (self.fingerprint(path), row_regex, col_keyword)
+        with self._lock:
+            cur = self.conn.execute(
+                "SELECT payload FROM entries WHERE file_hash=? AND row_regex=? AND col_keyword=?", key)
+            row = cur.fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.conn.execute(
+                "UPDATE entries SET last_access=? WHERE file_hash=? AND row_regex=? AND col_keyword=?",
+                (time.time(),) + key)
+            self.conn.commit()
+        self.hits += 1
+        logging.info(f"[+] CACHE HIT: {os.path.basename(path)}")
+        return pickle.loads(zlib.decompress(row[0]))
+
+    def put(self, path, row_regex, col_keyword, raw_data):
+        """Menyimpan data mentah drill-down lalu menjalankan eviction LRU."""
+        payload = zlib.compress(pickle.dumps(raw_data, protocol=pickle.HIGHEST_PROTOCOL), 1)
+        key = (self.fingerprint(path), row_regex, col_keyword)
+        now = time.time()
+        n_rows = max(len(raw_data) - 1, 0) if raw_data else 0
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                key + (os.path.abspath(path), n_rows, len(payload), now, now, payload))
+            self.conn.commit()
+            self._evict()
+
+    def _evict(self):
+        """Hapus entri paling lama tidak diakses sampai total payload <= max_bytes."""
+        total = self.conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        removed = 0
+        cur = self.conn.execute("SELECT file_hash, row_regex, col_keyword, size_bytes FROM entries ORDER BY last_access")
+        for file_hash, row_regex, col_keyword, size in cur.fetchall():
+            if total <= self.max_bytes:
+                break
+            self.conn.execute(
+                "DELETE FROM entries WHERE file_hash=? AND row_regex=? AND col_keyword=?",
+                (file_hash, row_regex, col_keyword))
+            total -= size
+            removed += 1
+        self.conn.commit()
+        logging.info(f"[-] CACHE EVICT: {removed} entri dihapus (LRU)")
+
+    def invalidate(self, paths=None):
+        """Hapus entri untuk file tertentu (berdasarkan path atau isi), atau semua jika None."""
+        with self._lock:
+            if not paths:
+                cur = self.conn.execute("DELETE FROM entries")
+            else:
+                count = 0
+                for path in paths:
+                    abs_path = os.path.abspath(path)
+                    file_hash = self.fingerprint(abs_path) if os.path.exists(abs_path) else None
+                    cur = self.conn.execute(
+                        "DELETE FROM entries WHERE path=? OR file_hash=?", (abs_path, file_hash))
+                    count += cur.rowcount
+                self.conn.commit()
+                return count
+            self.conn.commit()
+            return cur.rowcount
+
+    def stats(self):
+        with self._lock:
+            count, total, rows = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0), COALESCE(SUM(n_rows), 0) FROM entries").fetchone()
+        return {"entries": count, "bytes": total, "rows": rows, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses}
+
+
+def cached_drill_down(cache, drill_fn, path, row_regex, col_keyword):
+    """Bungkus drill-down: pakai cache jika ada, jika tidak jalankan `drill_fn()` lalu simpan."""
+    if cache is None:
+        return drill_fn()
+    with TRACE.stage("cache") as rec:
+        raw_data = cache.get(path, row_regex, col_keyword)
+        rec["hit"] = raw_data is not None
+    if raw_data is not None:
+        return raw_data
+    raw_data = drill_fn()
+    cache.put(path, row_regex, col_keyword, raw_data)
+    return raw_data
+
+
+def main(argv=None):
+    """Perintah pemeliharaan: stats | clear | invalidate <file ...>"""
+    argv = sys.argv[1:] if argv is None else argv
+    cache_dir = DEFAULT_CACHE_DIR
+    if len(argv) >= 2 and argv[0] == "--dir":
+        cache_dir, argv = argv[1], argv[2:]
+
+    if not argv or argv[0] not in ("stats", "clear", "invalidate"):
+        print("Pemakaian: python result_cache.py [--dir DIR] stats | clear | invalidate <file ...>")
+        return 2
+
+    cache = ResultCache(cache_dir)
+    try:
+        if argv[0] == "stats":
+            for key, val in cache.stats().items():
+                print(f"{key}: {val}")
+        elif argv[0] == "clear":
+            print(f"Dihapus: {cache.invalidate()} entri")
+        else:
+            print(f"Dihapus: {cache.invalidate(argv[1:])} entri")
+    finally:
+        cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
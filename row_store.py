@@ -0,0 +1,200 @@
+import sys
+from array import array
+from collections import Counter
+
+# =============================================================================
+# ROW STORE KOLUMNAR (PENGGANTI LIST-OF-LISTS MASTER_DATA)
+# =============================================================================
+# Setiap kolom disimpan terpisah:
+# - DictColumn   : kolom berulang (kode, tanggal, unit kerja, kanca, sumber).
+#                  Nilai unik disimpan sekali, baris hanya menyimpan kode
+#                  integer 4 byte (array 'I').
+# - StringColumn : kolom unik (nomor kasus, deskripsi). Teks UTF-8 digabung
+#                  dalam satu bytearray + offset array 'Q' (tanpa objek str
+#                  per sel, ~50 byte overhead per sel hilang).
+# RowStore bersifat sequence: len(), store[i] -> list baris, iterasi, append/
+# extend, sehingga tabel virtual, exporter dan folder_state tetap bekerja.
+# Append dilakukan satu utas (pekerja) sementara utas UI hanya membaca baris
+# < len(store); panjang baru dinaikkan setelah semua kolom terisi.
+# replace() (kebijakan duplikat latest_*) tidak menulis ke kolom: baris
+# pengganti utuh diterbitkan dengan satu assignment ke `replaced`, sehingga
+# utas UI tidak pernah membaca campuran kolom lama/baru. `revision` dinaikkan
+# agar tampilan yang menyimpan urutan sort tahu isi baris lama berubah.
+
+
+def _text(val):
+    if val is None:
+        return ""
+    return val if isinstance(val, str) else str(val)
+
+
+class StringColumn:
+    """Kolom teks unik: satu blob UTF-8 + offset awal tiap sel."""
+
+    def __init__(self):
+        self.blob = bytearray()
+        self.offsets = array("Q", [0])
+
+    def append(self, val):
+        self.blob += _text(val).encode("utf-8")
+        self.offsets.append(len(self.blob))
+
+    def get(self, i):
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].decode("utf-8")
+
+    def find(self, val, count):
+        needle = _text(val).encode("utf-8")
+        offsets = self.offsets
+        blob = self.blob
+        size = len(needle)
+        return [i for i in range(count)
+                if offsets[i + 1] - offsets[i] == size and blob[offsets[i]:offsets[i + 1]] == needle]
+
+    def nbytes(self):
+        return sys.getsizeof(self.blob) + sys.getsizeof(self.offsets)
+
+
+class DictColumn:
+    """Kolom dictionary-encoded: kode integer per baris + tabel nilai unik."""
+
+    def __init__(self):
+        self.codes = array("I")
+        self.values = []
+        self.index = {}
+
+    def _code(self, val):
+        val = _text(val)
+        code = self.index.get(val)
+        if code is None:
+            # Intern: satu objek str dipakai bersama oleh semua baris bernilai sama
+            code = self.index[val] = len(self.values)
+            self.values.append(sys.intern(val))
+        return code
+
+    def append(self, val):
+        self.codes.append(self._code(val))
+
+    def get(self, i):
+        return self.values[self.codes[i]]
+
+    def find(self, val, count):
+        code = self.index.get(_text(val))
+        if code is None:
+            return []
+        codes = self.codes
+        return [i for i in range(count) if codes[i] == code]
+
+    def counts(self, count):
+        values = self.values
+        return Counter({values[code]: n for code, n in Counter(self.codes[:count]).items()})
+
+    def nbytes(self):
+        return (sys.getsizeof(self.codes) + sys.getsizeof(self.values) + sys.getsizeof(self.index)
+                + sum(sys.getsizeof(v) for v in self.values))
+
+
+class RowStore:
+    """
+    Penyimpanan hasil rekap berorientasi kolom.
+
+    Args:
+        cols      : nama kolom (urutan = urutan nilai dalam baris).
+        dict_cols : indeks kolom yang di-dictionary-encode; kolom lain
+                    disimpan sebagai StringColumn. None = semua kolom.
+    """
+
+    def __init__(self, cols, dict_cols=None, rows=None):
+        self.cols = list(cols)
+        dict_cols = set(range(len(self.cols)) if dict_cols is None else dict_cols)
+        self.columns = [DictColumn() if i in dict_cols else StringColumn() for i in range(len(self.cols))]
+        self._count = 0
+        self.revision = 0
+        self.replaced = {}      # Baris yang diganti: indeks -> tuple teks (lihat replace)
+        if rows:
+            self.extend(rows)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.row(j) for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("indeks RowStore di luar jangkauan")
+        return self.row(i)
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self.row(i)
+
+    def row(self, i):
+        replaced = self.replaced.get(i)
+        if replaced is not None:
+            return list(replaced)
+        return [col.get(i) for col in self.columns]
+
+    def cell(self, i, col):
+        """Nilai satu sel tanpa membangun seluruh baris (dipakai sort tabel)."""
+        replaced = self.replaced.get(i)
+        if replaced is not None:
+            return replaced[col]
+        return self.columns[col].get(i)
+
+    def append(self, row):
+        for column, val in zip(self.columns, row):
+            column.append(val)
+        self._count += 1
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def replace(self, i, row):
+        """
+        Ganti isi baris ke-i di tempat (indeks baris lain tidak bergeser).
+        Baris baru disusun lengkap dulu lalu diterbitkan dengan satu
+        assignment, aman dibaca utas UI di tengah penggantian.
+        """
+        if not 0 <= i < self._count:
+            raise IndexError("indeks RowStore di luar jangkauan")
+        self.replaced[i] = tuple(_text(val) for _, val in zip(self.columns, row))
+        self.revision += 1
+
+    # -------------------------------------------------------------------------
+    # Lookup & Statistik
+    # -------------------------------------------------------------------------
+
+    def find(self, col, val):
+        """Indeks baris dengan nilai `val` pada kolom `col` (kolom dict: bandingkan kode)."""
+        if col < 0:
+            col += len(self.cols)
+        hits = self.columns[col].find(val, self._count)
+        if not self.replaced:
+            return hits
+        replaced = dict(self.replaced)
+        needle = _text(val)
+        hits = [i for i in hits if i not in replaced]
+        hits += [i for i, row in replaced.items() if row[col] == needle]
+        return sorted(hits)
+
+    def value_counts(self, col):
+        """Counter {nilai: jumlah baris} untuk satu kolom."""
+        if col < 0:
+            col += len(self.cols)
+        column = self.columns[col]
+        if isinstance(column, DictColumn):
+            counts = column.counts(self._count)
+        else:
+            counts = Counter(column.get(i) for i in range(self._count))
+        # Kolom masih menyimpan nilai asli baris yang diganti
+        for i, row in dict(self.replaced).items():
+            counts[column.get(i)] -= 1
+            counts[row[col]] += 1
+        return +counts
+
+    def nbytes(self):
+        """Perkiraan memori seluruh kolom (byte)."""
+        return (sum(col.nbytes() for col in self.columns) + sys.getsizeof(self.replaced)
+                + sum(sys.getsizeof(row) for row in list(self.replaced.values())))
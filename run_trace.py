@@ -0,0 +1,150 @@
+import os
+import csv
+import json
+import math
+import logging
+from time import perf_counter
+from contextlib import contextmanager
+
+# =============================================================================
+# TRACE WAKTU PER TAHAP (PER FILE / PER SHEET)
+# =============================================================================
+# Setiap tahap pipeline dicatat sebagai satu record dict:
+#   {"file", "sheet", "stage", "sec", ...hitungan (cells, bytes, rows, ...)}
+# Tahap: open, scan, show_detail, source_detail, read_detail, close, cache,
+# extract, file (total per file). Biaya per record hanya dua perf_counter()
+# + satu append, sehingga aman dibiarkan aktif di produksi.
+#
+# TRACE adalah tracer global per proses. Proses worker paralel mengirim
+# record-nya bersama hasil tugas (drain) lalu digabung di proses induk.
+# `listener` (opsional, mis. UIEventQueue.post_stage) dipanggil dengan
+# (rec, False) saat tahap mulai dan (rec, True) saat selesai; harus cepat
+# dan thread-safe karena dipanggil dari utas pemroses.
+
+STAGE_ORDER = ("file", "open", "scan", "show_detail", "source_detail", "read_detail", "close", "cache", "extract")
+CSV_FIELDS = ("file", "sheet", "stage", "sec", "cells", "bytes", "rows", "matched", "added", "duplicates", "hit")
+
+
+def cell_count(grid):
+    """Jumlah sel grid nilai (list baris) yang ditransfer."""
+    if not grid:
+        return 0
+    if not isinstance(grid, (list, tuple)):
+        return 1
+    first = grid[0]
+    return len(grid) * (len(first) if isinstance(first, (list, tuple)) else 1)
+
+
+def file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+def percentile(sorted_values, p):
+    """Persentil nearest-rank dari list yang sudah terurut."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class RunTrace:
+    """Kumpulan record tahap untuk satu run (lihat header modul)."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.records = []
+        self.file = None
+        self.listener = None
+
+    def reset(self):
+        self.records = []
+        self.file = None
+
+    def begin_file(self, path):
+        """Berkas aktif: record berikutnya diberi nama berkas ini."""
+        self.file = os.path.basename(path) if path else None
+
+    @contextmanager
+    def stage(self, name, sheet=None, **counts):
+        """
+        Ukur satu tahap. Record di-yield agar pemanggil bisa menambah
+        hitungan setelah tahap selesai (mis. rec["cells"] = ...).
+        """
+        rec = {"file": self.file, "sheet": sheet, "stage": name}
+        rec.update(counts)
+        listener = self.listener
+        if listener is not None:
+            listener(rec, False)
+        start = perf_counter()
+        try:
+            yield rec
+        finally:
+            rec["sec"] = perf_counter() - start
+            if self.enabled:
+                self.records.append(rec)
+            if listener is not None:
+                listener(rec, True)
+
+    def drain(self):
+        """Ambil & kosongkan record (dipakai proses worker)."""
+        records, self.records = self.records, []
+        return records
+
+    def extend(self, records):
+        if self.enabled and records:
+            self.records.extend(records)
+
+    # -------------------------------------------------------------------------
+    # Ringkasan & Output
+    # -------------------------------------------------------------------------
+
+    def summary(self):
+        """{tahap: {"n", "total", "p50", "p95", "max"}} dalam detik, urut STAGE_ORDER."""
+        durations = {}
+        for rec in self.records:
+            durations.setdefault(rec["stage"], []).append(rec["sec"])
+        order = {name: i for i, name in enumerate(STAGE_ORDER)}
+        result = {}
+        for name in sorted(durations, key=lambda s: (order.get(s, len(order)), s)):
+            values = sorted(durations[name])
+            result[name] = {
+                "n": len(values),
+                "total": sum(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "max": values[-1],
+            }
+        return result
+
+    def summary_lines(self):
+        lines = []
+        for name, s in self.summary().items():
+            lines.append(f"{name:<14} n={s['n']:<5} total={s['total']:8.3f}s "
+                         f"p50={s['p50'] * 1000:9.1f}ms p95={s['p95'] * 1000:9.1f}ms max={s['max'] * 1000:9.1f}ms")
+        return lines
+
+    def log_summary(self):
+        if not self.records:
+            return
+        logging.info("[I] RINGKASAN WAKTU PER TAHAP:")
+        for line in self.summary_lines():
+            logging.info(f"[I]   {line}")
+
+    def write(self, path):
+        """Tulis trace: .csv = satu baris per record; selain itu JSON (record + ringkasan)."""
+        if path.lower().endswith(".csv"):
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+                writer.writeheader()
+                writer.writerows(self.records)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"summary": self.summary(), "records": self.records}, f, ensure_ascii=False, indent=1,
+                          default=str)
+        logging.info(f"[+] TRACE DITULIS: {path} ({len(self.records)} record)")
+
+
+TRACE = RunTrace()
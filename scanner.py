@@ -0,0 +1,133 @@
+import re
+from functools import lru_cache
+
+# =============================================================================
+# PEMINDAI KOORDINAT KATA KUNCI
+# =============================================================================
+# Pengganti dua nested loop di process_single_file:
+# - Pola regex baris dikompilasi sekali per batch (bukan re.search per sel).
+# - Keyword kolom di-lower sekali, bukan per sel.
+# - Konversi sel ke string memakai jalur cepat untuk str/None.
+# - Pindai baris tetap column-major dan pindai kolom tetap row-major dengan
+#   early-exit: label baris pivot ada di kolom paling kiri dan header
+#   "Grand Total" di baris atas, sehingga kedua arah berhenti sangat cepat.
+#   (Satu lintasan row-major gabungan justru harus menyapu seluruh grid
+#   sampai label baris ditemukan -- jauh lebih lambat pada sheet 20k x 40.)
+# - Mode bertahap (scan_progressive) hanya membaca pita atas & pita kiri
+#   sehingga transfer COM dari used_range turun drastis pada sheet besar.
+# Hasil identik dengan loop lama: (target_r, target_c), -1 jika tidak ketemu.
+
+
+# Ukuran pita awal mode bertahap: header "Grand Total" ada di baris atas,
+# label baris ada di kolom kiri.
+DEFAULT_TOP_ROWS = 20
+DEFAULT_LEFT_COLS = 4
+
+
+def _as_grid(data_val):
+    """used_range.value bisa berupa skalar (1 sel) atau list datar (1 baris)."""
+    if not isinstance(data_val, (list, tuple)):
+        return [[data_val]]
+    if data_val and not isinstance(data_val[0], (list, tuple)):
+        return [data_val]
+    return data_val
+
+
+class KeywordScanner:
+    """Pemindai koordinat dengan pola yang sudah dikompilasi."""
+
+    def __init__(self, row_regex, col_keyword):
+        self.row_pattern = re.compile(row_regex, re.IGNORECASE)
+        self.col_keyword = col_keyword.lower()
+        # Pola yang cocok dengan string kosong juga mengenai sel None
+        self.row_hits_empty = self.row_pattern.search("") is not None
+        self.col_hits_empty = self.col_keyword == ""
+
+    def scan(self, data_val, start_row, start_col):
+        """
+        Mencari titik temu absolut (baris, kolom) pada grid nilai sheet.
+        Mengembalikan -1 untuk koordinat yang tidak ditemukan.
+        """
+        grid = _as_grid(data_val)
+        num_rows = len(grid)
+        num_cols = len(grid[0]) if num_rows > 0 else 0
+        return (self.scan_row(grid, start_row, num_rows, num_cols),
+                self.scan_col(grid, start_col, num_rows, num_cols))
+
+    def scan_row(self, grid, start_row, num_rows, num_cols):
+        """Priority Left-First: hit regex pertama secara column-major."""
+        search = self.row_pattern.search
+        hits_empty = self.row_hits_empty
+        for c in range(num_cols):
+            for r in range(num_rows):
+                val = grid[r][c]
+                if val is None:
+                    if hits_empty:
+                        return start_row + r
+                    continue
+                if search(val.strip() if type(val) is str else str(val).strip()):
+                    return start_row + r
+        return -1
+
+    def scan_col(self, grid, start_col, num_rows, num_cols):
+        """Priority Top-First: hit substring pertama secara row-major."""
+        kw = self.col_keyword
+        hits_empty = self.col_hits_empty
+        for r in range(num_rows):
+            row = grid[r]
+            for c in range(num_cols):
+                val = row[c]
+                if val is None:
+                    if hits_empty:
+                        return start_col + c
+                    continue
+                if kw in (val if type(val) is str else str(val)).strip().lower():
+                    return start_col + c
+        return -1
+
+    def scan_progressive(self, fetch, num_rows, num_cols, start_row, start_col,
+                         top_rows=DEFAULT_TOP_ROWS, left_cols=DEFAULT_LEFT_COLS):
+        """
+        Pemindaian bertahap tanpa membaca seluruh used_range.
+
+        `fetch(r0, c0, n_rows, n_cols)` mengembalikan grid 2D relatif terhadap
+        sudut kiri-atas used_range. Pindai baris hanya membaca pita kiri
+        (semua baris x `left_cols` kolom) dan pindai kolom hanya membaca pita
+        atas (`top_rows` baris x semua kolom). Pita diperlebar 2x (hanya bagian
+        barunya yang dibaca) sampai ketemu atau seluruh area habis.
+
+        Karena urutan pindai column-major/row-major dipertahankan, hit pertama
+        di dalam pita = hit pertama di seluruh sheet (koordinat identik).
+
+        Returns:
+            (target_r, target_c, jumlah_sel_dibaca)
+        """
+        cells_read = 0
+
+        target_r = -1
+        c0, width = 0, max(1, left_cols)
+        while target_r == -1 and c0 < num_cols:
+            width = min(width, num_cols - c0)
+            band = _as_grid(fetch(0, c0, num_rows, width))
+            cells_read += num_rows * width
+            target_r = self.scan_row(band, start_row, num_rows, width)
+            c0 += width
+            width *= 2
+
+        target_c = -1
+        r0, height = 0, max(1, top_rows)
+        while target_c == -1 and r0 < num_rows:
+            height = min(height, num_rows - r0)
+            band = _as_grid(fetch(r0, 0, height, num_cols))
+            cells_read += height * num_cols
+            target_c = self.scan_col(band, start_col, height, num_cols)
+            r0 += height
+            height *= 2
+
+        return target_r, target_c, cells_read
+
+
+@lru_cache(maxsize=32)
+def get_scanner(row_regex, col_keyword):
+    """Scanner ter-cache per pasangan parameter (dipakai ulang lintas file/sheet)."""
+    return KeywordScanner(row_regex, col_keyword)
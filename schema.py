@@ -0,0 +1,106 @@
+import re
+import logging
+from collections import namedtuple
+
+# =============================================================================
+# SKEMA KOLOM DEKLARATIF UNTUK SHEET DETAIL
+# =============================================================================
+# Setiap layout hasil rekap = daftar Field berurutan (urutan = kolom output):
+#   Field(judul_kolom_output, alias_header, posisi_cadangan, berulang)
+# - alias   : nama header sheet detail, dicoba BERURUTAN (mis. Unit Kerja
+#             Pelaksana -> Unit Kerja Operasional -> Kode UKO). Per alias:
+#             header yang sama persis (setelah normalisasi) diutamakan, lalu
+#             header yang mengandung alias (perilaku lama get_column_index).
+# - posisi  : indeks kolom jika tidak ada alias yang cocok (-1 = kosong).
+# - berulang: nilai banyak berulang -> normalisasi pakai memo & kolom
+#             di-dictionary-encode di RowStore.
+# Pemetaan hasil resolve dimemo per tanda tangan header, sehingga ratusan
+# file dengan header identik cukup dipetakan sekali.
+
+Field = namedtuple("Field", "name aliases position repeated")
+
+_MEMO_LIMIT = 256
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_header(val):
+    """'  Unit  Kerja\nPelaksana ' -> 'unit kerja pelaksana'."""
+    if val is None:
+        return ""
+    return _SPACES.sub(" ", str(val)).strip().lower()
+
+
+class ColumnSchema:
+    """Skema satu layout: daftar Field + memo pemetaan header -> indeks kolom."""
+
+    def __init__(self, fields, code_field=1, date_field=3):
+        self.fields = list(fields)
+        self.names = [f.name for f in self.fields]
+        self.code_field = code_field    # Field kode (filter & kunci duplikat)
+        self.date_field = date_field    # Field tanggal (kebijakan latest_date)
+        self._aliases = [tuple(normalize_header(a) for a in f.aliases) for f in self.fields]
+        self._positional = tuple(f.position for f in self.fields) if not any(self._aliases) else None
+        self._memo = {}
+
+    def resolve(self, header_row):
+        """
+        Tuple indeks kolom sheet detail per Field (urutan output).
+        Skema tanpa alias langsung memakai posisi tetap tanpa melihat header.
+        """
+        if self._positional is not None:
+            return self._positional
+        signature = tuple(header_row)
+        mapping = self._memo.get(signature)
+        if mapping is None:
+            mapping = self._resolve(signature)
+            if len(self._memo) >= _MEMO_LIMIT:
+                self._memo.clear()
+            self._memo[signature] = mapping
+            logging.info("[I] Hasil Pemetaan Kolom: " +
+                         ", ".join(f"{f.name} (Indeks={idx})" for f, idx in zip(self.fields, mapping) if f.aliases))
+        return mapping
+
+    def _resolve(self, header_row):
+        headers = [normalize_header(h) for h in header_row]
+        exact = {}
+        for idx, name in enumerate(headers):
+            if name:
+                exact.setdefault(name, idx)
+
+        mapping = []
+        for field, aliases in zip(self.fields, self._aliases):
+            found = -1
+            for alias in aliases:
+                found = exact.get(alias, -1)
+                if found == -1:
+                    found = next((idx for idx, name in enumerate(headers) if alias in name), -1)
+                if found != -1:
+                    break
+                logging.info(f"[I] Kolom '{alias}' tidak ditemukan untuk {field.name}.")
+            mapping.append(found if found != -1 else field.position)
+        return tuple(mapping)
+
+    def repeated(self):
+        """Indeks field yang nilainya berulang (untuk memo normalisasi / RowStore)."""
+        return tuple(i for i, f in enumerate(self.fields) if f.repeated)
+
+
+SCHEMAS = {
+    # Layout main.py: kolom tetap A=No Kasus, B=Tipe, D=Deskripsi, E=Tanggal, S=Unit Kerja
+    "standar": ColumnSchema([
+        Field("Case Number", (), 0, False),
+        Field("Case Type Number", (), 1, True),
+        Field("Deskripsi Case", (), 3, False),
+        Field("Opened Date", (), 4, True),
+        Field("Unit Kerja", (), 18, True),
+    ]),
+    # Layout minmain.py: Unit Kerja & Kanca dicari dari header secara bertingkat
+    "bertingkat": ColumnSchema([
+        Field("Nomor Kasus", (), 0, False),
+        Field("Tipe Kasus", (), 1, True),
+        Field("Deskripsi", (), 3, False),
+        Field("Tanggal", (), 4, True),
+        Field("Unit Kerja Pelaksana", ("Unit Kerja Pelaksana", "Unit Kerja Operasional", "Kode UKO"), -1, True),
+        Field("Kanca", ("Kanca", "Cabang"), -1, True),
+    ]),
+}
@@ -0,0 +1,363 @@
+import os
+import sys
+import zipfile
+import argparse
+from datetime import datetime, timedelta
+from xml.sax.saxutils import escape, quoteattr
+
+from exporter import column_letter
+
+# =============================================================================
+# GENERATOR WORKBOOK PIVOT SINTETIS (UNTUK BENCHMARK)
+# =============================================================================
+# Membuat .xlsx berbentuk sama dengan laporan asli, tanpa Excel:
+# - Sheet "Sheet1": tabel sumber 21 kolom (Case Number, Case Type Number, ...,
+#                   Unit Kerja Pelaksana di indeks 18, Kanca, Region); nama
+#                   sheet sumber laporan asli, masuk SHEET_BLACKLIST.
+# - Sheet "Pivot" : Pivot Table (baris = Region, kolom = Case Type Number,
+#                   nilai = Count) dengan kolom "Grand Total"; Pivot Cache
+#                   menyimpan record sehingga mode headless bisa ShowDetail.
+# `rows` = jumlah baris detail pada region target (Bandar Lampung) = hasil
+# drill-down sel (Bandar Lampung, Grand Total). Ditambah `other_share` x rows
+# baris region lain yang ikut tersimpan di cache (harus dilewati saat filter).
+# Isi baris dihitung deterministik dari (seed, nomor file, nomor baris), jadi
+# berkas bisa dibuat ulang identik dan duplikat lintas file (`dup_share`:
+# baris file ke-k memakai kunci baris yang sama di file ke-(k-1)) tidak perlu
+# disimpan di memori. Seluruh XML ditulis streaming (1k - 5 juta baris).
+#   python synth_workbook.py bench_data --rows 100000 --files 3
+
+SOURCE_SHEET = "Sheet1"
+TARGET_REGION = "Bandar Lampung"
+OTHER_REGIONS = ["Metro", "Palembang", "Jambi", "Bengkulu"]
+TARGET_CODE = 8204
+OTHER_CODES = [8205, 8310, 8311, 18204, 82040]
+STATUSES = ["Closed", "Open", "In Progress"]
+
+HEADER = (["Case Number", "Case Type Number", "Status", "Deskripsi", "Opened Date"]
+          + [f"Atribut {i}" for i in range(5, 18)]
+          + ["Unit Kerja Pelaksana", "Kanca", "Region"])
+CODE_COL, STATUS_COL, DATE_COL, REGION_COL = 1, 2, 4, 20
+
+_EPOCH = datetime(1899, 12, 30)
+_START = datetime(2024, 1, 1, 8, 0)
+
+_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_CT_PREFIX = "application/vnd.openxmlformats-officedocument.spreadsheetml."
+
+
+def _mix(seed, file_no, i, salt):
+    """Hash 32-bit murah & deterministik (pengganti RNG per baris)."""
+    x = (i * 0x9E3779B1 + file_no * 0x85EBCA77 + seed * 0xC2B2AE3D + salt * 0x27D4EB2F) & 0xFFFFFFFF
+    x ^= x >> 15
+    x = (x * 0x2C1B3C6D) & 0xFFFFFFFF
+    x ^= x >> 12
+    x = (x * 0x297A2D39) & 0xFFFFFFFF
+    return x ^ (x >> 15)
+
+
+class SyntheticSpec:
+    """Parameter satu set workbook sintetis."""
+
+    def __init__(self, rows, files=3, code_share=0.3, dup_share=0.1, other_share=0.1, seed=1):
+        self.rows = rows
+        self.files = files
+        self.code_share = code_share      # Porsi baris berkode 8204
+        self.dup_share = dup_share        # Porsi baris yang kuncinya sudah muncul di file sebelumnya
+        self.other_share = other_share    # Baris region lain (relatif terhadap rows)
+        self.seed = seed
+
+    @property
+    def total_rows(self):
+        return self.rows + int(self.rows * self.other_share)
+
+    def tag(self):
+        """Nama unik parameter (dipakai sebagai nama folder data)."""
+        return (f"r{self.rows}_f{self.files}_c{self.code_share:g}_d{self.dup_share:g}"
+                f"_o{self.other_share:g}_s{self.seed}")
+
+    def as_dict(self):
+        return {"rows": self.rows, "files": self.files, "code_share": self.code_share,
+                "dup_share": self.dup_share, "other_share": self.other_share, "seed": self.seed}
+
+    # -------------------------------------------------------------------------
+    # Isi Baris (Deterministik)
+    # -------------------------------------------------------------------------
+
+    def key(self, file_no, i):
+        """(Case Number, Case Type) baris ke-i file ke-file_no (duplikat -> kunci file sebelumnya)."""
+        while file_no > 0 and i < self.rows and _mix(self.seed, file_no, i, 2) < self.dup_share * 0x100000000:
+            file_no -= 1
+        h = _mix(self.seed, file_no, i, 1)
+        if h < self.code_share * 0x100000000:
+            code = TARGET_CODE
+        else:
+            code = OTHER_CODES[h % len(OTHER_CODES)]
+        return f"CS{file_no:03d}{i:08d}", code
+
+    def row(self, file_no, i):
+        case, code = self.key(file_no, i)
+        h = _mix(self.seed, file_no, i, 3)
+        region = TARGET_REGION if i < self.rows else OTHER_REGIONS[h % len(OTHER_REGIONS)]
+        values = [case, code, STATUSES[h % len(STATUSES)], f"Deskripsi kasus {case}",
+                  _START + timedelta(days=h % 365, minutes=h % 1440)]
+        values += [(h >> (k % 16)) % 1000 for k in range(13)]
+        values += [f"UKER {h % 300:03d}", f"KC {h % 40:02d}", region]
+        return values
+
+
+# =============================================================================
+# PENULISAN PAKET .XLSX
+# =============================================================================
+
+def _cell(ref, val):
+    if val is None:
+        return ""
+    if isinstance(val, datetime):
+        return f'<c r="{ref}" s="1"><v>{(val - _EPOCH).total_seconds() / 86400:.6f}</v></c>'
+    if isinstance(val, (int, float)):
+        return f'<c r="{ref}"><v>{val}</v></c>'
+    return f'<c r="{ref}" t="inlineStr"><is><t>{escape(str(val))}</t></is></c>'
+
+
+def _row_xml(r, values, letters):
+    return f'<row r="{r}">' + "".join(_cell(f"{letters[c]}{r}", v) for c, v in enumerate(values)) + "</row>"
+
+
+def _write_source_sheet(fh, spec, file_no, letters):
+    last = spec.total_rows + 1
+    fh.write((f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<worksheet xmlns="{_NS}">'
+              f'<dimension ref="A1:{letters[-1]}{last}"/><sheetData>').encode("utf-8"))
+    fh.write(_row_xml(1, HEADER, letters).encode("utf-8"))
+    chunk = []
+    for i in range(spec.total_rows):
+        chunk.append(_row_xml(i + 2, spec.row(file_no, i), letters))
+        if len(chunk) >= 5000:
+            fh.write("".join(chunk).encode("utf-8"))
+            chunk = []
+    fh.write(("".join(chunk) + "</sheetData></worksheet>").encode("utf-8"))
+
+
+def _record_xml(values, codes, regions):
+    parts = ["<r>", f"<s v={quoteattr(values[0])}/>", f'<x v="{codes[values[CODE_COL]]}"/>',
+             f'<x v="{STATUSES.index(values[STATUS_COL])}"/>', f"<s v={quoteattr(values[3])}/>",
+             f'<d v="{values[DATE_COL].isoformat()}"/>']
+    parts += [f'<n v="{v}"/>' for v in values[5:18]]
+    parts += [f"<s v={quoteattr(values[18])}/>", f"<s v={quoteattr(values[19])}/>",
+              f'<x v="{regions[values[REGION_COL]]}"/>', "</r>"]
+    return "".join(parts)
+
+
+def _write_records(fh, spec, file_no, codes, regions, counts):
+    fh.write((f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+              f'<pivotCacheRecords xmlns="{_NS}" count="{spec.total_rows}">').encode("utf-8"))
+    chunk = []
+    for i in range(spec.total_rows):
+        values = spec.row(file_no, i)
+        pair = (values[REGION_COL], values[CODE_COL])
+        counts[pair] = counts.get(pair, 0) + 1
+        chunk.append(_record_xml(values, codes, regions))
+        if len(chunk) >= 5000:
+            fh.write("".join(chunk).encode("utf-8"))
+            chunk = []
+    fh.write(("".join(chunk) + "</pivotCacheRecords>").encode("utf-8"))
+
+
+def _cache_definition(spec, all_codes, all_regions, letters):
+    fields = []
+    for idx, name in enumerate(HEADER):
+        if idx == CODE_COL:
+            items = "".join(f'<n v="{c}"/>' for c in all_codes)
+            shared = (f'<sharedItems containsSemiMixedTypes="0" containsString="0" containsNumber="1" '
+                      f'containsInteger="1" count="{len(all_codes)}">{items}</sharedItems>')
+        elif idx in (STATUS_COL, REGION_COL):
+            values = STATUSES if idx == STATUS_COL else all_regions
+            items = "".join(f"<s v={quoteattr(v)}/>" for v in values)
+            shared = f'<sharedItems count="{len(values)}">{items}</sharedItems>'
+        elif idx == DATE_COL:
+            shared = '<sharedItems containsSemiMixedTypes="0" containsNonDate="0" containsDate="1" containsString="0"/>'
+        elif 5 <= idx < 18:
+            shared = '<sharedItems containsSemiMixedTypes="0" containsString="0" containsNumber="1" containsInteger="1"/>'
+        else:
+            shared = "<sharedItems/>"
+        fields.append(f"<cacheField name={quoteattr(name)} numFmtId=\"0\">{shared}</cacheField>")
+    return (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<pivotCacheDefinition xmlns="{_NS}" xmlns:r="{_REL_NS}" r:id="rId1" refreshOnLoad="0" '
+            f'recordCount="{spec.total_rows}">'
+            f'<cacheSource type="worksheet"><worksheetSource ref="A1:{letters[-1]}{spec.total_rows + 1}" sheet="{SOURCE_SHEET}"/>'
+            f'</cacheSource><cacheFields count="{len(HEADER)}">{"".join(fields)}</cacheFields></pivotCacheDefinition>')
+
+
+def _pivot_layout(all_codes, all_regions, counts):
+    """(xml pivotTableDefinition, baris sheet Pivot) dari hitungan (region, kode)."""
+    regions = [g for g in all_regions if any(counts.get((g, c)) for c in all_codes)]
+    codes = [c for c in all_codes if any(counts.get((g, c)) for g in all_regions)]
+    grand_col = len(codes) + 1
+    top, first = 3, 5
+    last = first + len(regions)
+
+    rows = [(top, ["Count of Case Number", "Column Labels"]),
+            (top + 1, ["Row Labels"] + codes + ["Grand Total"])]
+    for n, g in enumerate(regions):
+        per_code = [counts.get((g, c), 0) for c in codes]
+        rows.append((first + n, [g] + per_code + [sum(per_code)]))
+    totals = [sum(counts.get((g, c), 0) for g in regions) for c in codes]
+    rows.append((last, ["Grand Total"] + totals + [sum(totals)]))
+
+    pivot_fields = []
+    for idx in range(len(HEADER)):
+        if idx == REGION_COL:
+            items = "".join(f'<item x="{all_regions.index(g)}"/>' for g in regions) + '<item t="default"/>'
+            pivot_fields.append(f'<pivotField axis="axisRow" showAll="0"><items count="{len(regions) + 1}">'
+                                f'{items}</items></pivotField>')
+        elif idx == CODE_COL:
+            items = "".join(f'<item x="{all_codes.index(c)}"/>' for c in codes) + '<item t="default"/>'
+            pivot_fields.append(f'<pivotField axis="axisCol" showAll="0"><items count="{len(codes) + 1}">'
+                                f'{items}</items></pivotField>')
+        elif idx == 0:
+            pivot_fields.append('<pivotField dataField="1" showAll="0"/>')
+        else:
+            pivot_fields.append('<pivotField showAll="0"/>')
+    row_items = "".join(f'<i><x v="{n}"/></i>' for n in range(len(regions))) + '<i t="grand"><x/></i>'
+    col_items = "".join(f'<i><x v="{n}"/></i>' for n in range(len(codes))) + '<i t="grand"><x/></i>'
+    ref = f"A{top}:{column_letter(grand_col)}{last}"
+    xml = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+           f'<pivotTableDefinition xmlns="{_NS}" name="PivotTable1" cacheId="1" dataCaption="Values" '
+           f'applyNumberFormats="0" applyBorderFormats="0" applyFontFormats="0" applyPatternFormats="0" '
+           f'applyAlignmentFormats="0" applyWidthHeightFormats="1" updatedVersion="6" minRefreshableVersion="3" '
+           f'createdVersion="6" indent="0" outline="1" outlineData="1">'
+           f'<location ref="{ref}" firstHeaderRow="1" firstDataRow="2" firstDataCol="1"/>'
+           f'<pivotFields count="{len(HEADER)}">{"".join(pivot_fields)}</pivotFields>'
+           f'<rowFields count="1"><field x="{REGION_COL}"/></rowFields>'
+           f'<rowItems count="{len(regions) + 1}">{row_items}</rowItems>'
+           f'<colFields count="1"><field x="{CODE_COL}"/></colFields>'
+           f'<colItems count="{len(codes) + 1}">{col_items}</colItems>'
+           f'<dataFields count="1"><dataField name="Count of Case Number" fld="0" subtotal="count" baseField="0" '
+           f'baseItem="0"/></dataFields></pivotTableDefinition>')
+    return xml, rows
+
+
+def _static_parts():
+    ct = _CT_PREFIX
+    return {
+        "[Content_Types].xml": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            f'<Override PartName="/xl/workbook.xml" ContentType="{ct}sheet.main+xml"/>'
+            f'<Override PartName="/xl/worksheets/sheet1.xml" ContentType="{ct}worksheet+xml"/>'
+            f'<Override PartName="/xl/worksheets/sheet2.xml" ContentType="{ct}worksheet+xml"/>'
+            f'<Override PartName="/xl/styles.xml" ContentType="{ct}styles+xml"/>'
+            f'<Override PartName="/xl/pivotTables/pivotTable1.xml" ContentType="{ct}pivotTable+xml"/>'
+            f'<Override PartName="/xl/pivotCache/pivotCacheDefinition1.xml" '
+            f'ContentType="{ct}pivotCacheDefinition+xml"/>'
+            f'<Override PartName="/xl/pivotCache/pivotCacheRecords1.xml" ContentType="{ct}pivotCacheRecords+xml"/>'
+            '</Types>'),
+        "_rels/.rels": (
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<Relationships xmlns="{_PKG_REL_NS}">'
+            f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/></Relationships>'),
+        "xl/workbook.xml": (
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<workbook xmlns="{_NS}" xmlns:r="{_REL_NS}"><sheets>'
+            f'<sheet name="{SOURCE_SHEET}" sheetId="1" r:id="rId1"/><sheet name="Pivot" sheetId="2" r:id="rId2"/></sheets>'
+            '<pivotCaches><pivotCache cacheId="1" r:id="rId4"/></pivotCaches></workbook>'),
+        "xl/_rels/workbook.xml.rels": (
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<Relationships xmlns="{_PKG_REL_NS}">'
+            f'<Relationship Id="rId1" Type="{_REL_NS}/worksheet" Target="worksheets/sheet1.xml"/>'
+            f'<Relationship Id="rId2" Type="{_REL_NS}/worksheet" Target="worksheets/sheet2.xml"/>'
+            f'<Relationship Id="rId3" Type="{_REL_NS}/styles" Target="styles.xml"/>'
+            f'<Relationship Id="rId4" Type="{_REL_NS}/pivotCacheDefinition" '
+            'Target="pivotCache/pivotCacheDefinition1.xml"/></Relationships>'),
+        # Style 0 = normal, style 1 = tanggal (numFmt 14)
+        "xl/styles.xml": (
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<styleSheet xmlns="{_NS}">'
+            '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+            '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+            '<fill><patternFill patternType="gray125"/></fill></fills>'
+            '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+            '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+            '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+            '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+            '</styleSheet>'),
+        "xl/worksheets/_rels/sheet2.xml.rels": (
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<Relationships xmlns="{_PKG_REL_NS}">'
+            f'<Relationship Id="rId1" Type="{_REL_NS}/pivotTable" Target="../pivotTables/pivotTable1.xml"/>'
+            '</Relationships>'),
+        "xl/pivotTables/_rels/pivotTable1.xml.rels": (
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<Relationships xmlns="{_PKG_REL_NS}">'
+            f'<Relationship Id="rId1" Type="{_REL_NS}/pivotCacheDefinition" '
+            'Target="../pivotCache/pivotCacheDefinition1.xml"/></Relationships>'),
+        "xl/pivotCache/_rels/pivotCacheDefinition1.xml.rels": (
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<Relationships xmlns="{_PKG_REL_NS}">'
+            f'<Relationship Id="rId1" Type="{_REL_NS}/pivotCacheRecords" Target="pivotCacheRecords1.xml"/>'
+            '</Relationships>'),
+    }
+
+
+def write_workbook(path, spec, file_no):
+    """Tulis satu workbook sintetis; mengembalikan jumlah baris per (region, kode)."""
+    letters = [column_letter(i) for i in range(len(HEADER))]
+    all_codes = [TARGET_CODE] + OTHER_CODES
+    all_regions = [TARGET_REGION] + OTHER_REGIONS
+    codes = {c: n for n, c in enumerate(all_codes)}
+    regions = {g: n for n, g in enumerate(all_regions)}
+    counts = {}
+
+    tmp_path = path + ".tmp"
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        for name, xml in _static_parts().items():
+            zf.writestr(name, xml)
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as fh:
+            _write_source_sheet(fh, spec, file_no, letters)
+        with zf.open("xl/pivotCache/pivotCacheRecords1.xml", "w", force_zip64=True) as fh:
+            _write_records(fh, spec, file_no, codes, regions, counts)
+        zf.writestr("xl/pivotCache/pivotCacheDefinition1.xml",
+                    _cache_definition(spec, all_codes, all_regions, letters))
+        pivot_xml, pivot_rows = _pivot_layout(all_codes, all_regions, counts)
+        zf.writestr("xl/pivotTables/pivotTable1.xml", pivot_xml)
+        grid = "".join(_row_xml(r, values, letters) for r, values in pivot_rows)
+        zf.writestr("xl/worksheets/sheet2.xml",
+                    f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<worksheet xmlns="{_NS}">'
+                    f'<sheetData>{grid}</sheetData></worksheet>')
+    os.replace(tmp_path, path)
+    return counts
+
+
+def generate(folder, spec, progress=None):
+    """
+    Buat `spec.files` workbook di `folder` (dilewati jika sudah ada, karena
+    isinya deterministik). Mengembalikan daftar path berurutan.
+    """
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    for file_no in range(spec.files):
+        path = os.path.join(folder, f"sintetis_{file_no:03d}.xlsx")
+        if not os.path.exists(path):
+            if progress:
+                progress(file_no, path)
+            write_workbook(path, spec, file_no)
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Buat workbook pivot sintetis untuk benchmark.")
+    parser.add_argument("folder", help="Folder output.")
+    parser.add_argument("--rows", type=int, default=10_000, help="Baris detail region target per workbook.")
+    parser.add_argument("--files", type=int, default=3, help="Jumlah workbook.")
+    parser.add_argument("--code-share", type=float, default=0.3, help="Porsi baris berkode 8204.")
+    parser.add_argument("--dup-share", type=float, default=0.1, help="Porsi baris duplikat lintas file.")
+    parser.add_argument("--other-share", type=float, default=0.1, help="Baris region lain (relatif thd --rows).")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    spec = SyntheticSpec(args.rows, args.files, args.code_share, args.dup_share, args.other_share, args.seed)
+    paths = generate(args.folder, spec, lambda n, path: print(f"[>] Membuat {path}", file=sys.stderr))
+    print(f"[+] {len(paths)} workbook ({spec.tag()}) di {args.folder}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
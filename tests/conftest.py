@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+# Modul proyek berada di root repo (tanpa paket); tambahkan ke sys.path untuk pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synth_workbook import SyntheticSpec, write_workbook  # noqa: E402
+
+# Kata kunci titik temu pivot pada workbook sintetis (synth_workbook.py)
+ROW_KEYWORD = r"bandar.*lampung"
+COL_KEYWORD = "Grand Total"
+
+# Region lain ikut tersimpan di cache agar filter item benar-benar diuji
+SPEC = SyntheticSpec(rows=60, files=1, other_share=0.5)
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    """Satu workbook pivot sintetis kecil (SPEC, file ke-0)."""
+    path = str(tmp_path / "pivot.xlsx")
+    write_workbook(path, SPEC, 0)
+    return path
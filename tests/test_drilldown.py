@@ -0,0 +1,37 @@
+import logging
+
+from drilldown import OPEN_PROFILE, drill_down_excel
+from fake_excel import open_fake_app
+from conftest import ROW_KEYWORD, COL_KEYWORD
+
+
+class _FailingApi:
+    """Application tiruan: properti `failing` melempar galat saat di-set."""
+
+    def __init__(self, failing, **props):
+        object.__setattr__(self, "failing", failing)
+        for name, value in props.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        if name == self.failing:
+            raise RuntimeError(f"Unable to set the {name} property of the Application class")
+        object.__setattr__(self, name, value)
+
+
+def test_open_profile_failed_setter_warns_and_restores(workbook, caplog):
+    app = open_fake_app()
+    try:
+        expected = drill_down_excel(app, workbook, ROW_KEYWORD, COL_KEYWORD)
+        original = dict(app.api.__dict__)
+        app.api = _FailingApi("Calculation", **original)
+        with caplog.at_level(logging.WARNING):
+            assert drill_down_excel(app, workbook, ROW_KEYWORD, COL_KEYWORD) == expected
+
+        warnings = [r for r in caplog.records if r.levelno == logging.WARNING and "Profil buka" in r.getMessage()]
+        assert len(warnings) == 1 and "Calculation" in warnings[0].getMessage()
+        # Properti lain tetap diterapkan selama drill-down lalu dipulihkan
+        for name, _ in OPEN_PROFILE:
+            assert getattr(app.api, name) == original[name]
+    finally:
+        app.quit()
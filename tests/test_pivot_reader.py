@@ -0,0 +1,270 @@
+import re
+import zipfile
+
+import pytest
+
+from drilldown import drill_down_excel
+from fake_excel import open_fake_app
+from pivot_reader import PivotReaderError, PivotWorkbook
+from synth_workbook import HEADER, OTHER_REGIONS, STATUSES, TARGET_REGION
+from conftest import ROW_KEYWORD, COL_KEYWORD, SPEC
+
+PIVOT_PART = "xl/pivotTables/pivotTable1.xml"
+CACHE_PART = "xl/pivotCache/pivotCacheDefinition1.xml"
+PIVOT_SHEET_PART = "xl/worksheets/sheet2.xml"
+STATUS_FIELD = HEADER.index("Status")
+REGION_FIELD = HEADER.index("Region")
+CODE_FIELD = HEADER.index("Case Type Number")
+
+REGIONS = [TARGET_REGION] + OTHER_REGIONS     # Urutan item baris pivot (semua region terisi)
+
+# Field Status (semula tidak dipakai pivot) sebagai field baris kedua / filter laporan
+STATUS_ITEMS = ('<items count="4">' + "".join(f'<item x="{n}"/>' for n in range(len(STATUSES)))
+                + '<item t="default"/></items>')
+
+
+# =============================================================================
+# Utilitas
+# =============================================================================
+
+def _records():
+    """Record sumber workbook fixture, dihitung ulang dari SyntheticSpec (pembanding independen)."""
+    return [SPEC.row(0, i) for i in range(SPEC.total_rows)]
+
+
+def _expected(keep):
+    """Case Number record yang lolos `keep`, urut record."""
+    return [row[0] for row in _records() if keep(row)]
+
+
+def _cases(detail):
+    assert detail[0] == HEADER
+    return [row[0] for row in detail[1:]]
+
+
+def _rewrite(path, part, edit):
+    """Ganti satu bagian paket .xlsx: edit(xml) -> xml (bagian baru jika belum ada)."""
+    with zipfile.ZipFile(path) as zf:
+        parts = {name: zf.read(name) for name in zf.namelist()}
+    parts[part] = edit(parts.get(part, b"").decode("utf-8")).encode("utf-8")
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in parts.items():
+            zf.writestr(name, data)
+
+
+def _pivot_cell(path, row_label, col_label):
+    """(baris, kolom) absolut sel pivot dari label baris & kolom di lembar Pivot."""
+    with PivotWorkbook(path) as wb:
+        grid, r0, c0 = wb.read_sheet("Pivot")
+    r = next(i for i, row in enumerate(grid) if row[0] == row_label)
+    return r0 + r, c0 + grid[1].index(col_label)
+
+
+def _show_detail(path, row, col):
+    with PivotWorkbook(path) as wb:
+        return wb.show_detail("Pivot", row, col)
+
+
+def _fake_show_detail(path, row, col):
+    """ShowDetail lewat mesin Excel tiruan: lembar detail baru -> used_range.value."""
+    app = open_fake_app()
+    try:
+        wb = app.books.open(path)
+        wb.sheets["Pivot"].cells(row, col).api.ShowDetail = True
+        return wb.sheets.active.used_range.value
+    finally:
+        app.quit()
+
+
+def _drill_down_excel(path):
+    """Drill-down jalur Excel (fake_excel) pada titik temu kata kunci (Bandar Lampung, Grand Total)."""
+    app = open_fake_app()
+    try:
+        return drill_down_excel(app, path, ROW_KEYWORD, COL_KEYWORD)
+    finally:
+        app.quit()
+
+
+def _status_field(axis):
+    def edit(xml):
+        fields = re.search(r"<pivotFields[^>]*>(.*)</pivotFields>", xml).group(1)
+        tags = re.findall(r"<pivotField\b[^>]*/>|<pivotField\b.*?</pivotField>", fields)
+        assert tags[STATUS_FIELD] == '<pivotField showAll="0"/>'
+        tags[STATUS_FIELD] = f'<pivotField axis="{axis}" showAll="0">{STATUS_ITEMS}</pivotField>'
+        return xml.replace(fields, "".join(tags))
+    return edit
+
+
+# =============================================================================
+# Sel Detail / Total (Tata Letak Asli)
+# =============================================================================
+
+def test_detail_cell(workbook):
+    row, col = _pivot_cell(workbook, TARGET_REGION, 8204.0)
+    detail = _show_detail(workbook, row, col)
+
+    assert _cases(detail) == _expected(lambda r: r[REGION_FIELD] == TARGET_REGION and r[CODE_FIELD] == 8204)
+    assert detail == _fake_show_detail(workbook, row, col)
+
+
+def test_row_total_matches_drill_down_excel(workbook):
+    row, col = _pivot_cell(workbook, TARGET_REGION, "Grand Total")
+    detail = _show_detail(workbook, row, col)
+
+    assert _cases(detail) == _expected(lambda r: r[REGION_FIELD] == TARGET_REGION)
+    assert detail == _drill_down_excel(workbook)
+
+
+def test_column_total_cell(workbook):
+    row, col = _pivot_cell(workbook, "Grand Total", 8205.0)
+    detail = _show_detail(workbook, row, col)
+
+    assert _cases(detail) == _expected(lambda r: r[CODE_FIELD] == 8205)
+    assert detail == _fake_show_detail(workbook, row, col)
+
+
+def test_grand_total_cell(workbook):
+    row, col = _pivot_cell(workbook, "Grand Total", "Grand Total")
+    detail = _show_detail(workbook, row, col)
+
+    assert _cases(detail) == _expected(lambda r: True)
+    assert detail == _fake_show_detail(workbook, row, col)
+
+
+# =============================================================================
+# Subtotal (Region > Status), Filter Laporan, Item Tersembunyi
+# =============================================================================
+
+@pytest.fixture
+def subtotal_workbook(workbook):
+    """Status sebagai field baris dalam: baris data per status + subtotal per region."""
+    def edit(xml):
+        xml = _status_field("axisRow")(xml)
+        xml = xml.replace(f'<rowFields count="1"><field x="{REGION_FIELD}"/></rowFields>',
+                          f'<rowFields count="2"><field x="{REGION_FIELD}"/><field x="{STATUS_FIELD}"/></rowFields>')
+        items = []
+        for n in range(len(REGIONS)):
+            items.append(f'<i><x v="{n}"/><x/></i>')
+            items += [f'<i r="1"><x v="{s}"/></i>' for s in range(1, len(STATUSES))]
+            items.append(f'<i t="default"><x v="{n}"/></i>')
+        items.append('<i t="grand"><x/></i>')
+        xml = re.sub(r"<rowItems[^>]*>.*?</rowItems>",
+                     f'<rowItems count="{len(items)}">{"".join(items)}</rowItems>', xml)
+        # Area data: baris pertama data di baris 5 (firstDataRow=2 dari A3)
+        return re.sub(r'(<location ref="[A-Z]+\d+:[A-Z]+)\d+', rf"\g<1>{4 + len(items)}", xml)
+
+    _rewrite(workbook, PIVOT_PART, edit)
+    return workbook
+
+
+@pytest.mark.parametrize("item, region, status", [
+    (0, 0, 0),          # Bandar Lampung / Closed
+    (1, 0, 1),          # Bandar Lampung / Open (item r="1")
+    (3, 0, None),       # Subtotal Bandar Lampung
+    (6, 1, 2),          # Metro / In Progress
+    (7, 1, None),       # Subtotal Metro
+])
+def test_subtotal_layout(subtotal_workbook, item, region, status):
+    _, col = _pivot_cell(subtotal_workbook, TARGET_REGION, "Grand Total")
+    detail = _show_detail(subtotal_workbook, 5 + item, col)
+
+    expected = _expected(lambda r: r[REGION_FIELD] == REGIONS[region]
+                         and (status is None or r[STATUS_FIELD] == STATUSES[status]))
+    assert expected and _cases(detail) == expected
+    assert detail == _fake_show_detail(subtotal_workbook, 5 + item, col)
+
+
+def test_page_filtered_pivot(workbook):
+    def edit(xml):
+        xml = _status_field("axisPage")(xml)
+        return xml.replace("<dataFields", f'<pageFields count="1"><pageField fld="{STATUS_FIELD}" item="0" '
+                                          f'hier="-1"/></pageFields><dataFields')
+
+    _rewrite(workbook, PIVOT_PART, edit)
+    detail = _drill_down_excel(workbook)
+
+    expected = _expected(lambda r: r[REGION_FIELD] == TARGET_REGION and r[STATUS_FIELD] == STATUSES[0])
+    assert expected and _cases(detail) == expected
+    assert detail == _show_detail(workbook, *_pivot_cell(workbook, TARGET_REGION, "Grand Total"))
+
+
+def test_hidden_items_are_excluded(workbook):
+    def edit(xml):
+        # Kode 8205 (shared item ke-1) disembunyikan pada field kolom
+        return re.sub(r'(<pivotField axis="axisCol".*?)<item x="1"/>', r'\1<item x="1" h="1"/>', xml)
+
+    _rewrite(workbook, PIVOT_PART, edit)
+    detail = _drill_down_excel(workbook)
+
+    expected = _expected(lambda r: r[REGION_FIELD] == TARGET_REGION and r[CODE_FIELD] != 8205)
+    assert len(expected) < SPEC.rows and _cases(detail) == expected
+    assert detail == _show_detail(workbook, *_pivot_cell(workbook, TARGET_REGION, "Grand Total"))
+
+
+# =============================================================================
+# Pivot yang Tidak Didukung (Kembali ke Excel)
+# =============================================================================
+
+def test_label_filter_is_rejected(workbook):
+    def edit(xml):
+        return xml.replace("</pivotTableDefinition>",
+                           f'<filters count="1"><filter fld="{REGION_FIELD}" type="captionContains" evalOrder="-1" '
+                           'id="1" stringValue1="Lampung"><autoFilter ref="A1"><filterColumn colId="0">'
+                           '<customFilters><customFilter val="*Lampung*"/></customFilters></filterColumn>'
+                           '</autoFilter></filter></filters></pivotTableDefinition>')
+
+    _rewrite(workbook, PIVOT_PART, edit)
+    with pytest.raises(PivotReaderError, match="filter"):
+        _show_detail(workbook, *_pivot_cell(workbook, TARGET_REGION, "Grand Total"))
+
+
+def test_grouped_field_is_rejected(workbook):
+    def edit(xml):
+        # Region adalah cacheField terakhir
+        head, tail = xml.rsplit("</cacheField>", 1)
+        return f'{head}<fieldGroup base="{REGION_FIELD}"/></cacheField>{tail}'
+
+    _rewrite(workbook, CACHE_PART, edit)
+    with pytest.raises(PivotReaderError, match="grup"):
+        _show_detail(workbook, *_pivot_cell(workbook, TARGET_REGION, "Grand Total"))
+
+
+# =============================================================================
+# Nilai Sel: Shared String (Termasuk Rich Text) & Sel Error
+# =============================================================================
+
+def test_shared_strings_and_error_cells(workbook):
+    with PivotWorkbook(workbook) as wb:
+        original = wb.read_sheet("Pivot")
+    strings = []
+
+    def to_shared(match):
+        strings.append(match.group(2))
+        return f'<c r="{match.group(1)}" t="s"><v>{len(strings) - 1}</v></c>'
+
+    def edit(xml):
+        xml = re.sub(r'<c r="([A-Z]+\d+)" t="inlineStr"><is><t>(.*?)</t></is></c>', to_shared, xml)
+        # Sel error di dalam & di luar area nilai: dibaca sebagai kosong
+        xml = xml.replace('<row r="3">', '<row r="3"><c r="Z3" t="e"><v>#N/A</v></c>', 1)
+        return re.sub(r'<c r="C6"><v>[^<]*</v></c>', '<c r="C6" t="e"><v>#DIV/0!</v></c>', xml)
+
+    def shared(_):
+        items = []
+        for text in strings:
+            if text == "Grand Total":   # Rich text: beberapa <r>, tanpa <t> langsung
+                items.append('<si><r><t>Grand </t></r><r><rPr><b/></rPr><t>Total</t></r></si>')
+            else:
+                items.append(f"<si><t>{text}</t><rPh><t>x</t></rPh></si>")
+        return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                f'count="{len(items)}">{"".join(items)}</sst>')
+
+    _rewrite(workbook, PIVOT_SHEET_PART, edit)
+    _rewrite(workbook, "xl/sharedStrings.xml", shared)
+
+    with PivotWorkbook(workbook) as wb:
+        grid, r0, c0 = wb.read_sheet("Pivot")
+    expected = [list(row) for row in original[0]]
+    expected[6 - original[1]][3 - original[2]] = None
+    assert strings and (grid, r0, c0) == (expected, original[1], original[2])
+    assert _cases(_drill_down_excel(workbook)) == _expected(lambda r: r[REGION_FIELD] == TARGET_REGION)
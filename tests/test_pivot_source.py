@@ -0,0 +1,85 @@
+import pytest
+
+import fake_excel
+import pivot_source
+from drilldown import drill_down_file
+from fake_excel import open_fake_app
+from pivot_source import SourceDetailUnavailable, com_error, pivot_source_detail
+from conftest import ROW_KEYWORD, COL_KEYWORD
+
+
+# =============================================================================
+# Objek COM PivotTable tiruan (mesin tiruan tidak punya PivotCell)
+# =============================================================================
+
+class _Collection:
+    def __init__(self, *items):
+        self.items = items
+        self.Count = len(items)
+
+    def Item(self, i):
+        return self.items[i - 1]
+
+
+class _Raising:
+    """Objek COM yang melempar galat saat atribut `failing` dibaca."""
+
+    def __init__(self, failing, **props):
+        self.failing = failing
+        self.__dict__.update(props)
+
+    def __getattribute__(self, name):
+        if name == object.__getattribute__(self, "failing"):
+            raise com_error(-2147352567, "Exception occurred.", None, None)
+        return object.__getattribute__(self, name)
+
+
+ITEM_ACCESSORS = ("Parent", "SourceName")
+FIELD_ACCESSORS = ("PivotFilters", "CurrentPage")
+FAILING_ACCESSORS = ITEM_ACCESSORS + FIELD_ACCESSORS
+
+
+def _pivot_cell(failing):
+    field = _Raising(failing if failing in FIELD_ACCESSORS else None, Name="Region", SourceName="Region",
+                     IsCalculated=False, PivotFilters=_Collection(), HiddenItems=_Collection(),
+                     EnableMultiplePageItems=False, CurrentPage=_Raising(None, SourceName="(All)"))
+    item = _Raising(failing if failing in ITEM_ACCESSORS else None, Parent=field, SourceName="BANDAR LAMPUNG")
+    table = _Raising(None, PageFields=_Collection(field), RowFields=_Collection(field),
+                     ColumnFields=_Collection(), DataFields=_Collection(),
+                     PivotCache=lambda: _Raising(None, SourceType=pivot_source.XL_DATABASE, OLAP=False))
+    return _Raising(None, RowItems=_Collection(item), ColumnItems=_Collection(), PivotTable=table)
+
+
+@pytest.fixture
+def fake_pivot(monkeypatch):
+    """Pasang PivotCell tiruan pada Range.api mesin tiruan; sumber = header + satu record."""
+    state = {"failing": None}
+    monkeypatch.setattr(fake_excel._RangeApi, "PivotCell",
+                        property(lambda self: _pivot_cell(state["failing"])), raising=False)
+    monkeypatch.setattr(pivot_source, "_source_range",
+                        lambda app, wb, cache: [["Region", "Nilai"], ["BANDAR LAMPUNG", 1]])
+    return state
+
+
+@pytest.mark.parametrize("failing", FAILING_ACCESSORS)
+def test_com_error_on_field_accessor_is_unavailable(workbook, fake_pivot, failing):
+    fake_pivot["failing"] = failing
+    app = open_fake_app()
+    try:
+        wb = app.books.open(workbook)
+        cell = wb.sheets["Pivot"].cells(1, 1)
+        with pytest.raises(SourceDetailUnavailable):
+            pivot_source_detail(app, wb, cell)
+    finally:
+        app.quit()
+
+
+@pytest.mark.parametrize("failing", FAILING_ACCESSORS)
+def test_drill_down_falls_back_to_show_detail(workbook, fake_pivot, failing):
+    fake_pivot["failing"] = failing
+    app = open_fake_app()
+    try:
+        expected = drill_down_file(app, workbook, ROW_KEYWORD, COL_KEYWORD)
+        assert drill_down_file(app, workbook, ROW_KEYWORD, COL_KEYWORD, from_source=True) == expected
+    finally:
+        app.quit()
@@ -0,0 +1,27 @@
+from row_store import RowStore
+
+COLS = ["Case Number", "Case Type", "Sumber"]
+ROWS = [["C1", "8204", "a.xlsx"], ["C2", "8204", "a.xlsx"], ["C3", "9100", "b.xlsx"]]
+
+
+def test_replace_publishes_whole_row():
+    store = RowStore(COLS, dict_cols={1, 2}, rows=ROWS)
+    revision = store.revision
+    store.replace(1, ["C2", "9100", "c.xlsx"])
+
+    assert store.revision > revision
+    assert store[1] == ["C2", "9100", "c.xlsx"]
+    assert store.cell(1, 2) == "c.xlsx"
+    assert list(store) == [ROWS[0], ["C2", "9100", "c.xlsx"], ROWS[2]]
+
+
+def test_lookups_see_replaced_rows():
+    store = RowStore(COLS, dict_cols={1, 2}, rows=ROWS)
+    store.replace(0, ["C9", "9100", "b.xlsx"])
+
+    assert store.find(1, "8204") == [1]
+    assert store.find(1, "9100") == [0, 2]
+    assert store.find(0, "C1") == []
+    assert store.find(0, "C9") == [0]
+    assert store.value_counts(-1) == {"a.xlsx": 1, "b.xlsx": 2}
+    assert store.value_counts(0) == {"C9": 1, "C2": 1, "C3": 1}
@@ -0,0 +1,208 @@
+import time
+import queue
+
+# =============================================================================
+# KANAL EVENT UI (THREAD-SAFE, DIGABUNG PER TICK)
+# =============================================================================
+# Utas pekerja tidak lagi menjadwalkan root.after(0, lambda ...) per event.
+# Semua event masuk ke satu antrean (UIEventQueue.post_*); loop Tk menguras
+# antrean pada tick tetap (TICK_MS) dan hanya menerapkan status TERAKHIR:
+#   - progress : (nilai, teks) dari engine / ekspor -> digabung ke ProgressTracker
+#   - stage    : awal/akhir tahap trace (run_trace.py: open, scan, show_detail,
+#                read_detail, extract) -> progres di dalam satu file
+#   - rows     : ada baris baru -> tabel disinkronkan sekali per tick
+#   - call     : fungsi UI sekali jalan (mis. finish_processing), urut
+# Modul ini tidak meng-import tkinter sehingga bisa dipakai/diuji tanpa display.
+
+TICK_MS = 100
+
+# Posisi progres di dalam satu file saat tahap DIMULAI (0..1)
+STAGE_PROGRESS = {
+    "cache": 0.05,
+    "open": 0.05,
+    "scan": 0.15,
+    "show_detail": 0.25,
+    "source_detail": 0.25,
+    "read_detail": 0.7,
+    "close": 0.8,
+    "extract": 0.85,
+}
+
+STAGE_LABELS = {
+    "cache": "membaca cache",
+    "open": "membuka workbook",
+    "scan": "scan kata kunci",
+    "show_detail": "drill-down",
+    "source_detail": "drill-down (sumber pivot)",
+    "read_detail": "membaca detail",
+    "close": "menutup workbook",
+    "extract": "ekstraksi baris",
+}
+
+_STEPS = 100  # Resolusi progress bar per unit (file)
+
+
+def format_duration(seconds):
+    seconds = int(max(0, seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}j {seconds % 3600 // 60:02d}m"
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+class ProgressTracker:
+    """
+    Status progres satu batch (hanya diakses utas UI).
+    Mode "file": posisi sub-file dari tahap trace, ETA dari rata-rata waktu
+    per file yang sudah selesai (sebelum ada file selesai: ekstrapolasi
+    posisi file berjalan). Mode lain (mis. "baris" saat ekspor): ETA linear
+    dari laju nilai/detik.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.start(0)
+
+    def start(self, total, unit="file"):
+        now = self.clock()
+        self.total = total
+        self.unit = unit
+        self.started = now
+        self.index = 0             # File berjalan (0-based) / nilai saat ini
+        self.file_started = now
+        self.fraction = 0.0        # Posisi di dalam file berjalan
+        self.stage = None
+        self.text = ""
+        self.durations = []        # Waktu per file selesai (detik)
+        self.rows = 0              # Baris detail yang sudah diekstrak
+        self.dirty = True
+
+    # -------------------------------------------------------------------------
+    # Event
+    # -------------------------------------------------------------------------
+
+    def on_progress(self, value, text):
+        if self.unit == "file" and value > self.index:
+            now = self.clock()
+            self.durations.extend([(now - self.file_started) / (value - self.index)] * (value - self.index))
+            self.file_started = now
+            self.fraction = 0.0
+            self.stage = None
+        self.index = value
+        self.text = text
+        self.dirty = True
+
+    def on_stage(self, name, finished, rows=0):
+        if self.unit != "file" or name not in STAGE_PROGRESS:
+            return          # Tahap "file" (total per file) sudah diwakili event progress
+        if finished:
+            if name == "extract":
+                self.rows += rows or 0
+        else:
+            self.stage = name
+            self.fraction = max(self.fraction, STAGE_PROGRESS[name])
+        self.dirty = True
+
+    # -------------------------------------------------------------------------
+    # Status Tampilan
+    # -------------------------------------------------------------------------
+
+    def eta(self):
+        """Perkiraan detik tersisa, None jika belum bisa diperkirakan."""
+        now = self.clock()
+        if self.unit != "file":
+            elapsed = now - self.started
+            if self.index <= 0 or elapsed <= 0:
+                return None
+            return elapsed * (self.total - self.index) / self.index
+        remaining = self.total - self.index - self.fraction
+        if self.durations:
+            return max(0.0, remaining * sum(self.durations) / len(self.durations))
+        if self.fraction >= 0.1:
+            per_file = (now - self.file_started) / self.fraction
+            return max(0.0, remaining * per_file)
+        return None
+
+    def snapshot(self):
+        """(nilai progress bar, maksimum, teks status) lalu tandai bersih."""
+        self.dirty = False
+        elapsed = max(1e-9, self.clock() - self.started)
+        parts = [self.text]
+        if self.unit == "file":
+            value, maximum = int((self.index + self.fraction) * _STEPS), max(1, self.total) * _STEPS
+            if self.stage and self.index < self.total:
+                parts.append(STAGE_LABELS.get(self.stage, self.stage))
+            if self.rows:
+                parts.append(f"{self.rows / elapsed:,.0f} baris/dtk")
+        else:
+            value, maximum = self.index, max(1, self.total)
+            if self.index:
+                parts.append(f"{self.index / elapsed:,.0f} {self.unit}/dtk")
+        eta = self.eta()
+        if eta is not None and self.index < self.total:
+            parts.append(f"ETA {format_duration(eta)}")
+        return value, maximum, " | ".join(p for p in parts if p)
+
+
+class UIEventQueue:
+    """Antrean event dari utas mana pun; dikuras oleh utas UI lewat drain()."""
+
+    def __init__(self, tracker=None):
+        self._queue = queue.SimpleQueue()
+        self.tracker = tracker or ProgressTracker()
+        self.active = False
+
+    # Dipanggil dari utas pekerja --------------------------------------------
+
+    def post_progress(self, value, text):
+        self._queue.put(("progress", value, text))
+
+    def post_stage(self, rec, finished):
+        """Listener run_trace.TRACE: awal/akhir tahap (hitungan baris saat extract selesai)."""
+        self._queue.put(("stage", rec["stage"], finished, rec.get("rows", 0) if finished else 0))
+
+    def post_rows(self):
+        self._queue.put(("rows",))
+
+    def post_call(self, fn):
+        self._queue.put(("call", fn))
+
+    # Dipanggil dari utas UI ---------------------------------------------------
+
+    def start_batch(self, total, unit="file"):
+        """Mulai batch baru (proses file: unit "file", ekspor: unit "baris")."""
+        self.tracker.start(total, unit)
+        self.active = True
+
+    def end_batch(self):
+        """Batch selesai: status akhir ditulis pemanggil, tick berikutnya tidak menimpanya."""
+        self.active = False
+
+    def _drain_raw(self):
+        events = []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                return events
+
+    def drain(self):
+        """
+        Terapkan semua event yang menunggu ke tracker.
+        Returns: (snapshot atau None jika tidak berubah, ada_baris_baru, [fungsi UI]).
+        """
+        has_rows = False
+        calls = []
+        for event in self._drain_raw():
+            kind = event[0]
+            if kind == "progress":
+                self.tracker.on_progress(event[1], event[2])
+            elif kind == "stage":
+                self.tracker.on_stage(event[1], event[2], event[3])
+            elif kind == "rows":
+                has_rows = True
+            elif kind == "call":
+                calls.append(event[1])
+        # Selama batch aktif snapshot dibuat setiap tick agar ETA tetap bergerak
+        # walau tidak ada event baru (mis. satu ShowDetail yang lama)
+        snapshot = self.tracker.snapshot() if self.active else None
+        return snapshot, has_rows, calls
@@ -0,0 +1,297 @@
+import re
+import bisect
+from tkinter import ttk
+
+# =============================================================================
+# TABEL VIRTUAL (VIRTUAL SCROLLING) UNTUK 100K+ BARIS
+# =============================================================================
+# Treeview hanya berisi item sebanyak baris yang terlihat di layar. Saat
+# scroll, item yang sama diisi ulang dengan baris dari backing store
+# (engine.master_data) sehingga biaya render tidak bergantung jumlah data.
+# Sort & filter dikerjakan pada daftar indeks (RowView), bukan pada widget.
+
+DATE_PATTERN = re.compile(r"^(\d{1,2})/(\d{1,2})/(\d{4})$")
+
+
+def sort_key(val):
+    """Kunci sort campuran: angka < tanggal dd/mm/yyyy < teks (case-insensitive)."""
+    text = "" if val is None else str(val)
+    if text.isdigit():
+        return (0, int(text), "")
+    match = DATE_PATTERN.match(text)
+    if match:
+        d, m, y = match.groups()
+        return (1, int(y) * 10000 + int(m) * 100 + int(d), "")
+    return (2, 0, text.lower())
+
+
+class RowView:
+    """
+    Tampilan (urutan + filter) atas backing store berbentuk sequence baris.
+
+    Teknis:
+    - rows  : referensi ke store (RowStore / list), TIDAK disalin.
+    - order : None (urutan asli, tanpa alokasi) atau list indeks store.
+              Saat sort aktif, order selalu naik (keys sejajar dengannya);
+              sort turun dibaca terbalik sehingga baris baru cukup di-bisect.
+    - sync(): memproses baris baru di akhir store (append inkremental).
+    """
+
+    def __init__(self, rows=None):
+        self.rows = rows if rows is not None else []
+        self._cell = self._cell_getter(self.rows)
+        self.order = None
+        self.keys = []
+        self.synced = 0
+        self.revision = getattr(self.rows, "revision", 0)
+        self.sort_col = None
+        self.sort_desc = False
+        self.filter_text = ""
+        self.sync()
+
+    def __len__(self):
+        return self.synced if self.order is None else len(self.order)
+
+    def row_at(self, pos):
+        """Baris ke-`pos` pada tampilan."""
+        return self.rows[self.index_at(pos)]
+
+    def index_at(self, pos):
+        """Indeks store untuk baris ke-`pos` pada tampilan."""
+        if self.order is None:
+            return pos
+        if self.sort_desc:
+            pos = len(self.order) - 1 - pos
+        return self.order[pos]
+
+    @staticmethod
+    def _cell_getter(rows):
+        # RowStore bisa membaca satu sel tanpa membangun seluruh baris
+        cell = getattr(rows, "cell", None)
+        return cell if cell is not None else (lambda i, col: rows[i][col])
+
+    def set_source(self, rows):
+        self.rows = rows
+        self._cell = self._cell_getter(rows)
+        self.revision = getattr(rows, "revision", 0)
+        self.synced = 0
+        self.order = None if self._is_identity() else []
+        self.sync(force_rebuild=True)
+
+    def _is_identity(self):
+        return self.sort_col is None and not self.filter_text
+
+    def _matches(self, row):
+        needle = self.filter_text
+        return any(needle in str(val).lower() for val in row if val is not None)
+
+    def sync(self, force_rebuild=False):
+        """Tambahkan baris store yang belum ada di tampilan. Mengembalikan jumlah baris baru."""
+        total = len(self.rows)
+        start = self.synced
+        if total < start:
+            # Store diganti/dikosongkan di tempat: bangun ulang dari awal
+            start = 0
+            force_rebuild = True
+        revision = getattr(self.rows, "revision", 0)
+        if revision != self.revision:
+            # Ada baris lama yang diganti isinya: urutan/filter harus dihitung ulang
+            self.revision = revision
+            force_rebuild = True
+        self.synced = total
+
+        if self._is_identity():
+            self.order = None
+            return total - start
+
+        if force_rebuild:
+            start = 0
+            self.order = []
+            self.keys = []
+        before = len(self.order)
+        new_idx = range(start, total)
+        if self.filter_text:
+            new_idx = [i for i in new_idx if self._matches(self.rows[i])]
+
+        col = self.sort_col
+        if col is None:
+            self.order.extend(new_idx)
+        elif len(new_idx) > min(1024, len(self.order) // 8):
+            # Banyak baris baru (atau rebuild): gabung ulang via sort lebih murah
+            # daripada ribuan list.insert O(n)
+            cell = self._cell
+            pairs = [(sort_key(cell(i, col)), i) for i in new_idx]
+            pairs.extend(zip(self.keys, self.order))
+            pairs.sort()
+            self.keys = [k for k, _ in pairs]
+            self.order = [i for _, i in pairs]
+        else:
+            for i in new_idx:
+                key = sort_key(self._cell(i, col))
+                pos = bisect.bisect_right(self.keys, key)
+                self.keys.insert(pos, key)
+                self.order.insert(pos, i)
+        return len(self.order) - before
+
+    def set_sort(self, col, desc=False):
+        if col == self.sort_col:
+            # Kolom sama: cukup balik arah baca, tanpa sort ulang
+            self.sort_desc = desc
+            return
+        self.sort_col = col
+        self.sort_desc = desc
+        self.sync(force_rebuild=True)
+
+    def set_filter(self, text):
+        self.filter_text = (text or "").strip().lower()
+        self.sync(force_rebuild=True)
+
+
+class VirtualTable:
+    """
+    Widget tabel virtual: ttk.Treeview + scrollbar vertikal yang dikendalikan
+    manual. API untuk GUI:
+    - set_source(rows) : ganti backing store (mis. setelah reset / mode folder)
+    - sync()           : tampilkan baris baru yang di-append ke store
+    - set_filter(text) : filter substring (semua kolom, case-insensitive)
+    - selected_rows()  : baris store untuk item terpilih (Ctrl+C)
+    Klik header kolom untuk sort naik/turun.
+    """
+
+    def __init__(self, parent, columns, rows=None):
+        self.columns = list(columns)
+        self.view = RowView(rows)
+        self.offset = 0
+        self.visible = 1
+        self._items = []
+        self._rendered_offset = 0
+
+        self.sy = ttk.Scrollbar(parent, orient="vertical", command=self._on_scrollbar)
+        self.sx = ttk.Scrollbar(parent, orient="horizontal")
+        self.tree = ttk.Treeview(parent, columns=self.columns, show="headings",
+                                 xscrollcommand=self.sx.set)
+        self.sx.config(command=self.tree.xview)
+        self.sy.pack(side="right", fill="y")
+        self.sx.pack(side="bottom", fill="x")
+        self.tree.pack(fill="both", expand=True)
+
+        self._setup_headings()
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))
+        self.tree.bind("<Prior>", lambda e: self.scroll(-self.visible))
+        self.tree.bind("<Next>", lambda e: self.scroll(self.visible))
+        self.tree.bind("<Home>", lambda e: self.scroll_to(0))
+        self.tree.bind("<End>", lambda e: self.scroll_to(len(self.view)))
+
+    def _setup_headings(self):
+        for idx, c in enumerate(self.columns):
+            self.tree.heading(c, text=c, anchor="w", command=lambda i=idx: self.toggle_sort(i))
+
+    # -------------------------------------------------------------------------
+    # API Data
+    # -------------------------------------------------------------------------
+
+    def set_columns(self, columns, rows):
+        """Ganti susunan kolom (mis. kebijakan duplikat menambah kolom) beserta store-nya."""
+        for iid in self._items:
+            self.tree.delete(iid)
+        self._items = []
+        self.columns = list(columns)
+        self.tree.configure(columns=self.columns)
+        self._setup_headings()
+        self.view = RowView(rows)
+        self.offset = 0
+        self._rendered_offset = -1
+        self.render()
+
+    def set_source(self, rows):
+        self.view.set_source(rows)
+        self._rendered_offset = -1
+        self.offset = 0
+        self.render()
+
+    def sync(self):
+        """Append inkremental: hanya baris baru yang diproses, posisi scroll dipertahankan."""
+        self.view.sync()
+        self.render()
+
+    def set_filter(self, text):
+        self.view.set_filter(text)
+        self._rendered_offset = -1
+        self.offset = 0
+        self.render()
+
+    def toggle_sort(self, col):
+        desc = self.view.sort_col == col and not self.view.sort_desc
+        self.view.set_sort(col, desc)
+        for idx, c in enumerate(self.columns):
+            arrow = (" ▼" if desc else " ▲") if idx == col else ""
+            self.tree.heading(c, text=c + arrow)
+        self.offset = 0
+        self._rendered_offset = -1
+        self.render()
+
+    def selected_rows(self):
+        rows = []
+        for iid in self.tree.selection():
+            pos = self.offset + self._items.index(iid)
+            if pos < len(self.view):
+                rows.append(self.view.row_at(pos))
+        return rows
+
+    # -------------------------------------------------------------------------
+    # Render Jendela Terlihat
+    # -------------------------------------------------------------------------
+
+    def render(self):
+        total = len(self.view)
+        self.offset = max(0, min(self.offset, total - self.visible))
+        needed = max(0, min(self.visible, total - self.offset))
+        if self.offset != self._rendered_offset:
+            # Item dipakai ulang untuk baris lain: seleksi lama tidak berlaku lagi
+            self.tree.selection_remove(self.tree.selection())
+            self._rendered_offset = self.offset
+
+        # Pool item seukuran jendela: tambah/hapus hanya di ujung
+        while len(self._items) < needed:
+            self._items.append(self.tree.insert("", "end", values=()))
+        while len(self._items) > needed:
+            self.tree.delete(self._items.pop())
+
+        for slot, iid in enumerate(self._items):
+            self.tree.item(iid, values=self.view.row_at(self.offset + slot))
+
+        if total:
+            self.sy.set(self.offset / total, min(1.0, (self.offset + needed) / total))
+        else:
+            self.sy.set(0.0, 1.0)
+
+    def scroll(self, delta):
+        self.scroll_to(self.offset + delta)
+        return "break"
+
+    def scroll_to(self, offset):
+        self.offset = offset
+        self.render()
+        return "break"
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.view)))
+        elif action == "scroll":
+            step = self.visible if unit == "pages" else 1
+            self.scroll(int(amount) * step)
+
+    def _on_wheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def _on_resize(self, event):
+        rowheight = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        header = 28
+        visible = max(1, (event.height - header) // rowheight)
+        if visible != self.visible:
+            self.visible = visible
+            self.render()